@@ -10,8 +10,13 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
+import re
+import sys
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -41,6 +46,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'wallet.middleware.InstrumentacionMiddleware',  # Server-Timing y /metrics
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -66,6 +72,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'wallet.fragmentos.versiones',
             ],
         },
     },
@@ -75,13 +82,104 @@ WSGI_APPLICATION = 'algoweb.wsgi.application'
 
 
 # === Base de datos ===
+# PRAGMAs que se aplican al abrir cada conexión SQLite. synchronous=NORMAL es
+# seguro en WAL y evita un fsync por commit; mmap y cache_size mantienen las
+# páginas calientes en memoria. WAL (leer mientras otro proceso escribe) se
+# guarda en el archivo y lo activa una vez la migración 0015_sqlite_wal.
+SQLITE_PRAGMAS = {
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,  # negativo = KiB
+    'temp_store': 'MEMORY',
+}
+SQLITE_PRAGMAS.update({
+    clave[len('WALLET_SQLITE_'):].lower(): valor
+    for clave, valor in os.environ.items() if clave.startswith('WALLET_SQLITE_')
+})
+
+# Los valores van tal cual en init_command: sólo se aceptan PRAGMAs conocidos con
+# un entero o una de sus palabras clave.
+_ENTERO = re.compile(r'-?\d+')
+SQLITE_PRAGMAS_VALIDOS = {
+    'synchronous': {'OFF', 'NORMAL', 'FULL', 'EXTRA'},
+    'temp_store': {'DEFAULT', 'FILE', 'MEMORY'},
+    'journal_mode': {'DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'},
+    'mmap_size': set(),
+    'cache_size': set(),
+    'busy_timeout': set(),
+    'wal_autocheckpoint': set(),
+    'journal_size_limit': set(),
+}
+for _pragma, _valor in SQLITE_PRAGMAS.items():
+    if _pragma not in SQLITE_PRAGMAS_VALIDOS or not (
+        _ENTERO.fullmatch(str(_valor)) or str(_valor).upper() in SQLITE_PRAGMAS_VALIDOS[_pragma]
+    ):
+        raise ImproperlyConfigured(f"PRAGMA SQLite no permitido: {_pragma}={_valor!r}")
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Conexiones persistentes entre peticiones (segundos; 0 = una por petición).
+        # wsgi.py lo sube por defecto; con ASGI cada hilo de sync_to_async dejaría
+        # su conexión abierta, y los comandos no atienden peticiones.
+        'CONN_MAX_AGE': int(os.environ.get('WALLET_DB_CONN_MAX_AGE', 0)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': ';'.join(f'PRAGMA {k}={v}' for k, v in SQLITE_PRAGMAS.items()),
+            # BEGIN IMMEDIATE: la transacción toma el lock de escritura al empezar y
+            # espera `timeout` en vez de fallar con "database is locked" al promoverlo.
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
     }
 }
 
+# Réplica de sólo lectura opcional (p. ej. una copia mantenida con Litestream/LiteFS).
+# Dashboards y listados leen de ella; sin WALLET_DB_REPLICA todo va a 'default'.
+if os.environ.get('WALLET_DB_REPLICA'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.environ['WALLET_DB_REPLICA'],
+        'OPTIONS': {'init_command': DATABASES['default']['OPTIONS']['init_command'], 'timeout': 20},
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['wallet.routers.ReplicaRouter']
+
+
+# === Caché ===
+# 'fragmentos': fragmentos de plantilla de dashboards y listados ({% cache ... using="fragmentos" %}).
+# Se invalidan por versión (wallet/fragmentos.py); MAX_ENTRIES acota la memoria por proceso.
+# 'versiones': versiones de esos fragmentos y de las cuentas de ACCOUNT_CACHE. Van en la base
+# (tabla creada por la migración 0016) para que todos los procesos vean la misma; una entrada
+# perdida invalidaría de más, así que no se desaloja nada (son pocas: tres grupos y una por wallet).
+# Los tests usan locmem: no escriben fuera de su base ni cuentan en los presupuestos de queries.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'fragmentos': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'wallet-fragmentos',
+        'TIMEOUT': 600,
+        'OPTIONS': {'MAX_ENTRIES': 5000, 'CULL_FREQUENCY': 4},
+    },
+    'versiones': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'wallet_cache_versiones',
+        'TIMEOUT': None,
+        'OPTIONS': {'MAX_ENTRIES': sys.maxsize},
+    },
+}
+if sys.argv[1:2] == ['test']:
+    CACHES['versiones'] = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'wallet-versiones',
+        'TIMEOUT': None,
+        'OPTIONS': {'MAX_ENTRIES': sys.maxsize},
+    }
+
 
 # === Validación de contraseñas ===
 AUTH_PASSWORD_VALIDATORS = [
@@ -12,5 +12,7 @@ import os
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'algoweb.settings')
+# Los workers WSGI reutilizan su conexión a la base entre peticiones (ver DATABASES).
+os.environ.setdefault('WALLET_DB_CONN_MAX_AGE', '600')
 
 application = get_wsgi_application()
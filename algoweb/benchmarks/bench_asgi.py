@@ -0,0 +1,154 @@
+"""
+Benchmark: throughput de `get_balance` bajo ASGI (un event loop) frente a WSGI (N hilos).
+
+Levanta un algod HTTP local que responde `account_info` con `--latencia-ms`
+de retraso y le apunta ambos clientes de la app. La caché de cuentas se
+desactiva (TTL 0) para que cada petición llegue al upstream.
+
+- WSGI: `--hilos` hilos, como un worker gthread; cada petición ocupa un
+  hilo mientras espera a algod (PooledAlgodClient).
+- ASGI: un solo event loop con hasta `--concurrencia` peticiones en vuelo
+  (AsyncPooledAlgodClient); la espera no ocupa hilos.
+
+Uso (desde algoweb/):
+    python benchmarks/bench_asgi.py --peticiones 2000 --concurrencia 200 --hilos 8 --latencia-ms 100
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'algoweb.settings')
+
+from django.conf import settings  # noqa: E402
+
+DB_TEMPORAL = Path(tempfile.mkdtemp()) / 'bench_asgi.sqlite3'
+settings.DATABASES['default']['NAME'] = DB_TEMPORAL
+
+import django  # noqa: E402
+
+django.setup()
+
+from algosdk import account  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.test import AsyncClient, Client  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+from wallet.cache import ACCOUNT_CACHE  # noqa: E402
+from wallet.clients import AsyncPooledAlgodClient, PooledAlgodClient  # noqa: E402
+from wallet.models import User, Wallet  # noqa: E402
+
+
+class AlgodLocal(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    latencia = 0.1
+
+    def do_GET(self):
+        time.sleep(self.latencia)
+        cuerpo = json.dumps({'address': self.path.split('/')[-1].split('?')[0], 'amount': 1_000_000}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *args):
+        pass
+
+
+class ServidorAlgod(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+def resumen(nombre, tiempos, total):
+    percentiles = statistics.quantiles(tiempos, n=100)
+    print(f"{nombre:6} {len(tiempos) / total:9.1f} req/s   p50 {percentiles[49]:8.1f} ms   "
+          f"p99 {percentiles[98]:8.1f} ms")
+
+
+def medir_wsgi(usuario, direcciones, peticiones, hilos):
+    locales = threading.local()
+    url = reverse('get_balance')
+
+    def pedir(i):
+        if not hasattr(locales, 'client'):
+            locales.client = Client()
+            locales.client.force_login(usuario)
+        inicio = time.perf_counter()
+        response = locales.client.get(url, {'address': direcciones[i % len(direcciones)]})
+        assert response.status_code == 200, response.content
+        return (time.perf_counter() - inicio) * 1000
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        tiempos = list(pool.map(pedir, range(peticiones)))
+    return tiempos, time.perf_counter() - inicio
+
+
+async def medir_asgi(usuario, direcciones, peticiones, concurrencia):
+    client = AsyncClient()
+    await client.aforce_login(usuario)
+    url = reverse('get_balance')
+    cupos = asyncio.Semaphore(concurrencia)
+
+    async def pedir(i):
+        async with cupos:
+            inicio = time.perf_counter()
+            response = await client.get(url, {'address': direcciones[i % len(direcciones)]})
+            assert response.status_code == 200, response.content
+            return (time.perf_counter() - inicio) * 1000
+
+    inicio = time.perf_counter()
+    tiempos = await asyncio.gather(*[pedir(i) for i in range(peticiones)])
+    return tiempos, time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--peticiones', type=int, default=2000)
+    parser.add_argument('--concurrencia', type=int, default=200, help="Peticiones en vuelo en el worker ASGI.")
+    parser.add_argument('--hilos', type=int, default=8, help="Hilos del worker WSGI.")
+    parser.add_argument('--latencia-ms', type=float, default=100.0)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    call_command('migrate', verbosity=0)
+    usuario = User.objects.create_user(username='alumno', password='x')
+    direcciones = [account.generate_account()[1] for _ in range(200)]
+    Wallet.objects.create(user=usuario, address=direcciones[0], private_key='x')
+
+    AlgodLocal.latencia = args.latencia_ms / 1000
+    servidor = ServidorAlgod(('127.0.0.1', 0), AlgodLocal)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    url_algod = f'http://127.0.0.1:{servidor.server_port}'
+    algod = PooledAlgodClient('', url_algod, pool_size=args.hilos)
+    algod_async = AsyncPooledAlgodClient('', url_algod, pool_size=args.concurrencia)
+
+    print(f"{args.peticiones} peticiones a get_balance, algod con {args.latencia_ms:.0f} ms de latencia\n")
+    with mock.patch.object(ACCOUNT_CACHE, 'ttl', 0), \
+            mock.patch('wallet.views.ALGOD_CLIENT', algod), \
+            mock.patch('wallet.views.ASYNC_ALGOD_CLIENT', algod_async):
+        tiempos, total = medir_wsgi(usuario, direcciones, args.peticiones, args.hilos)
+        resumen('WSGI', tiempos, total)
+        tiempos, total = asyncio.run(medir_asgi(usuario, direcciones, args.peticiones, args.concurrencia))
+        resumen('ASGI', tiempos, total)
+
+    servidor.shutdown()
+    DB_TEMPORAL.unlink()
+
+
+if __name__ == '__main__':
+    main()
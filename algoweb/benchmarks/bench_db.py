@@ -0,0 +1,131 @@
+"""
+Benchmark: escrituras y lecturas por segundo de SQLite con 1, 8 y 32 clientes.
+
+Compara dos perfiles de `DATABASES['default']` sobre bases temporales nuevas:
+
+- base:       la configuración de Django por defecto (journal DELETE,
+              transacciones DEFERRED, una conexión por petición).
+- produccion: el perfil de algoweb/settings.py (PRAGMAs de SQLITE_PRAGMAS,
+              BEGIN IMMEDIATE y CONN_MAX_AGE).
+
+Cada cliente es un hilo que repite "peticiones" durante `--segundos`:
+- escritura: en una transacción cuenta los pagos en cola e inserta un
+  `Transaccion` (leer y luego escribir, como las vistas de pago);
+- lectura:   los 50 movimientos más recientes y el conteo de pendientes.
+Al terminar cada petición se llama a `close_old_connections()`, igual que
+las señales request_started/request_finished de Django.
+
+Uso (desde algoweb/):
+    python benchmarks/bench_db.py --segundos 3 --clientes 1 8 32
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'algoweb.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import OperationalError, close_old_connections, connections, transaction  # noqa: E402
+
+from wallet.models import Transaccion  # noqa: E402
+
+DIRECTORIO = Path(tempfile.mkdtemp())
+
+PERFILES = {
+    'base': {'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False, 'OPTIONS': {}},
+    'produccion': {
+        'CONN_MAX_AGE': settings.DATABASES['default']['CONN_MAX_AGE'],
+        'CONN_HEALTH_CHECKS': settings.DATABASES['default']['CONN_HEALTH_CHECKS'],
+        'OPTIONS': settings.DATABASES['default']['OPTIONS'],
+    },
+}
+
+
+def usar_perfil(nombre, filas):
+    """Apunta `default` a una base nueva con el perfil `nombre` y la siembra."""
+    connections.close_all()
+    config = connections.settings['default']
+    config.update(PERFILES[nombre], NAME=str(DIRECTORIO / f'{nombre}.sqlite3'))
+    call_command('migrate', verbosity=0)
+    Transaccion.objects.bulk_create([
+        Transaccion(sender=f'doc{i % 20}', receiver=f'alu{i}', amount=1, tipo='docente_to_alumno',
+                    estado='confirmed' if i % 10 else 'pending')
+        for i in range(filas)
+    ], batch_size=1000)
+    connections.close_all()
+
+
+def escritura(i):
+    with transaction.atomic():
+        Transaccion.objects.filter(estado='queued').count()
+        Transaccion.objects.create(sender='doc', receiver=f'bench{i}', amount=1, tipo='docente_to_alumno',
+                                   estado='queued')
+
+
+def lectura(i):
+    list(Transaccion.objects.order_by('-fecha_creacion')[:50])
+    Transaccion.objects.filter(estado='pending').count()
+
+
+def medir(operacion, clientes, segundos):
+    """Devuelve (peticiones por segundo, errores "database is locked")."""
+    hechas, errores = [0], [0]
+    lock = threading.Lock()
+    fin = []
+    listos = threading.Barrier(clientes, action=lambda: fin.append(time.perf_counter() + segundos))
+
+    def cliente(n):
+        propias = fallidas = 0
+        listos.wait()
+        while time.perf_counter() < fin[0]:
+            try:
+                operacion(n * 1_000_000 + propias)
+                propias += 1
+            except OperationalError:
+                fallidas += 1
+            finally:
+                close_old_connections()
+        connections.close_all()
+        with lock:
+            hechas[0] += propias
+            errores[0] += fallidas
+
+    with ThreadPoolExecutor(max_workers=clientes) as pool:
+        list(pool.map(cliente, range(clientes)))
+    return hechas[0] / segundos, errores[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--segundos', type=float, default=3.0, help="Duración de cada medición.")
+    parser.add_argument('--clientes', type=int, nargs='*', default=[1, 8, 32])
+    parser.add_argument('--filas', type=int, default=20_000, help="Transacciones sembradas para las lecturas.")
+    args = parser.parse_args()
+
+    print(f"{'perfil':11} {'clientes':>8} {'escrituras/s':>13} {'bloqueos':>9} {'lecturas/s':>11}")
+    for perfil in PERFILES:
+        usar_perfil(perfil, args.filas)
+        for clientes in args.clientes:
+            escrituras, bloqueos = medir(escritura, clientes, args.segundos)
+            lecturas, _ = medir(lectura, clientes, args.segundos)
+            print(f"{perfil:11} {clientes:8} {escrituras:13.0f} {bloqueos:9} {lecturas:11.0f}")
+
+    connections.close_all()
+    for archivo in DIRECTORIO.iterdir():
+        archivo.unlink()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""
+Benchmark: planes de consulta y tiempos antes/después de los índices de 0007.
+
+Crea una base SQLite temporal migrada hasta 0006, siembra `--filas`
+Transaccion y ActividadAsignada, mide las consultas del admin y de los
+dashboards, aplica 0007_indices_transaccion_actividadasignada y repite.
+
+Uso (desde algoweb/):
+    python benchmarks/bench_indices.py --filas 1000000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'algoweb.settings')
+
+from django.conf import settings  # noqa: E402
+
+DB_TEMPORAL = Path(tempfile.mkdtemp()) / 'bench_indices.sqlite3'
+settings.DATABASES['default']['NAME'] = DB_TEMPORAL
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+from django.db.models import Q  # noqa: E402
+
+from wallet.models import User, Actividad, ActividadAsignada, Transaccion  # noqa: E402
+
+ANTES = '0006_llavepregenerada'
+DESPUES = '0007_indices_transaccion_actividadasignada'
+USUARIOS = 2000
+LOTE = 50_000
+
+
+def sembrar(filas):
+    """Inserta las filas con executemany directo; el ORM sería el cuello de botella aquí."""
+    rnd = random.Random(42)
+    User.objects.bulk_create([
+        User(username=f'user{i}', role='docente' if i < 50 else 'estudiante', password='!')
+        for i in range(USUARIOS)
+    ])
+    ids = list(User.objects.order_by('id').values_list('id', flat=True))
+    docentes, alumnos = ids[:50], ids[50:]
+    Actividad.objects.bulk_create([
+        Actividad(titulo=f'Act {i}', descripcion='-', docente_id=docentes[i % 50]) for i in range(500)
+    ])
+    actividades = list(Actividad.objects.values_list('id', flat=True))
+    inicio = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        for base in range(0, filas, LOTE):
+            n = min(LOTE, filas - base)
+            cursor.executemany(
+                'INSERT INTO wallet_transaccion (sender, receiver, amount, tipo, estado, txid, '
+                'confirmed_round, fecha_creacion, detalle) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)',
+                [(
+                    f'user{rnd.choice(docentes)}', f'user{rnd.choice(alumnos)}', '1.000000',
+                    rnd.choice(['admin_to_docente', 'docente_to_alumno']),
+                    rnd.choices(['confirmed', 'pending', 'failed'], [97, 2, 1])[0],
+                    f'TX{base + i:050d}', None,
+                    (inicio + timedelta(seconds=base + i)).isoformat(), None,
+                ) for i in range(n)],
+            )
+            cursor.executemany(
+                'INSERT INTO wallet_actividadasignada (actividad_id, docente_id, alumno_id, '
+                'fecha_asignacion, monto_algos, txid, estado, nota) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)',
+                [(
+                    rnd.choice(actividades), rnd.choice(docentes), rnd.choice(alumnos),
+                    (inicio + timedelta(seconds=base + i)).isoformat(), '1.000000', f'TX{base + i:050d}',
+                    rnd.choice(['pendiente', 'en_progreso', 'completada']), None,
+                ) for i in range(n)],
+            )
+    connection.cursor().execute('ANALYZE')
+
+
+# Columnas que existen en 0006: la base se mide migrada hasta ahí, así que las consultas
+# no pueden pedir campos que el modelo actual agregó después (p. ej. `fee`, `por_liquidar`).
+COLUMNAS_TRANSACCION = (
+    'id', 'sender', 'receiver', 'amount', 'tipo', 'estado', 'txid', 'confirmed_round', 'fecha_creacion', 'detalle',
+)
+COLUMNAS_ASIGNADA = (
+    'id', 'actividad_id', 'docente_id', 'alumno_id', 'fecha_asignacion', 'monto_algos', 'txid', 'estado', 'nota',
+)
+
+
+def consultas():
+    alumno = User.objects.filter(role='estudiante').order_by('id').values('id', 'username').first()
+    docente = User.objects.filter(role='docente').order_by('id').values('id').first()
+    transacciones = Transaccion.objects.values(*COLUMNAS_TRANSACCION)
+    asignadas = ActividadAsignada.objects.values(*COLUMNAS_ASIGNADA)
+    return {
+        'admin: orden -fecha_creacion': transacciones.order_by('-fecha_creacion')[:100],
+        'admin: estado=pending': transacciones.filter(estado='pending').order_by('-fecha_creacion')[:100],
+        'admin: tipo + rango fecha': transacciones.filter(
+            tipo='admin_to_docente', fecha_creacion__gte=datetime(2025, 1, 5, tzinfo=dt_timezone.utc)
+        ).order_by('-fecha_creacion')[:100],
+        'admin: búsqueda exacta txid': transacciones.filter(txid=f'TX{12345:050d}'),
+        'dashboard: recibidas por alumno': transacciones.filter(
+            Q(receiver=alumno['username']) | Q(sender=alumno['username'])
+        ).order_by('-fecha_creacion')[:50],
+        'tracker: pendientes con txid': transacciones.filter(estado='pending', txid__isnull=False),
+        'dashboard: asignaciones del alumno': asignadas.filter(
+            alumno_id=alumno['id']
+        ).order_by('-fecha_asignacion')[:50],
+        'dashboard: completadas del alumno': asignadas.filter(alumno_id=alumno['id'], estado='completada'),
+        'docente: asignaciones recientes': asignadas.filter(
+            docente_id=docente['id']
+        ).order_by('-fecha_asignacion')[:50],
+        'admin asignadas: estado + orden': asignadas.filter(
+            estado='pendiente'
+        ).order_by('-fecha_asignacion')[:100],
+    }
+
+
+def medir(repeticiones):
+    resultados = {}
+    for nombre, qs in consultas().items():
+        plan = qs.explain()
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            list(qs._chain())
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        resultados[nombre] = (min(tiempos), plan)
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filas', type=int, default=1_000_000)
+    parser.add_argument('--repeticiones', type=int, default=5)
+    args = parser.parse_args()
+
+    call_command('migrate', verbosity=0)
+    call_command('migrate', 'wallet', ANTES, verbosity=0)
+    print(f"Sembrando {args.filas:,} filas en {DB_TEMPORAL} ...")
+    sembrar(args.filas)
+
+    antes = medir(args.repeticiones)
+    call_command('migrate', 'wallet', DESPUES, verbosity=0)
+    connection.cursor().execute('ANALYZE')
+    despues = medir(args.repeticiones)
+
+    for nombre in antes:
+        print(f"\n== {nombre}")
+        print(f"   antes  {antes[nombre][0]:9.2f} ms | {antes[nombre][1]}")
+        print(f"   después{despues[nombre][0]:9.2f} ms | {despues[nombre][1]}")
+
+    DB_TEMPORAL.unlink()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark: latencia por pago con y sin caché de suggested params.
+
+Simula un algod con latencia de red fija y mide cuánto tarda construir y
+firmar un pago pidiendo `suggested_params()` cada vez frente a usar
+`SuggestedParamsProvider`.
+
+Uso (desde algoweb/):
+    python benchmarks/bench_suggested_params.py --pagos 200 --latencia-ms 80
+"""
+
+import argparse
+import base64
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'algoweb.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from algosdk import account, transaction  # noqa: E402
+
+from wallet.params import SuggestedParamsProvider  # noqa: E402
+
+
+class AlgodConLatencia:
+    def __init__(self, latencia):
+        self.latencia = latencia
+        self.llamadas = 0
+
+    def suggested_params(self):
+        self.llamadas += 1
+        time.sleep(self.latencia)
+        return transaction.SuggestedParams(
+            1000, 50_000_000, 50_001_000, base64.b64encode(b'g' * 32).decode(), 'testnet-v1.0', True
+        )
+
+
+def medir(obtener_params, pagos, sender_sk, sender, receptor):
+    tiempos = []
+    for _ in range(pagos):
+        inicio = time.perf_counter()
+        txn = transaction.PaymentTxn(sender, obtener_params(), receptor, 1_000)
+        txn.sign(sender_sk)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return tiempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pagos', type=int, default=200)
+    parser.add_argument('--latencia-ms', type=float, default=80.0)
+    args = parser.parse_args()
+
+    sender_sk, sender = account.generate_account()
+    _, receptor = account.generate_account()
+
+    directo = AlgodConLatencia(args.latencia_ms / 1000)
+    t_directo = medir(directo.suggested_params, args.pagos, sender_sk, sender, receptor)
+
+    cacheado = AlgodConLatencia(args.latencia_ms / 1000)
+    provider = SuggestedParamsProvider(cacheado)
+    t_cache = medir(provider.get, args.pagos, sender_sk, sender, receptor)
+
+    print(f"{'modo':<12}{'llamadas':>10}{'media ms':>12}{'p50 ms':>10}{'p99 ms':>10}")
+    for nombre, cliente, tiempos in (('directo', directo, t_directo), ('provider', cacheado, t_cache)):
+        p99 = statistics.quantiles(tiempos, n=100)[98]
+        print(f"{nombre:<12}{cliente.llamadas:>10}{statistics.mean(tiempos):>12.2f}"
+              f"{statistics.median(tiempos):>10.2f}{p99:>10.2f}")
+    ahorro = statistics.mean(t_directo) - statistics.mean(t_cache)
+    print(f"\nAhorro medio por pago: {ahorro:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
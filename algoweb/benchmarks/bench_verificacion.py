@@ -0,0 +1,95 @@
+"""
+Benchmark: filas por segundo de `reconcile_transactions` (wallet/verificacion.py).
+
+Siembra `--filas` transacciones en una base SQLite temporal y las verifica
+contra un indexer falso que tarda `--latencia-ms` por consulta. Compara la
+verificación fila por fila (1 worker, bloques de 1, como un bucle con
+`.save()`) con bloques de `--bloque` filas y `--workers` consultas en vuelo.
+
+Uso (desde algoweb/):
+    python benchmarks/bench_verificacion.py --filas 20000 --latencia-ms 30 --workers 1 16 32
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'algoweb.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connections  # noqa: E402
+
+from wallet.models import CursorVerificacion, Transaccion  # noqa: E402
+from wallet.verificacion import verificar  # noqa: E402
+
+DIRECTORIO = Path(tempfile.mkdtemp())
+
+
+class IndexerLento:
+    """Responde `transaction` con latencia fija; una de cada diez no existe."""
+
+    def __init__(self, latencia):
+        self.latencia = latencia
+
+    def transaction(self, txid):
+        time.sleep(self.latencia)
+        if txid.endswith('0'):
+            raise Exception(f"no transaction found for transaction id: {txid}")
+        return {'transaction': {'id': txid, 'confirmed-round': 1000, 'fee': 1000}}
+
+
+def sembrar(filas):
+    connections.close_all()
+    connections.settings['default'].update(NAME=str(DIRECTORIO / 'verificacion.sqlite3'))
+    call_command('migrate', verbosity=0)
+    Transaccion.objects.all().delete()
+    Transaccion.objects.bulk_create([
+        Transaccion(sender='doc', receiver=f'alu{i}', amount=1, tipo='admin_to_docente', estado='pending',
+                    txid=f'TX{i}')
+        for i in range(filas)
+    ], batch_size=1000)
+
+
+def medir(indexer, filas, bloque, workers):
+    Transaccion.objects.update(estado='pending', confirmed_round=None)
+    CursorVerificacion.objects.all().delete()
+    inicio = time.perf_counter()
+    cursor = verificar(indexer, bloque=bloque, max_workers=workers, max_filas=filas)
+    return cursor.revisadas / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filas', type=int, default=20_000)
+    parser.add_argument('--latencia-ms', type=float, default=30.0)
+    parser.add_argument('--bloque', type=int, default=500)
+    parser.add_argument('--workers', type=int, nargs='*', default=[1, 16, 32])
+    parser.add_argument('--filas-secuencial', type=int, default=200,
+                        help="Filas para la medición fila por fila (es lenta).")
+    args = parser.parse_args()
+
+    sembrar(args.filas)
+    indexer = IndexerLento(args.latencia_ms / 1000)
+
+    print(f"{'modo':24} {'filas/s':>9} {'tiempo estimado':>16}")
+    por_segundo = medir(indexer, args.filas_secuencial, 1, 1)
+    print(f"{'fila por fila':24} {por_segundo:9.0f} {args.filas / por_segundo:15.0f}s")
+    for workers in args.workers:
+        por_segundo = medir(indexer, args.filas, args.bloque, workers)
+        print(f"{f'bloques, {workers} workers':24} {por_segundo:9.0f} {args.filas / por_segundo:15.0f}s")
+
+    connections.close_all()
+    for archivo in DIRECTORIO.iterdir():
+        archivo.unlink()
+
+
+if __name__ == '__main__':
+    main()
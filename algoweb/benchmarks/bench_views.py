@@ -0,0 +1,174 @@
+"""
+Benchmark: latencia p50/p99 y peticiones por segundo de cada URL de `wallet`.
+
+Crea una base SQLite temporal, siembra un admin, un docente con actividades
+y `--alumnos` alumnos con wallet, asignaciones y movimientos, y sustituye
+algod por `wallet.simulador.AlgodSimulado` con `--latencia-ms` por llamada
+(y `--fallas` de probabilidad de error). Cada URL se pide con `--clientes`
+clientes concurrentes, `--peticiones` veces cada uno, sin tocar la red.
+
+Uso (desde algoweb/):
+    python benchmarks/bench_views.py --clientes 8 --peticiones 25 --latencia-ms 50
+    python benchmarks/bench_views.py --urls dashboard_admin transacciones
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'algoweb.settings')
+
+from django.conf import settings  # noqa: E402
+
+DB_TEMPORAL = Path(tempfile.mkdtemp()) / 'bench_views.sqlite3'
+settings.DATABASES['default']['NAME'] = DB_TEMPORAL
+
+import django  # noqa: E402
+
+django.setup()
+
+from algosdk import account  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connections, transaction  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+from wallet.models import (  # noqa: E402
+    User, Wallet, Alumno, Actividad, ActividadAsignada, Transaccion, MovimientoIndexado,
+)
+from wallet.simulador import AlgodSimulado, LedgerSimulado  # noqa: E402
+
+# (nombre de la URL, rol que la pide, parámetros GET)
+URLS = [
+    ('login', None, {}),
+    ('index', None, {}),
+    ('dashboard_admin', 'admin', {}),
+    ('dashboard_docente', 'docente', {}),
+    ('dashboard_estudiante', 'estudiante', {}),
+    ('mi_wallet', 'estudiante', {}),
+    ('registrar_wallet', 'estudiante', {}),
+    ('get_balance', 'estudiante', {'address': 'ALUMNO'}),
+    ('transacciones', 'estudiante', {}),
+    ('alumnos', 'docente', {}),
+    ('agregar_alumno', 'docente', {}),
+    ('importar_alumnos', 'docente', {}),
+    ('asignar_actividad', 'docente', {}),
+    ('crear_actividad', 'admin', {}),
+    ('enviar_algos_admin', 'admin', {}),
+    ('exportar_ledger', 'admin', {'tabla': 'transacciones', 'hasta': '2000-01-01'}),
+]
+
+
+def sembrar(n_alumnos, ledger):
+    with transaction.atomic():
+        usuarios = {
+            'admin': User.objects.create_user(username='admin', password='x', role='admin', is_staff=True),
+            'docente': User.objects.create_user(username='docente', password='x', role='docente'),
+        }
+        for role, user in usuarios.items():
+            _, address = account.generate_account()
+            Wallet.objects.create(user=user, address=address, private_key='x')
+            ledger.fondear(address, 1_000_000_000)
+        docente = usuarios['docente']
+        actividades = Actividad.objects.bulk_create([
+            Actividad(titulo=f'Act {i}', descripcion='d', docente=docente) for i in range(10)
+        ])
+
+        for i in range(n_alumnos):
+            user = User.objects.create_user(username=f'alumno{i}', password='x')
+            _, address = account.generate_account()
+            wallet = Wallet.objects.create(user=user, address=address, private_key='x')
+            ledger.fondear(address, 5_000_000)
+            Alumno.objects.create(user=user, email=f'a{i}@x.mx', matricula=f'M{i:05d}', wallet=wallet)
+            ActividadAsignada.objects.bulk_create([
+                ActividadAsignada(actividad=a, docente=docente, alumno=user) for a in actividades[:3]
+            ])
+            Transaccion.objects.create(sender='docente', receiver=user.username, amount=1, txid=f'T{i}',
+                                       tipo='docente_to_alumno', estado='confirmed')
+            MovimientoIndexado.objects.bulk_create([
+                MovimientoIndexado(wallet=wallet, txid=f'T{i}-{j}', tipo='pay', sender='DOC', receiver=address,
+                                   amount=1_000_000, confirmed_round=j)
+                for j in range(30)
+            ])
+            if i == 0:
+                usuarios['estudiante'] = user
+    return usuarios
+
+
+def medir_url(nombre, usuario, params, clientes, peticiones):
+    """Devuelve (tiempos en ms, segundos totales, códigos de respuesta)."""
+    url = reverse(nombre)
+    tiempos, codigos = [], {}
+    lock = threading.Lock()
+    listos = threading.Barrier(clientes)
+
+    def trabajar(_):
+        client = Client()
+        if usuario:
+            client.force_login(usuario)
+        propios = []
+        listos.wait()
+        for _ in range(peticiones):
+            inicio = time.perf_counter()
+            response = client.get(url, params)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            propios.append((time.perf_counter() - inicio) * 1000)
+            with lock:
+                codigos[response.status_code] = codigos.get(response.status_code, 0) + 1
+        connections.close_all()
+        with lock:
+            tiempos.extend(propios)
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clientes) as pool:
+        list(pool.map(trabajar, range(clientes)))
+    return tiempos, time.perf_counter() - inicio, codigos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--alumnos', type=int, default=200)
+    parser.add_argument('--clientes', type=int, default=8)
+    parser.add_argument('--peticiones', type=int, default=25, help="Peticiones por cliente y URL.")
+    parser.add_argument('--latencia-ms', type=float, default=50.0, help="Latencia simulada de cada llamada a algod.")
+    parser.add_argument('--fallas', type=float, default=0.0, help="Probabilidad de error 503 en account_info.")
+    parser.add_argument('--urls', nargs='*', help="Sólo estas URLs (por nombre).")
+    args = parser.parse_args()
+
+    setup_test_environment()
+    call_command('migrate', verbosity=0)
+    ledger = LedgerSimulado()
+    algod = AlgodSimulado(ledger, latencia=args.latencia_ms / 1000, fallas={'account_info': args.fallas})
+    print(f"Sembrando {args.alumnos} alumnos en {DB_TEMPORAL} ...")
+    usuarios = sembrar(args.alumnos, ledger)
+    estudiante_address = usuarios['estudiante'].wallet.address
+
+    print(f"\n{'URL':24} {'p50 ms':>9} {'p99 ms':>9} {'req/s':>9}  códigos")
+    with mock.patch('wallet.views.ALGOD_CLIENT', algod), mock.patch('wallet.views.ASYNC_ALGOD_CLIENT', algod):
+        for nombre, role, params in URLS:
+            if args.urls and nombre not in args.urls:
+                continue
+            params = {k: estudiante_address if v == 'ALUMNO' else v for k, v in params.items()}
+            tiempos, total, codigos = medir_url(
+                nombre, usuarios.get(role), params, args.clientes, args.peticiones
+            )
+            percentiles = statistics.quantiles(tiempos, n=100)
+            print(f"{nombre:24} {percentiles[49]:9.2f} {percentiles[98]:9.2f} {len(tiempos) / total:9.1f}  "
+                  f"{dict(sorted(codigos.items()))}")
+
+    print(f"\nLlamadas a algod: {algod.llamadas}")
+    DB_TEMPORAL.unlink()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,12 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.utils.html import format_html
-from .models import User, Wallet, Alumno, Transaccion, ActividadAsignada
-from algosdk.v2client import algod
-
-# =========================
-# CONFIGURACIÓN ALGOD
-# =========================
-ALGOD_CLIENT = algod.AlgodClient("", "https://testnet-api.algonode.cloud")
+from .models import (
+    User, Wallet, Alumno, Transaccion, ActividadAsignada, PagoSaliente, Liquidacion, AsientoLedger, SaldoWallet,
+    CursorVerificacion,
+)
+from .cache import get_account_info, get_many_account_info
+from .clients import ALGOD_CLIENT
 
 
 # =========================
@@ -29,18 +28,45 @@ class CustomUserAdmin(UserAdmin):
 @admin.register(Wallet)
 class WalletAdmin(admin.ModelAdmin):
     list_display = ('user', 'address', 'mostrar_balance')
+    list_select_related = ('user',)
     search_fields = ('user__username', 'address')
     readonly_fields = ('address', 'private_key')
 
+    # Consultas simultáneas y presupuesto total (segundos) para los balances de una página.
+    balance_workers = 8
+    balance_budget = 2.0
+
+    def get_changelist_instance(self, request):
+        """Precarga en paralelo los balances de toda la página antes de renderizarla."""
+        cl = super().get_changelist_instance(request)
+        wallets = list(cl.result_list)
+        infos = get_many_account_info(
+            ALGOD_CLIENT,
+            [w.address for w in wallets],
+            max_workers=self.balance_workers,
+            timeout=self.balance_budget,
+        )
+        for wallet in wallets:
+            wallet._account_info = infos.get(wallet.address)
+        return cl
+
     def mostrar_balance(self, obj):
-        """Consulta el balance en tiempo real desde la red TestNet."""
-        try:
-            account_info = ALGOD_CLIENT.account_info(obj.address)
-            balance = account_info.get('amount', 0) / 1_000_000
-            return f"{balance:.6f} ALGOs"
-        except Exception:
+        """Balance en TestNet, precargado por `get_changelist_instance`."""
+        account_info = getattr(obj, '_account_info', None)
+        if account_info is None:
+            try:
+                account_info = get_account_info(ALGOD_CLIENT, obj.address)
+            except Exception:
+                return "Error/No disponible"
+
+        if isinstance(account_info, TimeoutError):
+            return "⏳ Desconocido"
+        if isinstance(account_info, Exception):
             return "Error/No disponible"
 
+        balance = account_info.get('amount', 0) / 1_000_000
+        return f"{balance:.6f} ALGOs"
+
     mostrar_balance.short_description = "Balance"
 
 
@@ -50,6 +76,7 @@ class WalletAdmin(admin.ModelAdmin):
 @admin.register(Alumno)
 class AlumnoAdmin(admin.ModelAdmin):
     list_display = ('user', 'email', 'matricula', 'wallet')
+    list_select_related = ('user', 'wallet__user')
     search_fields = ('user__username', 'email', 'matricula')
     list_filter = ('user',)
     ordering = ('matricula',)
@@ -69,11 +96,12 @@ class TransaccionAdmin(admin.ModelAdmin):
         'tipo',
         'estado_coloreado',
         'confirmed_round',
+        'fee',
         'fecha_creacion'
     )
     list_filter = ('tipo', 'estado', 'fecha_creacion')
     search_fields = ('txid', 'sender', 'receiver', 'detalle')
-    readonly_fields = ('fecha_creacion', 'confirmed_round', 'txid')
+    readonly_fields = ('fecha_creacion', 'confirmed_round', 'fee', 'txid')
     ordering = ('-fecha_creacion',)
 
     def txid_coloreado(self, obj):
@@ -91,6 +119,7 @@ class TransaccionAdmin(admin.ModelAdmin):
     def estado_coloreado(self, obj):
         """Muestra el estado con color visual."""
         colores = {
+            'queued': 'steelblue',
             'pending': 'orange',
             'confirmed': 'green',
             'failed': 'red'
@@ -112,13 +141,16 @@ class ActividadAsignadaAdmin(admin.ModelAdmin):
         'alumno',
         'monto_algos',
         'estado',
+        'por_liquidar',
         'fecha_asignacion',
         'txid_coloreado'
     )
-    list_filter = ('estado', 'docente', 'fecha_asignacion')
-    search_fields = ('actividad__titulo', 'alumno__user__username', 'docente__username', 'txid')
+    list_select_related = ('actividad__docente', 'docente', 'alumno')
+    list_filter = ('estado', 'por_liquidar', 'docente', 'fecha_asignacion')
+    search_fields = ('actividad__titulo', 'alumno__username', 'docente__username', 'txid')
     ordering = ('-fecha_asignacion',)
-    readonly_fields = ('fecha_asignacion', 'txid', 'docente', 'alumno', 'actividad', 'monto_algos', 'estado')
+    readonly_fields = ('fecha_asignacion', 'txid', 'docente', 'alumno', 'actividad', 'monto_algos', 'estado',
+                       'por_liquidar', 'liquidacion')
 
     def txid_coloreado(self, obj):
         """Abrevia y linkea el TXID si existe."""
@@ -131,3 +163,62 @@ class ActividadAsignadaAdmin(admin.ModelAdmin):
             obj.txid[:10]
         )
     txid_coloreado.short_description = "TxID"
+
+
+# =========================
+# OUTBOX DE PAGOS ADMIN
+# =========================
+@admin.register(PagoSaliente)
+class PagoSalienteAdmin(admin.ModelAdmin):
+    list_display = ('id', 'clave', 'origen', 'receiver', 'monto_algos', 'estado', 'intentos',
+                    'proximo_intento', 'txid')
+    list_select_related = ('origen__user',)
+    list_filter = ('estado',)
+    search_fields = ('clave', 'txid', 'receiver', 'origen__address')
+    ordering = ('-fecha_creacion',)
+    readonly_fields = ('clave', 'origen', 'receiver', 'monto', 'transaccion', 'asignacion', 'liquidacion',
+                       'firmada', 'txid', 'ultima_ronda_valida', 'fecha_creacion', 'fecha_envio')
+
+
+# =========================
+# LIQUIDACIONES ADMIN
+# =========================
+@admin.register(Liquidacion)
+class LiquidacionAdmin(admin.ModelAdmin):
+    list_display = ('id', 'docente', 'alumno', 'monto_algos', 'total_asignaciones', 'estado', 'txid',
+                    'fecha_creacion')
+    list_select_related = ('docente', 'alumno')
+    list_filter = ('estado', 'docente')
+    search_fields = ('docente__username', 'alumno__username', 'txid')
+    ordering = ('-fecha_creacion',)
+    readonly_fields = ('docente', 'alumno', 'monto', 'total_asignaciones', 'estado', 'txid', 'fecha_creacion')
+
+
+# =========================
+# LEDGER LOCAL ADMIN
+# =========================
+@admin.register(SaldoWallet)
+class SaldoWalletAdmin(admin.ModelAdmin):
+    list_display = ('wallet', 'saldo_algos', 'total_pagado', 'total_recibido', 'conciliado')
+    list_select_related = ('wallet__user',)
+    search_fields = ('wallet__user__username', 'wallet__address')
+    readonly_fields = ('wallet', 'saldo', 'total_pagado', 'total_recibido', 'conciliado')
+
+
+@admin.register(AsientoLedger)
+class AsientoLedgerAdmin(admin.ModelAdmin):
+    list_display = ('id', 'wallet', 'tipo', 'monto', 'saldo_resultante', 'transaccion', 'fecha')
+    list_select_related = ('wallet__user', 'transaccion')
+    list_filter = ('tipo',)
+    search_fields = ('wallet__user__username', 'wallet__address', 'transaccion__txid')
+    ordering = ('-id',)
+    readonly_fields = ('wallet', 'transaccion', 'tipo', 'monto', 'saldo_resultante', 'fecha')
+
+
+# =========================
+# VERIFICACIÓN CONTRA EL INDEXER ADMIN
+# =========================
+@admin.register(CursorVerificacion)
+class CursorVerificacionAdmin(admin.ModelAdmin):
+    list_display = ('nombre', 'ultimo_id', 'revisadas', 'corregidas', 'inicio', 'actualizado')
+    readonly_fields = ('nombre', 'ultimo_id', 'revisadas', 'corregidas', 'inicio', 'actualizado')
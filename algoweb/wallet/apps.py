@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class WalletConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'wallet'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from . import signals  # noqa: F401
+        from .metrics import instalar_medidor_sql
+
+        connection_created.connect(instalar_medidor_sql, dispatch_uid='wallet_medidor_sql')
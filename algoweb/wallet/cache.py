@@ -0,0 +1,265 @@
+import asyncio
+import contextvars
+import inspect
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+# =========================
+# CONFIGURACIÓN
+# =========================
+# TTL ≈ una ronda de bloque de Algorand (~3 s); se puede ajustar en settings.
+ACCOUNT_CACHE_SETTINGS = {
+    'TTL': 3.0,
+    'MAX_ENTRIES': 1024,
+    # Alias de CACHES con la versión de cada cuenta. Los saldos viven en la
+    # memoria de cada proceso; la versión, compartida, es lo que hace que un
+    # pago enviado o confirmado por un worker invalide los de los procesos web.
+    'CACHE_VERSIONES': 'versiones',
+}
+ACCOUNT_CACHE_SETTINGS.update(getattr(settings, 'WALLET_ACCOUNT_CACHE', {}))
+
+BALANCE_BATCH_SETTINGS = {
+    # Direcciones máximas por petición a get_balances.
+    'MAX_ADDRESSES': 100,
+    # Consultas a algod simultáneas por petición.
+    'CONCURRENCY': 16,
+    # Presupuesto total (s); las que no lleguen se reportan como error.
+    'TIMEOUT': 2.0,
+}
+BALANCE_BATCH_SETTINGS.update(getattr(settings, 'WALLET_BALANCE_BATCH', {}))
+
+
+# =========================
+# CACHÉ TTL + LRU
+# =========================
+class _Llamada:
+    """Llamada en curso al upstream que comparten todas las peticiones de la misma clave."""
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resultado = None
+        self.error = None
+
+
+class TTLCache:
+    """Caché en memoria con expiración por TTL, desalojo LRU y coalescencia de llamadas."""
+
+    def __init__(self, ttl, max_entries, reloj=time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._reloj = reloj
+        self._datos = OrderedDict()
+        self._en_curso = {}
+        self._en_curso_async = {}
+        self._lock = threading.Lock()
+
+    def get_or_load(self, key, loader):
+        """Devuelve el valor vigente de `key` o lo carga con `loader()` una sola vez."""
+        with self._lock:
+            entrada = self._datos.get(key)
+            if entrada is not None:
+                expira, valor = entrada
+                if expira > self._reloj():
+                    self._datos.move_to_end(key)
+                    return valor
+                del self._datos[key]
+
+            llamada = self._en_curso.get(key)
+            lider = llamada is None
+            if lider:
+                llamada = self._en_curso[key] = _Llamada()
+
+        if not lider:
+            llamada.evento.wait()
+            if llamada.error is not None:
+                raise llamada.error
+            return llamada.resultado
+
+        try:
+            llamada.resultado = loader()
+        except Exception as e:
+            llamada.error = e
+            raise
+        else:
+            with self._lock:
+                # Si se invalidó mientras cargábamos, no guardamos un valor viejo.
+                if self._en_curso.get(key) is llamada:
+                    self._guardar(key, llamada.resultado)
+            return llamada.resultado
+        finally:
+            with self._lock:
+                if self._en_curso.get(key) is llamada:
+                    del self._en_curso[key]
+            llamada.evento.set()
+
+    async def aget_or_load(self, key, loader):
+        """Versión async de `get_or_load`: `loader()` devuelve un awaitable.
+
+        Las corrutinas del mismo loop que piden la misma clave esperan una sola
+        tarea compartida; los hilos y otros loops siguen su propio camino.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entrada = self._datos.get(key)
+            if entrada is not None:
+                expira, valor = entrada
+                if expira > self._reloj():
+                    self._datos.move_to_end(key)
+                    return valor
+                del self._datos[key]
+
+            tarea = self._en_curso_async.get(key)
+            if tarea is None or tarea.get_loop() is not loop:
+                tarea = self._en_curso_async[key] = asyncio.ensure_future(loader())
+                tarea.add_done_callback(lambda t: self._terminar_async(key, t))
+
+        # shield: si una petición se cancela, la carga sigue para las demás.
+        return await asyncio.shield(tarea)
+
+    def _terminar_async(self, key, tarea):
+        with self._lock:
+            if self._en_curso_async.get(key) is not tarea:
+                return  # invalidada mientras cargaba
+            del self._en_curso_async[key]
+            if not tarea.cancelled() and tarea.exception() is None:
+                self._guardar(key, tarea.result())
+
+    def _guardar(self, key, valor):
+        self._datos[key] = (self._reloj() + self.ttl, valor)
+        self._datos.move_to_end(key)
+        while len(self._datos) > self.max_entries:
+            self._datos.popitem(last=False)
+
+    def invalidate(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._datos.pop(key, None)
+                self._en_curso.pop(key, None)
+                self._en_curso_async.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._datos.clear()
+            self._en_curso.clear()
+            self._en_curso_async.clear()
+
+    def __len__(self):
+        return len(self._datos)
+
+
+ACCOUNT_CACHE = TTLCache(
+    ttl=ACCOUNT_CACHE_SETTINGS['TTL'],
+    max_entries=ACCOUNT_CACHE_SETTINGS['MAX_ENTRIES'],
+)
+
+
+# =========================
+# CUENTAS ALGORAND
+# =========================
+def _versiones():
+    return caches[ACCOUNT_CACHE_SETTINGS['CACHE_VERSIONES']]
+
+
+def _llave_version(address):
+    return f'cuentas:version:{address}'
+
+
+def get_account_info(client, address):
+    """`client.account_info(address)` servido desde la caché compartida."""
+    llave = (address, _versiones().get(_llave_version(address), 0))
+    return ACCOUNT_CACHE.get_or_load(llave, lambda: client.account_info(address))
+
+
+async def aget_account_info(client, address):
+    """Versión async de `get_account_info`.
+
+    Con un cliente async (`AsyncPooledAlgodClient`) la llamada no ocupa
+    ningún hilo; con uno síncrono se delega a un hilo del pool por defecto.
+    """
+    llave = (address, await _versiones().aget(_llave_version(address), 0))
+    if inspect.iscoroutinefunction(getattr(client, 'algod_request', None)):
+        return await ACCOUNT_CACHE.aget_or_load(llave, lambda: client.account_info(address))
+
+    loop = asyncio.get_running_loop()
+    contexto = contextvars.copy_context()
+    return await ACCOUNT_CACHE.aget_or_load(
+        llave, lambda: loop.run_in_executor(None, contexto.run, client.account_info, address)
+    )
+
+
+def invalidate_accounts(*addresses):
+    """Descarta las entradas de las cuentas cuyo saldo acaba de cambiar, en todos los procesos.
+
+    Sube la versión compartida de cada cuenta: las entradas de `ACCOUNT_CACHE`
+    guardadas bajo la versión anterior ya no se leen en ningún proceso y
+    salen por TTL o LRU.
+    """
+    # Un valor nuevo con `set` (no `incr`, que lee y escribe por separado), como fragmentos._subir.
+    _versiones().set_many({_llave_version(a): uuid.uuid4().hex for a in addresses if a}, timeout=None)
+
+
+def get_many_account_info(client, addresses, max_workers=8, timeout=2.0):
+    """Consulta varias cuentas en paralelo con un presupuesto total de `timeout` segundos.
+
+    Devuelve {address: info}; las cuentas que fallan o no responden a tiempo
+    quedan con la excepción correspondiente (`TimeoutError` si no llegaron).
+    Las consultas que siguen en curso terminan en segundo plano y llenan la caché.
+    """
+    direcciones = list(dict.fromkeys(addresses))
+    if not direcciones:
+        return {}
+
+    pool = ThreadPoolExecutor(max_workers=min(max_workers, len(direcciones)))
+    # copy_context: las llamadas de los hilos cuentan para la petición que las originó (metrics).
+    futuros = {pool.submit(contextvars.copy_context().run, get_account_info, client, a): a for a in direcciones}
+    wait(futuros, timeout=timeout)
+    pool.shutdown(wait=False, cancel_futures=True)
+
+    resultados = {}
+    for futuro, address in futuros.items():
+        if not futuro.done() or futuro.cancelled():
+            resultados[address] = TimeoutError("Sin respuesta dentro del presupuesto")
+        elif futuro.exception() is not None:
+            resultados[address] = futuro.exception()
+        else:
+            resultados[address] = futuro.result()
+    return resultados
+
+
+async def aget_many_account_info(client, addresses, max_concurrency=8, timeout=2.0):
+    """Versión async de `get_many_account_info`, con a lo sumo `max_concurrency` consultas a la vez.
+
+    Las consultas que exceden el presupuesto se reportan con `TimeoutError`;
+    la carga compartida en la caché sigue y queda lista para la próxima vez.
+    """
+    direcciones = list(dict.fromkeys(addresses))
+    if not direcciones:
+        return {}
+
+    cupos = asyncio.Semaphore(max_concurrency)
+
+    async def consultar(address):
+        async with cupos:
+            return await aget_account_info(client, address)
+
+    tareas = {address: asyncio.ensure_future(consultar(address)) for address in direcciones}
+    _, pendientes = await asyncio.wait(tareas.values(), timeout=timeout)
+    for tarea in pendientes:
+        tarea.cancel()
+
+    resultados = {}
+    for address, tarea in tareas.items():
+        if tarea in pendientes:
+            resultados[address] = TimeoutError("Sin respuesta dentro del presupuesto")
+        elif tarea.exception() is not None:
+            resultados[address] = tarea.exception()
+        else:
+            resultados[address] = tarea.result()
+    return resultados
@@ -0,0 +1,331 @@
+import asyncio
+import http.client
+import json
+import re
+import threading
+import time
+import weakref
+from collections import defaultdict
+from urllib import parse
+
+import httpx
+from algosdk import constants, error, transaction
+from algosdk.v2client import algod, indexer
+from django.conf import settings
+
+from . import metrics
+
+
+# =========================
+# CONFIGURACIÓN
+# =========================
+CLIENT_SETTINGS = {
+    'ALGOD_ADDRESS': 'https://testnet-api.algonode.cloud',
+    'ALGOD_TOKEN': '',
+    'INDEXER_ADDRESS': 'https://testnet-idx.algonode.cloud',
+    'INDEXER_TOKEN': '',
+    # Segundos por petición HTTP.
+    'TIMEOUT': 10,
+    # Conexiones keep-alive simultáneas por host.
+    'POOL_SIZE': 10,
+}
+CLIENT_SETTINGS.update(getattr(settings, 'WALLET_ALGORAND_CLIENTS', {}))
+
+
+# =========================
+# POOL HTTP KEEP-ALIVE
+# =========================
+class HTTPConnectionPool:
+    """Pool acotado de conexiones HTTP(S) persistentes hacia un solo host, seguro entre hilos."""
+
+    def __init__(self, base_url, size, timeout):
+        url = parse.urlsplit(base_url)
+        self.scheme = url.scheme
+        self.host = url.hostname
+        self.port = url.port
+        self.prefix = url.path.rstrip('/')
+        self.timeout = timeout
+        self._libres = []
+        self._lock = threading.Lock()
+        self._cupos = threading.BoundedSemaphore(size)
+
+    def _nueva_conexion(self, timeout):
+        clase = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+        return clase(self.host, self.port, timeout=timeout)
+
+    def request(self, method, path, body=None, headers=None, timeout=None):
+        """Ejecuta la petición y devuelve `(status, body)`; reutiliza conexiones libres."""
+        timeout = timeout or self.timeout
+        with self._cupos:
+            with self._lock:
+                conn = self._libres.pop() if self._libres else None
+            reutilizada = conn is not None
+            if conn is None:
+                conn = self._nueva_conexion(timeout)
+
+            try:
+                try:
+                    status, datos = self._enviar(conn, method, path, body, headers, timeout)
+                except (http.client.HTTPException, ConnectionError):
+                    if not reutilizada:
+                        raise
+                    # El servidor cerró la conexión keep-alive: reintentamos con una nueva.
+                    conn.close()
+                    conn = self._nueva_conexion(timeout)
+                    status, datos = self._enviar(conn, method, path, body, headers, timeout)
+            except BaseException:
+                # También la conexión del reintento: si falla no vuelve al pool ni queda abierta.
+                conn.close()
+                raise
+
+            with self._lock:
+                self._libres.append(conn)
+            return status, datos
+
+    def _enviar(self, conn, method, path, body, headers, timeout):
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        conn.request(method, self.prefix + path, body=body, headers=headers or {})
+        resp = conn.getresponse()
+        return resp.status, resp.read()
+
+    def close(self):
+        with self._lock:
+            for conn in self._libres:
+                conn.close()
+            self._libres.clear()
+
+
+class AsyncHTTPConnectionPool:
+    """Versión asyncio de `HTTPConnectionPool`, sobre `httpx.AsyncClient`.
+
+    Las conexiones de httpx pertenecen al event loop que las abrió, así que
+    el pool guarda un `AsyncClient` por loop.
+    """
+
+    def __init__(self, base_url, size, timeout):
+        self.base_url = base_url
+        self.limits = httpx.Limits(max_connections=size, max_keepalive_connections=size)
+        self.timeout = timeout
+        self._por_loop = weakref.WeakKeyDictionary()
+
+    def _cliente(self):
+        loop = asyncio.get_running_loop()
+        cliente = self._por_loop.get(loop)
+        if cliente is None or cliente.is_closed:
+            cliente = self._por_loop[loop] = httpx.AsyncClient(
+                base_url=self.base_url, limits=self.limits, timeout=self.timeout,
+            )
+        return cliente
+
+    async def request(self, method, path, body=None, headers=None, timeout=None):
+        """Ejecuta la petición y devuelve `(status, body)`; reutiliza conexiones libres."""
+        resp = await self._cliente().request(
+            method, path, content=body, headers=headers, timeout=timeout or self.timeout,
+        )
+        return resp.status_code, resp.content
+
+    async def close(self):
+        """Cierra el cliente del loop actual."""
+        cliente = self._por_loop.pop(asyncio.get_running_loop(), None)
+        if cliente is not None:
+            await cliente.aclose()
+
+
+# =========================
+# CONTADORES POR ENDPOINT
+# =========================
+_SEGMENTO_VARIABLE = re.compile(r'^([A-Z2-7]{52}|[A-Z2-7]{58}|\d+)$')
+
+
+def _endpoint(path):
+    """`/v2/accounts/ABC...` -> `/v2/accounts/{id}` para agrupar las llamadas."""
+    path = path.split('?', 1)[0]
+    return '/'.join('{id}' if _SEGMENTO_VARIABLE.match(s) else s for s in path.split('/'))
+
+
+class CallCounters:
+    """Número de llamadas, errores y segundos acumulados por (servicio, método, endpoint)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._datos = defaultdict(lambda: {'calls': 0, 'errors': 0, 'seconds': 0.0})
+
+    def registrar(self, servicio, method, path, segundos, ok=True):
+        with self._lock:
+            fila = self._datos[(servicio, method, _endpoint(path))]
+            fila['calls'] += 1
+            fila['seconds'] += segundos
+            if not ok:
+                fila['errors'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {clave: dict(fila) for clave, fila in self._datos.items()}
+
+    def reset(self):
+        with self._lock:
+            self._datos.clear()
+
+
+CALL_COUNTERS = CallCounters()
+
+
+def _pedir(pool, servicio, method, path, data, headers, timeout):
+    inicio = time.perf_counter()
+    ok = False
+    try:
+        status, cuerpo = pool.request(method, path, body=data, headers=headers, timeout=timeout)
+        ok = status < 400
+        return status, cuerpo
+    finally:
+        segundos = time.perf_counter() - inicio
+        CALL_COUNTERS.registrar(servicio, method, path, segundos, ok)
+        metrics.registrar_upstream(servicio, method, _endpoint(path), segundos, ok)
+
+
+async def _apedir(pool, servicio, method, path, data, headers, timeout):
+    inicio = time.perf_counter()
+    ok = False
+    try:
+        status, cuerpo = await pool.request(method, path, body=data, headers=headers, timeout=timeout)
+        ok = status < 400
+        return status, cuerpo
+    finally:
+        segundos = time.perf_counter() - inicio
+        CALL_COUNTERS.registrar(servicio, method, path, segundos, ok)
+        metrics.registrar_upstream(servicio, method, _endpoint(path), segundos, ok)
+
+
+def _mensaje_error(cuerpo):
+    try:
+        j = json.loads(cuerpo.decode('utf-8'))
+        return j.get('message', cuerpo.decode('utf-8')), j
+    except Exception:
+        return cuerpo.decode('utf-8', 'replace'), {}
+
+
+# =========================
+# CLIENTES ALGOD / INDEXER
+# =========================
+def _preparar_algod(client, requrl, params, headers):
+    """URL versionada y cabeceras (con token) como las arma `AlgodClient`."""
+    header = {"User-Agent": "py-algorand-sdk"}
+    if client.headers:
+        header.update(client.headers)
+    if headers:
+        header.update(headers)
+    if requrl not in constants.no_auth:
+        header.update({constants.algod_auth_header: client.algod_token})
+
+    if requrl not in constants.unversioned_paths:
+        requrl = algod.api_version_path_prefix + requrl
+    if params:
+        requrl = requrl + "?" + parse.urlencode(params)
+    return requrl, header
+
+
+def _respuesta_algod(status, cuerpo, response_format):
+    if status >= 400:
+        mensaje, j = _mensaje_error(cuerpo)
+        raise error.AlgodHTTPError(mensaje, status, j.get("data"))
+
+    if response_format != "json":
+        return cuerpo
+    if not cuerpo:
+        return {}
+    try:
+        return json.loads(cuerpo)
+    except Exception as e:
+        raise error.AlgodResponseError("Failed to parse JSON response from algod") from e
+
+
+class PooledAlgodClient(algod.AlgodClient):
+    """`AlgodClient` que envía todas las peticiones por un `HTTPConnectionPool` compartido."""
+
+    def __init__(self, algod_token, algod_address, headers=None, pool_size=None, timeout=None):
+        super().__init__(algod_token, algod_address, headers)
+        self.pool = HTTPConnectionPool(
+            algod_address,
+            pool_size or CLIENT_SETTINGS['POOL_SIZE'],
+            timeout or CLIENT_SETTINGS['TIMEOUT'],
+        )
+
+    def algod_request(self, method, requrl, params=None, data=None, headers=None,
+                      response_format="json", timeout=None):
+        requrl, header = _preparar_algod(self, requrl, params, headers)
+        status, cuerpo = _pedir(self.pool, 'algod', method, requrl, data, header, timeout)
+        return _respuesta_algod(status, cuerpo, response_format)
+
+
+class AsyncPooledAlgodClient(algod.AlgodClient):
+    """`AlgodClient` cuyo `algod_request` es una corrutina sobre un `AsyncHTTPConnectionPool`.
+
+    Los métodos del SDK que sólo delegan en `algod_request` (`account_info`,
+    `status`, `pending_transaction_info`...) devuelven así un awaitable. Los
+    que procesan la respuesta, como `suggested_params`, se redefinen aquí.
+    """
+
+    def __init__(self, algod_token, algod_address, headers=None, pool_size=None, timeout=None):
+        super().__init__(algod_token, algod_address, headers)
+        self.pool = AsyncHTTPConnectionPool(
+            algod_address,
+            pool_size or CLIENT_SETTINGS['POOL_SIZE'],
+            timeout or CLIENT_SETTINGS['TIMEOUT'],
+        )
+
+    async def algod_request(self, method, requrl, params=None, data=None, headers=None,
+                            response_format="json", timeout=None):
+        requrl, header = _preparar_algod(self, requrl, params, headers)
+        status, cuerpo = await _apedir(self.pool, 'algod', method, requrl, data, header, timeout)
+        return _respuesta_algod(status, cuerpo, response_format)
+
+    async def suggested_params(self, **kwargs):
+        res = await self.algod_request("GET", "/transactions/params", **kwargs)
+        return transaction.SuggestedParams(
+            res["fee"], res["last-round"], res["last-round"] + 1000, res["genesis-hash"], res["genesis-id"],
+            False, res["consensus-version"], res["min-fee"],
+        )
+
+
+class PooledIndexerClient(indexer.IndexerClient):
+    """`IndexerClient` que envía todas las peticiones por un `HTTPConnectionPool` compartido."""
+
+    def __init__(self, indexer_token, indexer_address, headers=None, pool_size=None, timeout=None):
+        super().__init__(indexer_token, indexer_address, headers)
+        self.pool = HTTPConnectionPool(
+            indexer_address,
+            pool_size or CLIENT_SETTINGS['POOL_SIZE'],
+            timeout or CLIENT_SETTINGS['TIMEOUT'],
+        )
+
+    def indexer_request(self, method, requrl, params=None, data=None, headers=None, timeout=None):
+        header = {"User-Agent": "py-algorand-sdk"}
+        if self.headers:
+            header.update(self.headers)
+        if headers:
+            header.update(headers)
+        if (requrl not in constants.no_auth) and self.indexer_token:
+            header.update({constants.indexer_auth_header: self.indexer_token})
+
+        if requrl not in constants.unversioned_paths:
+            requrl = indexer.api_version_path_prefix + requrl
+        if params:
+            requrl = requrl + "?" + parse.urlencode(params)
+
+        status, cuerpo = _pedir(self.pool, 'indexer', method, requrl, data, header, timeout)
+        if status >= 400:
+            mensaje, _ = _mensaje_error(cuerpo)
+            raise error.IndexerHTTPError(mensaje)
+        return json.loads(cuerpo.decode("utf-8"))
+
+
+ALGOD_CLIENT = PooledAlgodClient(CLIENT_SETTINGS['ALGOD_TOKEN'], CLIENT_SETTINGS['ALGOD_ADDRESS'])
+ASYNC_ALGOD_CLIENT = AsyncPooledAlgodClient(CLIENT_SETTINGS['ALGOD_TOKEN'], CLIENT_SETTINGS['ALGOD_ADDRESS'])
+INDEXER_CLIENT = PooledIndexerClient(CLIENT_SETTINGS['INDEXER_TOKEN'], CLIENT_SETTINGS['INDEXER_ADDRESS'])
+
+
+def call_counts():
+    """Copia de los contadores por endpoint de ambos clientes."""
+    return CALL_COUNTERS.snapshot()
@@ -0,0 +1,192 @@
+import asyncio
+import json
+import logging
+import weakref
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Q
+
+from .cache import aget_many_account_info
+from .models import Transaccion
+
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# CONFIGURACIÓN
+# =========================
+EVENTOS_SETTINGS = {
+    # Segundos entre revisiones del vigilante (≈ una ronda de Algorand).
+    'INTERVALO': 3.0,
+    # Comentario `: keepalive` si una conexión pasa este tiempo sin eventos.
+    'KEEPALIVE': 15.0,
+    # Eventos que se guardan por pestaña si el navegador no alcanza a leerlos.
+    'MAX_COLA': 100,
+    # Consultas simultáneas a algod en cada revisión.
+    'CONCURRENCIA': 16,
+}
+EVENTOS_SETTINGS.update(getattr(settings, 'WALLET_EVENTOS', {}))
+
+ESTADOS_FINALES = ('confirmed', 'failed')
+
+
+def formatear(evento, datos):
+    """Un evento en el formato de texto de Server-Sent Events."""
+    return f"event: {evento}\ndata: {json.dumps(datos)}\n\n"
+
+
+# =========================
+# VIGILANTE
+# =========================
+class Vigilante:
+    """Una tarea por proceso que revisa saldos y `Transaccion` de las wallets con pestañas abiertas.
+
+    Cada revisión hace una consulta a algod por dirección suscrita (pasando
+    por `ACCOUNT_CACHE`) y una sola query de transacciones para todas, sin
+    importar cuántas pestañas escuchen la misma wallet. Los cambios se
+    reparten a las colas de los suscriptores. La tarea arranca con la
+    primera suscripción y se detiene cuando se va la última.
+    """
+
+    def __init__(self, client, intervalo=None):
+        self.client = client
+        self.intervalo = intervalo or EVENTOS_SETTINGS['INTERVALO']
+        # address -> colas de las pestañas abiertas
+        self._colas = {}
+        self._usuarios = {}
+        self._saldos = {}
+        # id de Transaccion -> (estado ya anunciado, {sender, receiver}); sólo se siguen las no finales
+        self._estados = {}
+        self._ultimo_id = None
+        self._tarea = None
+
+    def suscribir(self, address, username):
+        """Cola de eventos para una pestaña nueva de la wallet `address`."""
+        cola = asyncio.Queue(EVENTOS_SETTINGS['MAX_COLA'])
+        self._colas.setdefault(address, set()).add(cola)
+        self._usuarios[address] = username
+        if address in self._saldos:
+            cola.put_nowait(('balance', {'address': address, 'balance': self._saldos[address]}))
+        if self._tarea is None or self._tarea.done():
+            self._tarea = asyncio.ensure_future(self._vigilar())
+        return cola
+
+    def desuscribir(self, address, cola):
+        colas = self._colas.get(address, set())
+        colas.discard(cola)
+        if not colas:
+            self._colas.pop(address, None)
+            self._saldos.pop(address, None)
+            username = self._usuarios.pop(address, None)
+            activos = set(self._usuarios.values())
+            if username not in activos:
+                # Nadie más escucha a este usuario: se dejan de seguir sus transacciones.
+                self._estados = {i: e for i, e in self._estados.items() if e[1] & activos}
+        if not self._colas and self._tarea is not None:
+            self._tarea.cancel()
+            self._tarea = None
+
+    def _publicar(self, address, evento, datos):
+        for cola in self._colas.get(address, ()):
+            if cola.full():
+                # Una pestaña que no lee no frena a las demás: se descarta su evento más viejo.
+                cola.get_nowait()
+            cola.put_nowait((evento, datos))
+
+    async def _vigilar(self):
+        while self._colas:
+            try:
+                await self.revisar()
+            except Exception as e:
+                logger.warning("Error revisando eventos de wallets: %s", e)
+            await asyncio.sleep(self.intervalo)
+
+    async def revisar(self):
+        """Una revisión: publica los saldos que cambiaron y las transiciones de `Transaccion`."""
+        direcciones = list(self._colas)
+        if not direcciones:
+            return
+        infos = await aget_many_account_info(
+            self.client, direcciones, max_concurrency=EVENTOS_SETTINGS['CONCURRENCIA'], timeout=self.intervalo
+        )
+        for address, info in infos.items():
+            if isinstance(info, Exception) or address not in self._colas:
+                continue
+            saldo = info.get('amount', 0) / 1_000_000
+            if self._saldos.get(address) != saldo:
+                self._saldos[address] = saldo
+                self._publicar(address, 'balance', {'address': address, 'balance': saldo})
+
+        for tx in await sync_to_async(self._transacciones_cambiadas)():
+            for address, username in list(self._usuarios.items()):
+                if username in (tx['sender'], tx['receiver']):
+                    self._publicar(address, 'transaccion', tx)
+
+    def _transacciones_cambiadas(self):
+        usuarios = set(self._usuarios.values())
+        if self._ultimo_id is None:
+            # Al arrancar sólo interesan las que siguen en curso; el historial ya está en la página.
+            self._ultimo_id = Transaccion.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        filas = Transaccion.objects.filter(
+            Q(sender__in=usuarios) | Q(receiver__in=usuarios),
+            Q(id__gt=self._ultimo_id) | Q(id__in=list(self._estados)) | ~Q(estado__in=ESTADOS_FINALES),
+        ).values('id', 'sender', 'receiver', 'amount', 'tipo', 'estado', 'txid')
+
+        cambiadas = []
+        for fila in filas:
+            self._ultimo_id = max(self._ultimo_id, fila['id'])
+            anterior = self._estados.get(fila['id'], (None,))[0]
+            if anterior == fila['estado']:
+                continue
+            if fila['estado'] in ESTADOS_FINALES:
+                self._estados.pop(fila['id'], None)
+            else:
+                self._estados[fila['id']] = (fila['estado'], {fila['sender'], fila['receiver']})
+            cambiadas.append(dict(fila, amount=float(fila['amount']), anterior=anterior))
+        return cambiadas
+
+
+_VIGILANTES = weakref.WeakKeyDictionary()
+
+
+def obtener_vigilante(client):
+    """El vigilante del event loop en curso (uno por worker ASGI)."""
+    loop = asyncio.get_running_loop()
+    vigilante = _VIGILANTES.get(loop)
+    if vigilante is None or vigilante.client is not client:
+        vigilante = _VIGILANTES[loop] = Vigilante(client)
+    return vigilante
+
+
+class Flujo:
+    """Cuerpo de la respuesta SSE de una pestaña.
+
+    `StreamingHttpResponse` llama a `close()` al terminar la respuesta,
+    también cuando el navegador se desconecta: ahí se da de baja la pestaña.
+    """
+
+    def __init__(self, vigilante, address, username):
+        self.vigilante = vigilante
+        self.address = address
+        self.username = username
+        self.cola = None
+
+    def __aiter__(self):
+        return self._eventos()
+
+    async def _eventos(self):
+        self.cola = self.vigilante.suscribir(self.address, self.username)
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                evento, datos = await asyncio.wait_for(self.cola.get(), EVENTOS_SETTINGS['KEEPALIVE'])
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+            else:
+                yield formatear(evento, datos)
+
+    def close(self):
+        if self.cola is not None:
+            self.vigilante.desuscribir(self.address, self.cola)
+            self.cola = None
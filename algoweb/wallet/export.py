@@ -0,0 +1,126 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import Transaccion, ActividadAsignada
+
+
+# =========================
+# TABLAS EXPORTABLES
+# =========================
+EXPORTABLES = {
+    'transacciones': {
+        'modelo': Transaccion,
+        'campos': ['id', 'txid', 'sender', 'receiver', 'amount', 'tipo', 'estado', 'confirmed_round',
+                   'fecha_creacion', 'detalle'],
+        'fecha': 'fecha_creacion',
+    },
+    'asignaciones': {
+        'modelo': ActividadAsignada,
+        'campos': ['id', 'actividad_id', 'actividad__titulo', 'docente__username', 'alumno__username',
+                   'monto_algos', 'txid', 'estado', 'nota', 'fecha_asignacion'],
+        'fecha': 'fecha_asignacion',
+    },
+}
+
+CHUNK_SIZE = 2000
+
+
+def _inicio_del_dia(fecha):
+    return timezone.make_aware(datetime.combine(fecha, time.min))
+
+
+def consulta_exportacion(tabla, desde=None, hasta=None, tipo=None, estado=None):
+    """Queryset `values_list` ordenado por id con los filtros del auditor.
+
+    `desde`/`hasta` son fechas `YYYY-MM-DD` inclusivas. `tipo` sólo aplica a
+    transacciones. Lanza `ValueError` si algún filtro no es válido.
+    """
+    if tabla not in EXPORTABLES:
+        raise ValueError(f"Tabla desconocida: {tabla}")
+    config = EXPORTABLES[tabla]
+    qs = config['modelo'].objects.all()
+
+    for valor, operador, delta in ((desde, 'gte', 0), (hasta, 'lt', 1)):
+        if not valor:
+            continue
+        fecha = parse_date(valor)
+        if fecha is None:
+            raise ValueError(f"Fecha inválida: {valor}")
+        qs = qs.filter(**{f"{config['fecha']}__{operador}": _inicio_del_dia(fecha + timedelta(days=delta))})
+
+    if tipo:
+        if tabla != 'transacciones':
+            raise ValueError("El filtro 'tipo' sólo aplica a transacciones")
+        qs = qs.filter(tipo=tipo)
+    if estado:
+        qs = qs.filter(estado=estado)
+
+    return qs.order_by('id').values_list(*config['campos'])
+
+
+# =========================
+# SERIALIZACIÓN EN STREAMING
+# =========================
+def _valor(v):
+    if v is None:
+        return None
+    if isinstance(v, datetime):
+        return v.isoformat()
+    if isinstance(v, (int, str)):
+        return v
+    return str(v)
+
+
+def _csv(campos, filas):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(campos)
+    for fila in filas:
+        writer.writerow(['' if v is None else _valor(v) for v in fila])
+        if buffer.tell() > 64 * 1024:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+def _jsonl(campos, filas):
+    lote = []
+    for fila in filas:
+        lote.append(json.dumps(dict(zip(campos, map(_valor, fila))), ensure_ascii=False))
+        if len(lote) >= 1000:
+            yield ('\n'.join(lote) + '\n').encode()
+            lote = []
+    if lote:
+        yield ('\n'.join(lote) + '\n').encode()
+
+
+def _gzip(chunks):
+    compresor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> formato gzip
+    for chunk in chunks:
+        comprimido = compresor.compress(chunk)
+        if comprimido:
+            yield comprimido
+    yield compresor.flush()
+
+
+def exportar(tabla, formato='csv', comprimir=True, **filtros):
+    """Iterador de bytes con la exportación completa; memoria constante sin importar el tamaño."""
+    if formato not in ('csv', 'jsonl'):
+        raise ValueError(f"Formato desconocido: {formato}")
+    qs = consulta_exportacion(tabla, **filtros)
+    campos = EXPORTABLES[tabla]['campos']
+    filas = qs.iterator(chunk_size=CHUNK_SIZE)
+    chunks = _csv(campos, filas) if formato == 'csv' else _jsonl(campos, filas)
+    return _gzip(chunks) if comprimir else chunks
+
+
+def nombre_archivo(tabla, formato, comprimir=True):
+    sufijo = '.gz' if comprimir else ''
+    return f"{tabla}-{timezone.localdate():%Y%m%d}.{formato}{sufijo}"
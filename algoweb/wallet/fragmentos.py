@@ -0,0 +1,76 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+# =========================
+# CONFIGURACIÓN
+# =========================
+FRAGMENTOS_SETTINGS = {
+    # Alias de CACHES donde viven los fragmentos (puede ser por proceso).
+    'CACHE': 'fragmentos',
+    # Alias de CACHES de los contadores de versión. Debe ser compartido por todos
+    # los procesos: si cada worker tuviera los suyos, un cambio hecho en uno no
+    # invalidaría los fragmentos que los demás tienen en memoria.
+    'CACHE_VERSIONES': 'versiones',
+}
+FRAGMENTOS_SETTINGS.update(getattr(settings, 'WALLET_FRAGMENTOS', {}))
+
+# Cada grupo es un contador; los `{% cache %}` que dependen de él lo llevan en la llave.
+GRUPOS = ('actividades', 'alumnos', 'resumenes')
+
+
+# =========================
+# VERSIONES POR GRUPO
+# =========================
+def _cache():
+    return caches[FRAGMENTOS_SETTINGS['CACHE_VERSIONES']]
+
+
+def _llave(grupo):
+    return f'fragmentos:version:{grupo}'
+
+
+def version(grupo):
+    cache = _cache()
+    valor = cache.get(_llave(grupo))
+    if valor is None:
+        # Una versión nueva al azar: si la anterior se perdió, la nueva no
+        # coincide con fragmentos viejos que sigan en la caché.
+        cache.add(_llave(grupo), uuid.uuid4().hex, timeout=None)
+        valor = cache.get(_llave(grupo))
+    return valor
+
+
+def _subir(grupos):
+    # `set` de un valor nuevo y no `incr`: incr lee y escribe por separado y dos
+    # procesos que suben a la vez pueden dejar la misma versión. Con set cada uno
+    # deja una distinta de la anterior, que es todo lo que importa.
+    _cache().set_many({_llave(grupo): uuid.uuid4().hex for grupo in grupos}, timeout=None)
+
+
+def invalidar(*grupos):
+    """Sube la versión de `grupos`: los fragmentos que dependen de ellos se vuelven a renderizar.
+
+    Se sube de inmediato y otra vez al confirmar la transacción, para que
+    una petición que leyó los datos viejos antes del commit no deje su
+    fragmento cacheado bajo la versión nueva.
+    """
+    _subir(grupos)
+    transaction.on_commit(lambda: _subir(grupos))
+
+
+class Versiones:
+    """`{{ versiones.<grupo> }}` en plantillas; sólo consulta la caché al usarse."""
+
+    def __getitem__(self, grupo):
+        if grupo not in GRUPOS:
+            raise KeyError(grupo)
+        return version(grupo)
+
+
+def versiones(request):
+    """Context processor para las llaves de `{% cache ... versiones.actividades %}`."""
+    return {'versiones': Versiones()}
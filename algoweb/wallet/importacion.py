@@ -0,0 +1,193 @@
+import csv
+import io
+import unicodedata
+
+from django.conf import settings
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX, make_password
+from django.contrib.auth.tokens import default_token_generator
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models import Q
+from django.urls import reverse
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from . import fragmentos, summaries
+from .keypool import reclamar_llaves
+from .models import User, Wallet, Alumno
+
+
+# =========================
+# CONFIGURACIÓN
+# =========================
+IMPORT_SETTINGS = {
+    # Alumnos por lote de bulk_create (User, Wallet y Alumno).
+    'BATCH_SIZE': 500,
+}
+IMPORT_SETTINGS.update(getattr(settings, 'WALLET_IMPORT_ALUMNOS', {}))
+
+COLUMNAS = ('nombre', 'email', 'matricula')
+
+
+# =========================
+# LECTURA DEL CSV
+# =========================
+def _normalizar(columna):
+    sin_acentos = unicodedata.normalize('NFKD', columna).encode('ascii', 'ignore').decode()
+    return sin_acentos.strip().lower()
+
+
+def leer_csv(contenido):
+    """Lista de `(linea, datos)` de un CSV con encabezado `nombre,email,matricula[,username]`.
+
+    Acepta bytes o str y `,`, `;` o tabuladores como separador, que es lo que
+    exportan las hojas de cálculo. Lanza `ValueError` si faltan columnas.
+    """
+    if isinstance(contenido, bytes):
+        try:
+            contenido = contenido.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise ValueError("El archivo debe estar en UTF-8.")
+    try:
+        dialecto = csv.Sniffer().sniff(contenido[:4096], delimiters=',;\t')
+    except csv.Error:
+        dialecto = csv.excel
+
+    lector = csv.reader(io.StringIO(contenido), dialecto)
+    encabezado = [_normalizar(c) for c in next(lector, [])]
+    faltan = [c for c in COLUMNAS if c not in encabezado]
+    if faltan:
+        raise ValueError(f"Faltan columnas: {', '.join(faltan)}")
+
+    filas = []
+    for fila in lector:
+        if any(valor.strip() for valor in fila):
+            filas.append((lector.line_num, {c: v.strip() for c, v in zip(encabezado, fila)}))
+    return filas
+
+
+# =========================
+# IMPORTACIÓN
+# =========================
+class ResultadoImportacion:
+    def __init__(self):
+        self.creados = []
+        self.errores = []
+        # (username, ruta de activación) por alumno creado; ver `enlace_activacion`.
+        self.enlaces = []
+
+    def error(self, linea, mensaje):
+        self.errores.append((linea, mensaje))
+
+
+def _validar(datos):
+    for campo in COLUMNAS:
+        if not datos.get(campo):
+            return f"Falta '{campo}'."
+    try:
+        validate_email(datos['email'])
+    except ValidationError:
+        return f"Correo inválido: {datos['email']}"
+    if len(datos['matricula']) > Alumno._meta.get_field('matricula').max_length:
+        return f"Matrícula demasiado larga: {datos['matricula']}"
+    try:
+        User.username_validator(datos['username'])
+    except ValidationError:
+        return f"Usuario inválido: {datos['username']}"
+    return None
+
+
+def enlace_activacion(usuario):
+    """Ruta en la que `usuario` elige su contraseña.
+
+    Los alumnos importados se crean sin contraseña utilizable (hashear una por
+    alumno haría la importación lenta y habría que repartirla de todos modos).
+    El enlace usa el token de restablecimiento de Django: vence tras
+    `PASSWORD_RESET_TIMEOUT` y deja de servir en cuanto se usa.
+    """
+    return reverse('activar_cuenta', args=[
+        urlsafe_base64_encode(force_bytes(usuario.pk)), default_token_generator.make_token(usuario),
+    ])
+
+
+def sin_activar():
+    """Estudiantes que todavía no eligen contraseña (p. ej. importados y sin usar su enlace)."""
+    return User.objects.filter(role='estudiante', password__startswith=UNUSABLE_PASSWORD_PREFIX)
+
+
+def importar_alumnos(filas, batch_size=None):
+    """Crea User + Wallet + Alumno por cada fila válida de `leer_csv`.
+
+    Las filas con errores (campos vacíos, duplicados en el archivo o ya
+    registrados) se reportan en `ResultadoImportacion.errores` sin detener
+    el resto. Los duplicados contra la base se buscan con una sola consulta
+    por tabla y las altas van en lotes de `bulk_create` dentro de una
+    transacción, con llaves tomadas del pool. Cada alumno creado recibe en
+    `ResultadoImportacion.enlaces` el enlace para elegir su contraseña.
+    """
+    batch_size = batch_size or IMPORT_SETTINGS['BATCH_SIZE']
+    resultado = ResultadoImportacion()
+
+    candidatas = []
+    vistos = {'email': set(), 'matricula': set(), 'username': set()}
+    for linea, datos in filas:
+        datos = dict(datos, email=datos.get('email', '').lower())
+        datos['username'] = datos.get('username') or datos.get('matricula', '')
+        error = _validar(datos)
+        if error is None:
+            repetido = next((c for c in vistos if datos[c] in vistos[c]), None)
+            if repetido:
+                error = f"{repetido.capitalize()} repetido en el archivo: {datos[repetido]}"
+        if error:
+            resultado.error(linea, error)
+            continue
+        for campo in vistos:
+            vistos[campo].add(datos[campo])
+        candidatas.append((linea, datos))
+
+    if not candidatas:
+        return resultado
+
+    existentes = {'email': set(), 'matricula': set()}
+    for email, matricula in Alumno.objects.filter(
+        Q(email__in=vistos['email']) | Q(matricula__in=vistos['matricula'])
+    ).values_list('email', 'matricula'):
+        existentes['email'].add(email)
+        existentes['matricula'].add(matricula)
+    existentes['username'] = set(User.objects.filter(username__in=vistos['username']).values_list('username', flat=True))
+
+    validas = []
+    for linea, datos in candidatas:
+        registrado = next((c for c in ('matricula', 'email', 'username') if datos[c] in existentes[c]), None)
+        if registrado:
+            resultado.error(linea, f"{registrado.capitalize()} ya registrado: {datos[registrado]}")
+        else:
+            validas.append(datos)
+
+    with transaction.atomic():
+        for inicio in range(0, len(validas), batch_size):
+            lote = validas[inicio:inicio + batch_size]
+            usuarios = []
+            for datos in lote:
+                nombre, _, apellidos = datos['nombre'].partition(' ')
+                usuarios.append(User(
+                    username=datos['username'], first_name=nombre[:150], last_name=apellidos[:150],
+                    email=datos['email'], role='estudiante', password=make_password(None),
+                ))
+            usuarios = User.objects.bulk_create(usuarios)
+            wallets = Wallet.objects.bulk_create([
+                Wallet(user=usuario, address=address, private_key=private_key)
+                for usuario, (private_key, address) in zip(usuarios, reclamar_llaves(len(lote)))
+            ])
+            Alumno.objects.bulk_create([
+                Alumno(user=usuario, email=datos['email'], matricula=datos['matricula'], wallet=wallet)
+                for usuario, wallet, datos in zip(usuarios, wallets, lote)
+            ])
+            # bulk_create no dispara señales: el resumen por rol se suma aquí.
+            summaries.usuarios_creados(usuarios)
+            resultado.creados.extend(datos['matricula'] for datos in lote)
+            resultado.enlaces.extend((usuario.username, enlace_activacion(usuario)) for usuario in usuarios)
+        fragmentos.invalidar('alumnos')
+
+    return resultado
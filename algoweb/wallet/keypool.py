@@ -0,0 +1,71 @@
+from algosdk import account
+from django.conf import settings
+
+from .models import LlavePregenerada
+
+
+# =========================
+# CONFIGURACIÓN
+# =========================
+KEY_POOL_SETTINGS = {
+    # Llaves libres que el worker intenta mantener disponibles.
+    'TARGET': 500,
+    # Filas por bulk_create al rellenar.
+    'BATCH_SIZE': 200,
+}
+KEY_POOL_SETTINGS.update(getattr(settings, 'WALLET_KEY_POOL', {}))
+
+
+# =========================
+# POOL DE LLAVES
+# =========================
+def reclamar_llave(intentos=5):
+    """Toma una llave libre del pool y devuelve `(private_key, address)`.
+
+    El reclamo es el DELETE de la fila: si otra petición la borró primero
+    (0 filas), se prueba con la siguiente. Si el pool está vacío se genera
+    la llave en el momento, como antes.
+    """
+    for _ in range(intentos):
+        libre = LlavePregenerada.objects.order_by('id').values_list('id', 'private_key', 'address').first()
+        if libre is None:
+            break
+        borradas, _ = LlavePregenerada.objects.filter(id=libre[0]).delete()
+        if borradas:
+            return libre[1], libre[2]
+    return account.generate_account()
+
+
+def reclamar_llaves(n):
+    """Reclama `n` llaves de una vez (para importaciones masivas).
+
+    Toma las que haya en el pool con un SELECT y un DELETE por lote; si otra
+    petición se llevó alguna en medio, se descartan todas para no repetir
+    direcciones. Lo que falte se genera en el momento.
+    """
+    libres = list(LlavePregenerada.objects.order_by('id').values_list('id', 'private_key', 'address')[:n])
+    llaves = []
+    if libres:
+        borradas, _ = LlavePregenerada.objects.filter(id__in=[fila[0] for fila in libres]).delete()
+        if borradas == len(libres):
+            llaves = [(private_key, address) for _, private_key, address in libres]
+    llaves.extend(account.generate_account() for _ in range(n - len(llaves)))
+    return llaves
+
+
+def rellenar_pool(objetivo=None, batch_size=None):
+    """Genera llaves hasta tener `objetivo` libres. Devuelve cuántas se crearon."""
+    objetivo = objetivo or KEY_POOL_SETTINGS['TARGET']
+    batch_size = batch_size or KEY_POOL_SETTINGS['BATCH_SIZE']
+    faltan = objetivo - LlavePregenerada.objects.count()
+    creadas = 0
+
+    while faltan > 0:
+        lote = min(faltan, batch_size)
+        LlavePregenerada.objects.bulk_create([
+            LlavePregenerada(private_key=private_key, address=address)
+            for private_key, address in (account.generate_account() for _ in range(lote))
+        ])
+        creadas += lote
+        faltan -= lote
+    return creadas
@@ -0,0 +1,184 @@
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.utils import timezone
+
+from .cache import get_many_account_info, invalidate_accounts
+from .models import AsientoLedger, SaldoWallet, Wallet
+
+MICROALGOS = 1_000_000
+
+
+# =========================
+# MONTOS
+# =========================
+def a_microalgos(valor):
+    """Convierte un monto en ALGOs ('1.5', Decimal, int) a microAlgos enteros, sin pasar por float.
+
+    Lanza `ValueError` si no es un número, es negativo o trae más de 6 decimales.
+    """
+    try:
+        monto = Decimal(str(valor).strip() or '0')
+    except InvalidOperation:
+        raise ValueError(f"Monto inválido: {valor!r}")
+    if not monto.is_finite() or monto < 0:
+        raise ValueError(f"Monto inválido: {valor!r}")
+    microalgos = monto * MICROALGOS
+    if microalgos != microalgos.to_integral_value():
+        raise ValueError("Los montos admiten a lo más 6 decimales.")
+    return int(microalgos)
+
+
+def a_algos(microalgos):
+    """microAlgos → ALGOs como `Decimal` exacto (para `DecimalField` y mensajes)."""
+    return Decimal(microalgos) / MICROALGOS
+
+
+# =========================
+# ASIENTOS Y SALDO CORRIDO
+# =========================
+def asentar(movimientos):
+    """Registra `movimientos` y actualiza el saldo corrido de cada wallet en la misma transacción.
+
+    `movimientos` es una lista de (wallet_id, transaccion_id, tipo, monto) con
+    `monto` en microAlgos y con signo (negativo sale de la wallet). Las filas
+    de `SaldoWallet` se bloquean antes de leerlas, así que dos escrituras
+    concurrentes no pierden ningún asiento. Un movimiento ligado cuyo
+    (transaccion, wallet, tipo) ya está asentado se omite: confirmar dos
+    veces la misma transacción no mueve el saldo.
+    """
+    if not movimientos:
+        return []
+    with transaction.atomic():
+        ids = {wallet_id for wallet_id, _, _, _ in movimientos}
+        SaldoWallet.objects.bulk_create([SaldoWallet(wallet_id=i) for i in ids], ignore_conflicts=True)
+        saldos = {s.wallet_id: s for s in SaldoWallet.objects.select_for_update().filter(wallet_id__in=ids)}
+        # Se consulta con los saldos ya bloqueados: quien asentó antes ya hizo commit.
+        asentados = set(AsientoLedger.objects.filter(
+            transaccion_id__in={t for _, t, _, _ in movimientos if t is not None}, wallet_id__in=ids,
+        ).values_list('transaccion_id', 'wallet_id', 'tipo'))
+
+        asientos = []
+        for wallet_id, transaccion_id, tipo, monto in movimientos:
+            if transaccion_id is not None:
+                if (transaccion_id, wallet_id, tipo) in asentados:
+                    continue
+                asentados.add((transaccion_id, wallet_id, tipo))
+            saldo = saldos[wallet_id]
+            saldo.saldo += monto
+            if tipo == 'pago':
+                saldo.total_pagado -= monto
+            elif tipo == 'cobro':
+                saldo.total_recibido += monto
+            asientos.append(AsientoLedger(
+                wallet_id=wallet_id, transaccion_id=transaccion_id, tipo=tipo, monto=monto,
+                saldo_resultante=saldo.saldo,
+            ))
+        AsientoLedger.objects.bulk_create(asientos)
+        SaldoWallet.objects.bulk_update(saldos.values(), ['saldo', 'total_pagado', 'total_recibido'])
+    return asientos
+
+
+def movimientos_de(transacciones, wallets, signo=1, ligar=True):
+    """Los movimientos que una `Transaccion` confirmada deja en las wallets de `wallets` (username -> id)."""
+    movimientos = []
+    for t in transacciones:
+        monto = a_microalgos(t.amount) * signo
+        transaccion_id = t.id if ligar else None
+        if t.sender in wallets:
+            movimientos.append((wallets[t.sender], transaccion_id, 'pago', -monto))
+            if t.fee:
+                movimientos.append((wallets[t.sender], transaccion_id, 'comision', -t.fee * signo))
+        if t.receiver in wallets:
+            movimientos.append((wallets[t.receiver], transaccion_id, 'cobro', monto))
+    return movimientos
+
+
+def revertir(transacciones):
+    """Revierte los asientos ligados a `transacciones` y los desliga.
+
+    Los reversos quedan sin `transaccion`, igual que los asientos originales:
+    así la transacción puede volver a asentarse si se confirma otra vez, y
+    revertirla dos veces no mueve el saldo (la segunda no encuentra nada).
+    """
+    with transaction.atomic():
+        asientos = list(AsientoLedger.objects.select_for_update().filter(transaccion__in=transacciones))
+        if not asientos:
+            return []
+        AsientoLedger.objects.filter(id__in=[a.id for a in asientos]).update(transaccion=None)
+        return asentar([(a.wallet_id, None, a.tipo, -a.monto) for a in asientos])
+
+
+def pagos_confirmados(transacciones, signo=1, ligar=True):
+    """Asienta las `Transaccion` recién confirmadas (o las revierte con `signo=-1`).
+
+    Va junto a `summaries.pagos_confirmados` en las señales y en el tracker.
+    `ligar=False` deja los asientos sin `transaccion`, para reversos de
+    transacciones que se están borrando (sus asientos ya quedaron sin liga).
+    """
+    transacciones = list(transacciones)
+    if not transacciones:
+        return []
+    if signo < 0 and ligar:
+        return revertir(transacciones)
+    usernames = {t.sender for t in transacciones} | {t.receiver for t in transacciones}
+    wallets = dict(Wallet.objects.filter(user__username__in=usernames).values_list('user__username', 'id'))
+    return asentar(movimientos_de(transacciones, wallets, signo, ligar))
+
+
+# =========================
+# CONSULTAS LOCALES
+# =========================
+def saldo(wallet):
+    """Saldo en microAlgos según el ledger local, o None si la wallet nunca se ha conciliado.
+
+    `asentar` crea la fila en 0 sin saldo de apertura: hasta que `conciliar`
+    la cuadra con la red, el saldo corrido sólo suma los movimientos vistos
+    por la app y no lo que la wallet ya tenía.
+    """
+    try:
+        saldo_local = wallet.saldo_local
+    except SaldoWallet.DoesNotExist:
+        return None
+    return saldo_local.saldo if saldo_local.conciliado else None
+
+
+def totales(user):
+    """(pagado, recibido) en microAlgos por `user` según el ledger local."""
+    fila = SaldoWallet.objects.filter(wallet__user=user).values_list('total_pagado', 'total_recibido').first()
+    return fila or (0, 0)
+
+
+# =========================
+# CONCILIACIÓN CON LA RED
+# =========================
+def conciliar(client, wallets, aplicar=True, max_workers=8, timeout=10.0):
+    """Compara el saldo local de `wallets` con algod y asienta un `ajuste` por cada diferencia.
+
+    Devuelve {wallet: diferencia en microAlgos} sólo con las que no
+    cuadraban; las que algod no respondió quedan fuera y se concilian en la
+    siguiente pasada. Con `aplicar=False` sólo reporta.
+    """
+    wallets = list(wallets)
+    # La conciliación necesita el saldo de la red de ahora, no el de ACCOUNT_CACHE.
+    invalidate_accounts(*[w.address for w in wallets])
+    infos = get_many_account_info(client, [w.address for w in wallets], max_workers=max_workers, timeout=timeout)
+    locales = dict(SaldoWallet.objects.filter(wallet__in=wallets).values_list('wallet_id', 'saldo'))
+
+    diferencias = {}
+    conciliadas = []
+    for wallet in wallets:
+        info = infos.get(wallet.address)
+        if info is None or isinstance(info, Exception):
+            continue
+        conciliadas.append(wallet.id)
+        diferencia = info.get('amount', 0) - locales.get(wallet.id, 0)
+        if diferencia:
+            diferencias[wallet] = diferencia
+
+    if aplicar:
+        with transaction.atomic():
+            asentar([(wallet.id, None, 'ajuste', diferencia) for wallet, diferencia in diferencias.items()])
+            SaldoWallet.objects.bulk_create([SaldoWallet(wallet_id=i) for i in conciliadas], ignore_conflicts=True)
+            SaldoWallet.objects.filter(wallet_id__in=conciliadas).update(conciliado=timezone.now())
+    return diferencias
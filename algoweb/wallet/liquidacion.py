@@ -0,0 +1,97 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+
+from . import ledger, outbox
+from .models import ActividadAsignada, Liquidacion, Wallet
+
+
+# =========================
+# CONFIGURACIÓN
+# =========================
+LIQUIDACION_SETTINGS = {
+    # 'inmediato':   cada asignación con monto deja su propio pago en el outbox.
+    # 'liquidacion': las asignaciones acumulan lo adeudado y `manage.py liquidar_recompensas`
+    #                paga un neto por (docente, alumno).
+    'MODO': 'inmediato',
+}
+LIQUIDACION_SETTINGS.update(getattr(settings, 'WALLET_LIQUIDACION', {}))
+
+
+def acumular_recompensas():
+    """True si las recompensas nuevas se acumulan para la próxima liquidación."""
+    return LIQUIDACION_SETTINGS['MODO'] == 'liquidacion'
+
+
+# =========================
+# LIQUIDACIÓN
+# =========================
+def adeudadas():
+    """Asignaciones con recompensa acumulada que todavía no entra en ninguna liquidación."""
+    return ActividadAsignada.objects.filter(por_liquidar=True, liquidacion__isnull=True)
+
+
+def liquidar(docentes=None):
+    """Agrupa lo adeudado por (docente, alumno) y deja un pago neto por par en el outbox.
+
+    Todo ocurre en una transacción: las asignaciones quedan ligadas a su
+    `Liquidacion` en el mismo commit que encola el pago, así que una
+    asignación no puede entrar en dos liquidaciones. El despachador del
+    outbox envía los pagos de cada docente en grupos atómicos y, al
+    enviarlos, copia el txid a las asignaciones saldadas. Los pares en los
+    que falta la wallet del docente o del alumno siguen adeudados.
+    """
+    with transaction.atomic():
+        filas = adeudadas().select_for_update()
+        if docentes is not None:
+            filas = filas.filter(docente__in=docentes)
+
+        por_par = defaultdict(lambda: {'monto': 0, 'ids': []})
+        for id_, docente_id, alumno_id, monto in filas.values_list('id', 'docente_id', 'alumno_id', 'monto_algos'):
+            par = por_par[(docente_id, alumno_id)]
+            par['monto'] += ledger.a_microalgos(monto)
+            par['ids'].append(id_)
+        if not por_par:
+            return []
+
+        usuarios = {u for par in por_par for u in par}
+        wallets = {w.user_id: w for w in Wallet.objects.select_related('user').filter(user_id__in=usuarios)}
+        pares = [
+            par for par in sorted(por_par)
+            if par[0] in wallets and par[1] in wallets and por_par[par]['monto'] > 0
+        ]
+
+        liquidaciones = Liquidacion.objects.bulk_create([
+            Liquidacion(
+                docente_id=docente_id,
+                alumno_id=alumno_id,
+                monto=por_par[(docente_id, alumno_id)]['monto'],
+                total_asignaciones=len(por_par[(docente_id, alumno_id)]['ids']),
+            )
+            for docente_id, alumno_id in pares
+        ])
+
+        por_docente = defaultdict(list)
+        for liquidacion in liquidaciones:
+            ActividadAsignada.objects.filter(
+                id__in=por_par[(liquidacion.docente_id, liquidacion.alumno_id)]['ids']
+            ).update(liquidacion=liquidacion)
+            alumno_wallet = wallets[liquidacion.alumno_id]
+            por_docente[liquidacion.docente_id].append({
+                'clave': f"liquidacion:{liquidacion.id}",
+                'receptor': alumno_wallet.user,
+                'address': alumno_wallet.address,
+                'monto': liquidacion.monto,
+                'liquidacion': liquidacion,
+            })
+        for docente_id, pagos in por_docente.items():
+            outbox.encolar(wallets[docente_id], 'docente_to_alumno', pagos)
+    return liquidaciones
+
+
+def pagos_perdidos(txids):
+    """Las liquidaciones cuyo pago no llegó a la red quedan 'fallida' y sus asignaciones vuelven a adeudarse."""
+    perdidas = Liquidacion.objects.filter(txid__in=list(txids))
+    ActividadAsignada.objects.filter(liquidacion__in=perdidas).update(liquidacion=None, txid=None, estado='pendiente')
+    perdidas.update(estado='fallida')
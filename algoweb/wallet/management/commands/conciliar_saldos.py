@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from wallet.clients import ALGOD_CLIENT
+from wallet.ledger import conciliar
+from wallet.models import Wallet
+
+
+class Command(BaseCommand):
+    help = "Cuadra el saldo del ledger local de cada wallet con algod, con un asiento de ajuste por diferencia."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--solo-reportar', action='store_true',
+                            help="Muestra las diferencias sin asentar ajustes.")
+        parser.add_argument('--lote', type=int, default=500,
+                            help="Wallets consultadas a algod por lote.")
+
+    def handle(self, *args, **options):
+        aplicar = not options['solo_reportar']
+        wallets = Wallet.objects.select_related('user').order_by('id')
+        revisadas = descuadradas = 0
+        ultimo_id = 0
+        while True:
+            lote = list(wallets.filter(id__gt=ultimo_id)[:options['lote']])
+            if not lote:
+                break
+            ultimo_id = lote[-1].id
+            diferencias = conciliar(ALGOD_CLIENT, lote, aplicar=aplicar)
+            for wallet, diferencia in diferencias.items():
+                self.stdout.write(f"{wallet.user.username} ({wallet.address[:8]}...): {diferencia / 1_000_000:+} ALGOs")
+            revisadas += len(lote)
+            descuadradas += len(diferencias)
+
+        accion = "ajustadas" if aplicar else "con diferencia"
+        self.stdout.write(f"{revisadas} wallets revisadas, {descuadradas} {accion}.")
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from wallet.clients import ALGOD_CLIENT
+from wallet.outbox import Despachador
+
+
+class Command(BaseCommand):
+    help = "Firma y envía los pagos en cola del outbox, con reintentos y backoff exponencial."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help="Pagos que se toman en cada pasada.")
+        parser.add_argument('--intervalo', type=float, default=None,
+                            help="Segundos de espera cuando la cola está vacía.")
+        parser.add_argument('--once', action='store_true',
+                            help="Hace una sola pasada sobre los pagos vencidos y termina.")
+
+    def handle(self, *args, **options):
+        despachador = Despachador(ALGOD_CLIENT, batch_size=options['batch_size'])
+
+        if options['once']:
+            enviados, fallidos = despachador.despachar()
+            self.stdout.write(f"{len(enviados)} pagos enviados, {len(fallidos)} fallidos.")
+            return
+
+        self.stdout.write("Despachando el outbox... (Ctrl+C para salir)")
+        try:
+            despachador.run(intervalo=options['intervalo'])
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from wallet.importacion import enlace_activacion, sin_activar
+
+
+class Command(BaseCommand):
+    help = "Genera enlaces nuevos para que los estudiantes sin contraseña (p. ej. importados) elijan la suya."
+
+    def add_arguments(self, parser):
+        parser.add_argument('usernames', nargs='*', help="Sólo estos estudiantes (por defecto, todos los pendientes).")
+        parser.add_argument('--base-url', default='',
+                            help="Prefijo de los enlaces (p. ej. https://educhain.example).")
+
+    def handle(self, *args, **options):
+        usuarios = sin_activar().order_by('username')
+        if options['usernames']:
+            usuarios = usuarios.filter(username__in=options['usernames'])
+        for usuario in usuarios.iterator():
+            self.stdout.write(f"{usuario.username},{options['base_url']}{enlace_activacion(usuario)}")
@@ -0,0 +1,47 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from wallet.export import EXPORTABLES, exportar, nombre_archivo
+
+
+class Command(BaseCommand):
+    help = "Exporta Transaccion o ActividadAsignada en streaming (CSV/JSONL, gzip por defecto)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('tabla', choices=sorted(EXPORTABLES))
+        parser.add_argument('--formato', choices=['csv', 'jsonl'], default='csv')
+        parser.add_argument('--desde', help="Fecha inicial YYYY-MM-DD (inclusiva).")
+        parser.add_argument('--hasta', help="Fecha final YYYY-MM-DD (inclusiva).")
+        parser.add_argument('--tipo', help="Sólo transacciones de este tipo.")
+        parser.add_argument('--estado', help="Sólo filas en este estado.")
+        parser.add_argument('--sin-gzip', action='store_true', help="No comprimir la salida.")
+        parser.add_argument('-o', '--output',
+                            help="Archivo de salida ('-' para stdout). Por defecto <tabla>-<fecha>.<formato>[.gz].")
+
+    def handle(self, *args, **options):
+        comprimir = not options['sin_gzip']
+        try:
+            contenido = exportar(
+                options['tabla'],
+                options['formato'],
+                comprimir,
+                desde=options['desde'],
+                hasta=options['hasta'],
+                tipo=options['tipo'],
+                estado=options['estado'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        destino = options['output'] or nombre_archivo(options['tabla'], options['formato'], comprimir)
+        if destino == '-':
+            for chunk in contenido:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+            return
+
+        with open(destino, 'wb') as f:
+            for chunk in contenido:
+                f.write(chunk)
+        self.stderr.write(f"Exportado a {destino}")
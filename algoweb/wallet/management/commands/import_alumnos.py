@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from wallet.importacion import importar_alumnos, leer_csv
+
+
+class Command(BaseCommand):
+    help = "Importa alumnos desde un CSV (nombre,email,matricula[,username]) creando User, Wallet y Alumno."
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo')
+        parser.add_argument('--batch-size', type=int, help="Alumnos por lote de bulk_create.")
+        parser.add_argument('--base-url', default='',
+                            help="Prefijo de los enlaces de activación (p. ej. https://educhain.example).")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['archivo'], 'rb') as f:
+                filas = leer_csv(f.read())
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        resultado = importar_alumnos(filas, batch_size=options['batch_size'])
+        for linea, mensaje in resultado.errores:
+            self.stderr.write(f"Línea {linea}: {mensaje}")
+        # Sin contraseña: cada alumno elige la suya con su enlace (`manage.py enlaces_activacion` los renueva).
+        for username, enlace in resultado.enlaces:
+            self.stdout.write(f"{username},{options['base_url']}{enlace}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(resultado.creados)} alumnos importados, {len(resultado.errores)} filas con errores."
+        ))
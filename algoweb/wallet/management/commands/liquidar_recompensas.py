@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from wallet.clients import ALGOD_CLIENT
+from wallet.liquidacion import liquidar
+from wallet.models import User
+from wallet.outbox import Despachador
+
+
+class Command(BaseCommand):
+    help = "Paga las recompensas acumuladas: un pago neto por (docente, alumno), vía el outbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--docente', action='append', default=None,
+                            help="Sólo liquida a este docente (username). Se puede repetir.")
+        parser.add_argument('--despachar', action='store_true',
+                            help="Envía en seguida los pagos encolados, sin esperar a dispatch_outbox.")
+
+    def handle(self, *args, **options):
+        docentes = None
+        if options['docente']:
+            docentes = User.objects.filter(username__in=options['docente'], role='docente')
+
+        liquidaciones = liquidar(docentes)
+        asignaciones = sum(l.total_asignaciones for l in liquidaciones)
+        total = sum(l.monto for l in liquidaciones) / 1_000_000
+        self.stdout.write(
+            f"{len(liquidaciones)} pagos netos en cola por {total} ALGOs ({asignaciones} asignaciones)."
+        )
+
+        if options['despachar'] and liquidaciones:
+            enviados, fallidos = Despachador(ALGOD_CLIENT).despachar()
+            self.stdout.write(f"{len(enviados)} pagos enviados, {len(fallidos)} fallidos.")
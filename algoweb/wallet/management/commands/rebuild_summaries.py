@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from wallet.summaries import reconstruir
+
+
+class Command(BaseCommand):
+    help = "Recalcula desde cero los resúmenes que leen los dashboards."
+
+    def handle(self, *args, **options):
+        reconstruir()
+        self.stdout.write("Resúmenes reconstruidos.")
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from wallet.verificacion import verificar
+
+
+class Command(BaseCommand):
+    help = ("Revisa los txid de Transaccion contra el indexer y corrige estado y confirmed_round; "
+            "una pasada interrumpida continúa desde su checkpoint.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bloque', type=int, default=None,
+                            help="Filas que se revisan y guardan juntas.")
+        parser.add_argument('--workers', type=int, default=None,
+                            help="Consultas simultáneas al indexer.")
+        parser.add_argument('--max-filas', type=int, default=None,
+                            help="Revisa a lo más estas filas y deja el checkpoint para la siguiente ejecución.")
+        parser.add_argument('--reiniciar', action='store_true',
+                            help="Empieza una pasada nueva aunque haya una a medias.")
+
+    def handle(self, *args, **options):
+        def progreso(cursor, filas, corregidas):
+            if options['verbosity'] > 1:
+                self.stdout.write(f"Hasta id {cursor.ultimo_id}: {filas} revisadas, {corregidas} corregidas.")
+
+        cursor = verificar(
+            bloque=options['bloque'],
+            max_workers=options['workers'],
+            reiniciar=options['reiniciar'],
+            max_filas=options['max_filas'],
+            progreso=progreso,
+        )
+        estado = "Pasada completa" if cursor.inicio is None else f"Pasada en curso (checkpoint en id {cursor.ultimo_id})"
+        self.stdout.write(
+            f"{estado}: {cursor.revisadas} transacciones revisadas, {cursor.corregidas} corregidas, "
+            f"{cursor.sin_respuesta} sin respuesta del indexer en esta ejecución."
+        )
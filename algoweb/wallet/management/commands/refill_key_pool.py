@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from wallet.keypool import rellenar_pool
+
+
+class Command(BaseCommand):
+    help = "Rellena el pool de llaves Algorand pregeneradas que usan el registro y registrar_wallet."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', type=int, default=None,
+                            help="Llaves libres a mantener (por defecto WALLET_KEY_POOL['TARGET']).")
+        parser.add_argument('--loop', action='store_true',
+                            help="Sigue rellenando periódicamente en lugar de una sola vez.")
+        parser.add_argument('--interval', type=float, default=30.0,
+                            help="Segundos entre revisiones con --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            creadas = rellenar_pool(options['target'])
+            if creadas:
+                self.stdout.write(f"{creadas} llaves generadas.")
+            if not options['loop']:
+                return
+            try:
+                time.sleep(options['interval'])
+            except KeyboardInterrupt:
+                return
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from wallet.models import Wallet
+from wallet.sync import sincronizar_wallet, sincronizar_todas
+
+
+class Command(BaseCommand):
+    help = "Copia al espejo local el historial on-chain de las wallets registradas."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--address', help="Sincroniza sólo esta wallet.")
+        parser.add_argument('--loop', action='store_true',
+                            help="Sincroniza continuamente en lugar de una sola vez.")
+        parser.add_argument('--interval', type=float, default=10.0,
+                            help="Segundos entre pasadas con --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            self._pasada(options['address'])
+            if not options['loop']:
+                return
+            try:
+                time.sleep(options['interval'])
+            except KeyboardInterrupt:
+                return
+
+    def _pasada(self, address):
+        if address:
+            try:
+                wallet = Wallet.objects.get(address=address)
+            except Wallet.DoesNotExist:
+                raise CommandError(f"No existe una wallet con address {address}")
+            resultados = {address: sincronizar_wallet(wallet)}
+        else:
+            resultados = sincronizar_todas()
+
+        for addr, leidas in resultados.items():
+            if isinstance(leidas, Exception):
+                self.stderr.write(f"{addr}: error {leidas}")
+            else:
+                self.stdout.write(f"{addr}: {leidas} transacciones leídas")
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from wallet.tracker import ConfirmationTracker
+from wallet.clients import ALGOD_CLIENT
+
+
+class Command(BaseCommand):
+    help = "Confirma en segundo plano los pagos pendientes siguiendo las rondas de algod."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--timeout-rounds', type=int, default=None,
+                            help="Rondas de espera antes de marcar un pago como fallido.")
+        parser.add_argument('--once', action='store_true',
+                            help="Hace una sola pasada sobre la ronda actual y termina.")
+
+    def handle(self, *args, **options):
+        tracker = ConfirmationTracker(ALGOD_CLIENT, timeout_rounds=options['timeout_rounds'])
+
+        if options['once']:
+            ronda = ALGOD_CLIENT.status()['last-round']
+            actualizadas = tracker.procesar_ronda(ronda)
+            self.stdout.write(f"Ronda {ronda}: {len(actualizadas)} transacciones resueltas.")
+            return
+
+        self.stdout.write("Siguiendo rondas de algod... (Ctrl+C para salir)")
+        try:
+            tracker.run()
+        except KeyboardInterrupt:
+            pass
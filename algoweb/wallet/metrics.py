@@ -0,0 +1,192 @@
+import bisect
+import contextvars
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+
+# =========================
+# CONFIGURACIÓN
+# =========================
+METRICS_SETTINGS = {
+    # Límites (segundos) de los histogramas de tiempo.
+    'BUCKETS': (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+    # Límites de los histogramas de número de queries por petición.
+    'QUERY_BUCKETS': (1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+}
+METRICS_SETTINGS.update(getattr(settings, 'WALLET_METRICS', {}))
+
+HISTOGRAMAS = {
+    'wallet_request_duration_seconds': ("Tiempo total de cada petición por vista.", 'BUCKETS'),
+    'wallet_request_db_queries': ("Queries SQL por petición.", 'QUERY_BUCKETS'),
+    'wallet_request_db_duration_seconds': ("Tiempo en SQL por petición.", 'BUCKETS'),
+    'wallet_upstream_duration_seconds': ("Duración de cada llamada a algod/indexer.", 'BUCKETS'),
+}
+CONTADORES = {
+    'wallet_upstream_errors_total': "Llamadas a algod/indexer que fallaron o respondieron >= 400.",
+}
+
+
+# =========================
+# HISTOGRAMAS
+# =========================
+class Histograma:
+    """Histograma acumulativo al estilo Prometheus (`le` inclusivo)."""
+
+    def __init__(self, limites):
+        self.limites = tuple(limites)
+        self.cubetas = [0] * (len(self.limites) + 1)
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        self.cubetas[bisect.bisect_left(self.limites, valor)] += 1
+        self.suma += valor
+        self.total += 1
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _etiquetas(pares):
+    if not pares:
+        return ''
+    return '{' + ','.join(f'{k}="{_escapar(v)}"' for k, v in pares) + '}'
+
+
+class RegistroMetricas:
+    """Histogramas y contadores por conjunto de etiquetas, seguro entre hilos."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histogramas = defaultdict(dict)
+        self._contadores = defaultdict(lambda: defaultdict(float))
+
+    def observar(self, nombre, valor, **etiquetas):
+        clave = tuple(sorted(etiquetas.items()))
+        with self._lock:
+            serie = self._histogramas[nombre]
+            if clave not in serie:
+                serie[clave] = Histograma(METRICS_SETTINGS[HISTOGRAMAS[nombre][1]])
+            serie[clave].observar(valor)
+
+    def incrementar(self, nombre, valor=1, **etiquetas):
+        with self._lock:
+            self._contadores[nombre][tuple(sorted(etiquetas.items()))] += valor
+
+    def reset(self):
+        with self._lock:
+            self._histogramas.clear()
+            self._contadores.clear()
+
+    def exportar(self):
+        """Todo el registro en el formato de texto de Prometheus 0.0.4."""
+        lineas = []
+        with self._lock:
+            for nombre, (ayuda, _) in HISTOGRAMAS.items():
+                lineas += [f'# HELP {nombre} {ayuda}', f'# TYPE {nombre} histogram']
+                for clave, h in sorted(self._histogramas.get(nombre, {}).items()):
+                    acumulado = 0
+                    for limite, n in zip(h.limites + ('+Inf',), h.cubetas):
+                        acumulado += n
+                        lineas.append(f'{nombre}_bucket{_etiquetas(clave + (("le", limite),))} {acumulado}')
+                    lineas.append(f'{nombre}_sum{_etiquetas(clave)} {h.suma}')
+                    lineas.append(f'{nombre}_count{_etiquetas(clave)} {h.total}')
+            for nombre, ayuda in CONTADORES.items():
+                lineas += [f'# HELP {nombre} {ayuda}', f'# TYPE {nombre} counter']
+                for clave, valor in sorted(self._contadores.get(nombre, {}).items()):
+                    lineas.append(f'{nombre}{_etiquetas(clave)} {valor}')
+        return '\n'.join(lineas) + '\n'
+
+
+REGISTRO = RegistroMetricas()
+
+
+# =========================
+# MEDICIÓN POR PETICIÓN
+# =========================
+class MedicionPeticion:
+    """Lo que cuesta una petición: SQL y llamadas a algod/indexer por endpoint."""
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.vista = None
+        self.db_queries = 0
+        self.db_segundos = 0.0
+        self.upstream = defaultdict(lambda: [0, 0.0])
+        self._lock = threading.Lock()
+
+    def sumar_sql(self, segundos):
+        with self._lock:
+            self.db_queries += 1
+            self.db_segundos += segundos
+
+    def sumar_upstream(self, servicio, endpoint, segundos):
+        with self._lock:
+            fila = self.upstream[(servicio, endpoint)]
+            fila[0] += 1
+            fila[1] += segundos
+
+    def server_timing(self, total):
+        """Valor del encabezado `Server-Timing` (duraciones en ms)."""
+        por_servicio = defaultdict(lambda: [0, 0.0])
+        for (servicio, _), (llamadas, segundos) in self.upstream.items():
+            por_servicio[servicio][0] += llamadas
+            por_servicio[servicio][1] += segundos
+        partes = [f'db;dur={self.db_segundos * 1000:.1f};desc="{self.db_queries} queries"']
+        for servicio, (llamadas, segundos) in sorted(por_servicio.items()):
+            partes.append(f'{servicio};dur={segundos * 1000:.1f};desc="{llamadas} llamadas"')
+        externo = self.db_segundos + sum(s for _, s in por_servicio.values())
+        partes.append(f'app;dur={max(total - externo, 0) * 1000:.1f}')
+        partes.append(f'total;dur={total * 1000:.1f}')
+        return ', '.join(partes)
+
+
+MEDICION_ACTUAL = contextvars.ContextVar('wallet_medicion', default=None)
+
+
+def medir_sql(execute, sql, params, many, context):
+    """`execute_wrapper` instalado en cada conexión: cuenta la query en la petición en curso.
+
+    Va en todas las conexiones (señal `connection_created`) y no sólo en la
+    del hilo de la petición porque el ORM async ejecuta en otro hilo; el
+    ContextVar sí viaja con `sync_to_async`.
+    """
+    medicion = MEDICION_ACTUAL.get()
+    if medicion is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        medicion.sumar_sql(time.perf_counter() - inicio)
+
+
+def instalar_medidor_sql(sender, connection, **kwargs):
+    if medir_sql not in connection.execute_wrappers:
+        connection.execute_wrappers.append(medir_sql)
+
+
+def registrar_upstream(servicio, method, endpoint, segundos, ok=True):
+    """Hook de los clientes algod/indexer: histograma global y total de la petición en curso."""
+    medicion = MEDICION_ACTUAL.get()
+    vista = (medicion.vista if medicion else None) or '-'
+    REGISTRO.observar('wallet_upstream_duration_seconds', segundos,
+                      view=vista, service=servicio, method=method, endpoint=endpoint)
+    if not ok:
+        REGISTRO.incrementar('wallet_upstream_errors_total', service=servicio, method=method, endpoint=endpoint)
+    if medicion is not None:
+        medicion.sumar_upstream(servicio, endpoint, segundos)
+
+
+def registrar_peticion(medicion, method, status):
+    total = time.perf_counter() - medicion.inicio
+    vista = medicion.vista or '-'
+    REGISTRO.observar('wallet_request_duration_seconds', total,
+                      view=vista, method=method, status=f'{status // 100}xx')
+    REGISTRO.observar('wallet_request_db_queries', medicion.db_queries, view=vista)
+    REGISTRO.observar('wallet_request_db_duration_seconds', medicion.db_segundos, view=vista)
+    return total
@@ -0,0 +1,50 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from .metrics import MEDICION_ACTUAL, MedicionPeticion, registrar_peticion
+
+
+class InstrumentacionMiddleware:
+    """Mide cada petición (SQL, algod/indexer y tiempo total) y agrega `Server-Timing`.
+
+    Los agregados por vista quedan en `metrics.REGISTRO` y se publican en `/metrics`.
+    Va al principio de MIDDLEWARE para que el total incluya al resto de middlewares.
+    Funciona en WSGI y en ASGI sin forzar las vistas async a un hilo.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        medicion = MedicionPeticion()
+        token = MEDICION_ACTUAL.set(medicion)
+        try:
+            response = self.get_response(request)
+        finally:
+            MEDICION_ACTUAL.reset(token)
+        return self._terminar(request, medicion, response)
+
+    async def __acall__(self, request):
+        medicion = MedicionPeticion()
+        token = MEDICION_ACTUAL.set(medicion)
+        try:
+            response = await self.get_response(request)
+        finally:
+            MEDICION_ACTUAL.reset(token)
+        return self._terminar(request, medicion, response)
+
+    def _terminar(self, request, medicion, response):
+        total = registrar_peticion(medicion, request.method, response.status_code)
+        response['Server-Timing'] = medicion.server_timing(total)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        medicion = MEDICION_ACTUAL.get()
+        if medicion is not None and request.resolver_match:
+            medicion.vista = request.resolver_match.view_name
@@ -0,0 +1,126 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:18
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet', '0003_rename_descripcion_transaccion_detalle_and_more'),
+    ]
+
+    operations = [
+        # Renombrar (y no borrar + crear) conserva quién creó cada actividad.
+        migrations.RenameField(
+            model_name='actividad',
+            old_name='creada_por',
+            new_name='docente',
+        ),
+        migrations.AlterField(
+            model_name='actividad',
+            name='docente',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='actividades_creadas', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='actividad',
+            name='fecha_creacion',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name='actividad',
+            name='recompensa_algos',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.AlterField(
+            model_name='actividad',
+            name='titulo',
+            field=models.CharField(max_length=200),
+        ),
+        migrations.AlterField(
+            model_name='alumno',
+            name='email',
+            field=models.EmailField(max_length=254, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='alumno',
+            name='matricula',
+            field=models.CharField(max_length=20, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='alumno',
+            name='user',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='perfil_alumno', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='alumno',
+            name='wallet',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='wallet.wallet'),
+        ),
+        migrations.AlterField(
+            model_name='transaccion',
+            name='amount',
+            field=models.DecimalField(decimal_places=6, max_digits=12),
+        ),
+        migrations.AlterField(
+            model_name='transaccion',
+            name='confirmed_round',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='transaccion',
+            name='fecha_creacion',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name='transaccion',
+            name='receiver',
+            field=models.CharField(max_length=128),
+        ),
+        migrations.AlterField(
+            model_name='transaccion',
+            name='sender',
+            field=models.CharField(max_length=128),
+        ),
+        migrations.AlterField(
+            model_name='transaccion',
+            name='tipo',
+            field=models.CharField(choices=[('admin_to_docente', 'Admin → Docente'), ('docente_to_alumno', 'Docente → Alumno')], max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='transaccion',
+            name='txid',
+            field=models.CharField(blank=True, max_length=128, null=True),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='role',
+            field=models.CharField(choices=[('admin', 'Administrador'), ('docente', 'Docente'), ('estudiante', 'Estudiante')], default='estudiante', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='wallet',
+            name='address',
+            field=models.CharField(max_length=128, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='wallet',
+            name='user',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='wallet', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.CreateModel(
+            name='ActividadAsignada',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha_asignacion', models.DateTimeField(default=django.utils.timezone.now)),
+                ('monto_algos', models.DecimalField(decimal_places=6, default=0, max_digits=12)),
+                ('txid', models.CharField(blank=True, max_length=128, null=True)),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('en_progreso', 'En progreso'), ('completada', 'Completada')], default='pendiente', max_length=20)),
+                ('nota', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True)),
+                ('actividad', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='asignaciones', to='wallet.actividad')),
+                ('alumno', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='actividades_recibidas', to=settings.AUTH_USER_MODEL)),
+                ('docente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='actividades_asignadas', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet', '0004_sync_models_actividad_asignada'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CursorIndexer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('min_round', models.BigIntegerField(default=0)),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+                ('wallet', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='cursor_indexer', to='wallet.wallet')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MovimientoIndexado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('txid', models.CharField(max_length=128)),
+                ('tipo', models.CharField(max_length=20)),
+                ('sender', models.CharField(max_length=128)),
+                ('receiver', models.CharField(blank=True, max_length=128)),
+                ('amount', models.BigIntegerField(default=0)),
+                ('fee', models.BigIntegerField(default=0)),
+                ('confirmed_round', models.BigIntegerField()),
+                ('fecha', models.DateTimeField(blank=True, null=True)),
+                ('wallet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='movimientos', to='wallet.wallet')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['wallet', '-confirmed_round'], name='movimiento_wallet_ronda_idx')],
+                'constraints': [models.UniqueConstraint(fields=('wallet', 'txid'), name='movimiento_wallet_txid_unico')],
+            },
+        ),
+    ]
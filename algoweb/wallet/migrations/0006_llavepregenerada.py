@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:23
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet', '0005_movimientoindexado_cursorindexer'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LlavePregenerada',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('address', models.CharField(max_length=128, unique=True)),
+                ('private_key', models.TextField()),
+                ('fecha_creacion', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
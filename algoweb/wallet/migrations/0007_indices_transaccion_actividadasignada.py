@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet', '0006_llavepregenerada'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='actividadasignada',
+            index=models.Index(fields=['alumno', '-fecha_asignacion'], name='asignada_alumno_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='actividadasignada',
+            index=models.Index(fields=['alumno', 'estado'], name='asignada_alumno_estado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='actividadasignada',
+            index=models.Index(fields=['docente', '-fecha_asignacion'], name='asignada_docente_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='actividadasignada',
+            index=models.Index(fields=['estado', '-fecha_asignacion'], name='asignada_estado_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='actividadasignada',
+            index=models.Index(fields=['-fecha_asignacion'], name='asignada_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='actividadasignada',
+            index=models.Index(fields=['txid'], name='asignada_txid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaccion',
+            index=models.Index(fields=['sender'], name='transaccion_sender_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaccion',
+            index=models.Index(fields=['receiver'], name='transaccion_receiver_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaccion',
+            index=models.Index(fields=['-fecha_creacion'], name='transaccion_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaccion',
+            index=models.Index(fields=['estado', '-fecha_creacion'], name='transaccion_estado_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaccion',
+            index=models.Index(fields=['tipo', '-fecha_creacion'], name='transaccion_tipo_fecha_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='transaccion',
+            constraint=models.UniqueConstraint(condition=models.Q(('txid__isnull', False)), fields=('txid',), name='transaccion_txid_unico'),
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def poblar_resumenes(apps, schema_editor):
+    """Carga inicial de los resúmenes a partir de los datos existentes."""
+    User = apps.get_model('wallet', 'User')
+    Actividad = apps.get_model('wallet', 'Actividad')
+    ActividadAsignada = apps.get_model('wallet', 'ActividadAsignada')
+    Transaccion = apps.get_model('wallet', 'Transaccion')
+    ResumenRol = apps.get_model('wallet', 'ResumenRol')
+    ResumenDocente = apps.get_model('wallet', 'ResumenDocente')
+    ResumenAlumno = apps.get_model('wallet', 'ResumenAlumno')
+
+    ResumenRol.objects.bulk_create([
+        ResumenRol(role=fila['role'], total=fila['total'])
+        for fila in User.objects.values('role').annotate(total=Count('id'))
+    ])
+
+    docentes, alumnos = {}, {}
+    for fila in Actividad.objects.values('docente_id').annotate(n=Count('id')):
+        docentes.setdefault(fila['docente_id'], {})['actividades'] = fila['n']
+    for fila in ActividadAsignada.objects.values('docente_id').annotate(n=Count('id')):
+        docentes.setdefault(fila['docente_id'], {})['asignaciones'] = fila['n']
+    for fila in ActividadAsignada.objects.values('alumno_id').annotate(n=Count('id')):
+        alumnos.setdefault(fila['alumno_id'], {})['asignaciones'] = fila['n']
+
+    ids = dict(User.objects.values_list('username', 'id'))
+    confirmados = Transaccion.objects.filter(tipo='docente_to_alumno', estado='confirmed')
+    for fila in confirmados.values('sender').annotate(total=Sum('amount')):
+        if fila['sender'] in ids:
+            docentes.setdefault(ids[fila['sender']], {})['recompensas_algos'] = fila['total']
+    for fila in confirmados.values('receiver').annotate(total=Sum('amount')):
+        if fila['receiver'] in ids:
+            alumnos.setdefault(ids[fila['receiver']], {})['algos_ganados'] = fila['total']
+
+    ResumenDocente.objects.bulk_create([ResumenDocente(docente_id=k, **v) for k, v in docentes.items()])
+    ResumenAlumno.objects.bulk_create([ResumenAlumno(alumno_id=k, **v) for k, v in alumnos.items()])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet', '0007_indices_transaccion_actividadasignada'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenRol',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('admin', 'Administrador'), ('docente', 'Docente'), ('estudiante', 'Estudiante')], max_length=20, unique=True)),
+                ('total', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ResumenAlumno',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('asignaciones', models.IntegerField(default=0)),
+                ('algos_ganados', models.DecimalField(decimal_places=6, default=0, max_digits=18)),
+                ('alumno', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='resumen_alumno', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ResumenDocente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('actividades', models.IntegerField(default=0)),
+                ('asignaciones', models.IntegerField(default=0)),
+                ('recompensas_algos', models.DecimalField(decimal_places=6, default=0, max_digits=18)),
+                ('docente', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='resumen_docente', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(poblar_resumenes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:53
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet', '0008_resumenes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='transaccion',
+            name='estado',
+            field=models.CharField(choices=[('queued', 'En cola'), ('pending', 'Pendiente'), ('confirmed', 'Confirmada'), ('failed', 'Fallida')], default='pending', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='PagoSaliente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clave', models.CharField(max_length=128, unique=True)),
+                ('receiver', models.CharField(max_length=128)),
+                ('monto', models.BigIntegerField()),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('enviado', 'Enviado'), ('fallido', 'Fallido')], default='pendiente', max_length=20)),
+                ('intentos', models.IntegerField(default=0)),
+                ('proximo_intento', models.DateTimeField(default=django.utils.timezone.now)),
+                ('ultimo_error', models.TextField(blank=True)),
+                ('firmada', models.TextField(blank=True)),
+                ('txid', models.CharField(blank=True, max_length=128, null=True)),
+                ('ultima_ronda_valida', models.BigIntegerField(blank=True, null=True)),
+                ('fecha_creacion', models.DateTimeField(default=django.utils.timezone.now)),
+                ('fecha_envio', models.DateTimeField(blank=True, null=True)),
+                ('asignacion', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='pagos_salientes', to='wallet.actividadasignada')),
+                ('origen', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pagos_salientes', to='wallet.wallet')),
+                ('transaccion', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='pago_saliente', to='wallet.transaccion')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['estado', 'proximo_intento'], name='pago_saliente_cola_idx')],
+            },
+        ),
+    ]
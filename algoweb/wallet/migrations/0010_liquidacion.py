@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:10
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet', '0009_outbox_pagos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='actividadasignada',
+            name='por_liquidar',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='Liquidacion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('monto', models.BigIntegerField()),
+                ('total_asignaciones', models.IntegerField(default=0)),
+                ('estado', models.CharField(choices=[('en_cola', 'En cola'), ('enviada', 'Enviada'), ('fallida', 'Fallida')], default='en_cola', max_length=20)),
+                ('txid', models.CharField(blank=True, max_length=128, null=True)),
+                ('fecha_creacion', models.DateTimeField(default=django.utils.timezone.now)),
+                ('alumno', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='liquidaciones_recibidas', to=settings.AUTH_USER_MODEL)),
+                ('docente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='liquidaciones_pagadas', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='actividadasignada',
+            name='liquidacion',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='asignaciones', to='wallet.liquidacion'),
+        ),
+        migrations.AddField(
+            model_name='pagosaliente',
+            name='liquidacion',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='pago', to='wallet.liquidacion'),
+        ),
+        migrations.AddIndex(
+            model_name='actividadasignada',
+            index=models.Index(condition=models.Q(('liquidacion__isnull', True), ('por_liquidar', True)), fields=['docente', 'alumno'], name='asignada_por_liquidar_idx'),
+        ),
+    ]
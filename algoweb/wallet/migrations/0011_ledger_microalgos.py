@@ -0,0 +1,79 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:12
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def poblar_ledger(apps, schema_editor):
+    """Asienta las transacciones ya confirmadas; `manage.py conciliar_saldos` cuadra el resto con la red."""
+    Wallet = apps.get_model('wallet', 'Wallet')
+    Transaccion = apps.get_model('wallet', 'Transaccion')
+    AsientoLedger = apps.get_model('wallet', 'AsientoLedger')
+    SaldoWallet = apps.get_model('wallet', 'SaldoWallet')
+
+    wallets = dict(Wallet.objects.values_list('user__username', 'id'))
+    saldos = {}
+    asientos = []
+
+    def asentar(wallet_id, transaccion_id, tipo, monto):
+        saldo = saldos.setdefault(wallet_id, SaldoWallet(wallet_id=wallet_id))
+        saldo.saldo += monto
+        if tipo == 'pago':
+            saldo.total_pagado -= monto
+        else:
+            saldo.total_recibido += monto
+        asientos.append(AsientoLedger(wallet_id=wallet_id, transaccion_id=transaccion_id, tipo=tipo, monto=monto,
+                                      saldo_resultante=saldo.saldo))
+
+    for t in Transaccion.objects.filter(estado='confirmed').order_by('id'):
+        monto = int(t.amount * 1_000_000)
+        if t.sender in wallets:
+            asentar(wallets[t.sender], t.id, 'pago', -monto)
+        if t.receiver in wallets:
+            asentar(wallets[t.receiver], t.id, 'cobro', monto)
+
+    AsientoLedger.objects.bulk_create(asientos, batch_size=500)
+    SaldoWallet.objects.bulk_create(saldos.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet', '0010_liquidacion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaccion',
+            name='fee',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='SaldoWallet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('saldo', models.BigIntegerField(default=0)),
+                ('total_pagado', models.BigIntegerField(default=0)),
+                ('total_recibido', models.BigIntegerField(default=0)),
+                ('conciliado', models.DateTimeField(blank=True, null=True)),
+                ('wallet', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='saldo_local', to='wallet.wallet')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AsientoLedger',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('pago', 'Pago enviado'), ('cobro', 'Pago recibido'), ('comision', 'Comisión de red'), ('ajuste', 'Ajuste de conciliación')], max_length=20)),
+                ('monto', models.BigIntegerField()),
+                ('saldo_resultante', models.BigIntegerField()),
+                ('fecha', models.DateTimeField(default=django.utils.timezone.now)),
+                ('transaccion', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='asientos', to='wallet.transaccion')),
+                ('wallet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='asientos', to='wallet.wallet')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['wallet', '-id'], name='asiento_wallet_idx')],
+            },
+        ),
+        migrations.RunPython(poblar_ledger, migrations.RunPython.noop),
+    ]
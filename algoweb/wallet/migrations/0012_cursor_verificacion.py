@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet', '0011_ledger_microalgos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CursorVerificacion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50, unique=True)),
+                ('ultimo_id', models.BigIntegerField(default=0)),
+                ('revisadas', models.IntegerField(default=0)),
+                ('corregidas', models.IntegerField(default=0)),
+                ('inicio', models.DateTimeField(blank=True, null=True)),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet', '0012_cursor_verificacion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='actividadasignada',
+            name='clave',
+            field=models.CharField(blank=True, max_length=128, null=True, unique=True),
+        ),
+    ]
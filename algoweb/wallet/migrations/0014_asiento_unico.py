@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet', '0013_clave_asignacion'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='asientoledger',
+            constraint=models.UniqueConstraint(fields=('transaccion', 'wallet', 'tipo'), name='asiento_unico'),
+        ),
+    ]
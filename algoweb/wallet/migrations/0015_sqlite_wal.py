@@ -0,0 +1,25 @@
+from django.db import migrations
+
+
+def activar_wal(apps, schema_editor):
+    # journal_mode=WAL queda guardado en el archivo: basta aplicarlo una vez, no en
+    # cada conexión. No puede cambiarse dentro de una transacción (atomic = False).
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('PRAGMA journal_mode=WAL')
+
+
+def desactivar_wal(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('PRAGMA journal_mode=DELETE')
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('wallet', '0014_asiento_unico'),
+    ]
+
+    operations = [
+        migrations.RunPython(activar_wal, desactivar_wal),
+    ]
@@ -52,6 +52,7 @@ class Transaccion(models.Model):
     )
 
     ESTADO_CHOICES = (
+        ('queued', 'En cola'),
         ('pending', 'Pendiente'),
         ('confirmed', 'Confirmada'),
         ('failed', 'Fallida'),
@@ -64,9 +65,24 @@ class Transaccion(models.Model):
     estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default='pending')
     txid = models.CharField(max_length=128, null=True, blank=True)
     confirmed_round = models.IntegerField(null=True, blank=True)
+    fee = models.BigIntegerField(null=True, blank=True)  # microAlgos, lo anota el tracker al confirmar
     fecha_creacion = models.DateTimeField(default=timezone.now)
     detalle = models.TextField(blank=True, null=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['txid'], condition=models.Q(txid__isnull=False), name='transaccion_txid_unico'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['sender'], name='transaccion_sender_idx'),
+            models.Index(fields=['receiver'], name='transaccion_receiver_idx'),
+            models.Index(fields=['-fecha_creacion'], name='transaccion_fecha_idx'),
+            models.Index(fields=['estado', '-fecha_creacion'], name='transaccion_estado_fecha_idx'),
+            models.Index(fields=['tipo', '-fecha_creacion'], name='transaccion_tipo_fecha_idx'),
+        ]
+
     def __str__(self):
         return f"{self.get_tipo_display()} - {self.amount} ALGOs ({self.estado})"
 
@@ -105,6 +121,252 @@ class ActividadAsignada(models.Model):
         default='pendiente'
     )
     nota = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
+    # Idempotencia del formulario de asignación: una asignación por (envío, alumno).
+    clave = models.CharField(max_length=128, unique=True, null=True, blank=True)
+    # Modo liquidación: la recompensa se acumula y la paga `manage.py liquidar_recompensas`
+    # en un solo pago neto por (docente, alumno). Sin `liquidacion` sigue adeudada.
+    por_liquidar = models.BooleanField(default=False)
+    liquidacion = models.ForeignKey(
+        'Liquidacion', on_delete=models.SET_NULL, null=True, blank=True, related_name='asignaciones'
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['alumno', '-fecha_asignacion'], name='asignada_alumno_fecha_idx'),
+            models.Index(fields=['alumno', 'estado'], name='asignada_alumno_estado_idx'),
+            models.Index(fields=['docente', '-fecha_asignacion'], name='asignada_docente_fecha_idx'),
+            models.Index(fields=['estado', '-fecha_asignacion'], name='asignada_estado_fecha_idx'),
+            models.Index(fields=['-fecha_asignacion'], name='asignada_fecha_idx'),
+            models.Index(fields=['txid'], name='asignada_txid_idx'),
+            models.Index(
+                fields=['docente', 'alumno'],
+                condition=models.Q(por_liquidar=True, liquidacion__isnull=True),
+                name='asignada_por_liquidar_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.actividad.titulo} → {self.alumno.username} ({self.estado})"
+
+
+# =========================
+# LIQUIDACIÓN DE RECOMPENSAS
+# =========================
+# Un pago neto por (docente, alumno) que salda varias asignaciones (wallet/liquidacion.py).
+class Liquidacion(models.Model):
+    ESTADO_CHOICES = (
+        ('en_cola', 'En cola'),
+        ('enviada', 'Enviada'),
+        ('fallida', 'Fallida'),
+    )
+
+    docente = models.ForeignKey(User, on_delete=models.CASCADE, related_name='liquidaciones_pagadas')
+    alumno = models.ForeignKey(User, on_delete=models.CASCADE, related_name='liquidaciones_recibidas')
+    monto = models.BigIntegerField()  # microAlgos
+    total_asignaciones = models.IntegerField(default=0)
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default='en_cola')
+    txid = models.CharField(max_length=128, null=True, blank=True)
+    fecha_creacion = models.DateTimeField(default=timezone.now)
+
+    @property
+    def monto_algos(self):
+        return self.monto / 1_000_000
+
+    def __str__(self):
+        return f"{self.docente.username} → {self.alumno.username}: {self.monto_algos} ALGOs ({self.estado})"
+
+
+# =========================
+# OUTBOX DE PAGOS SALIENTES
+# =========================
+# Las vistas sólo escriben aquí; `manage.py dispatch_outbox` firma y envía (wallet/outbox.py).
+class PagoSaliente(models.Model):
+    ESTADO_CHOICES = (
+        ('pendiente', 'Pendiente'),
+        ('enviado', 'Enviado'),
+        ('fallido', 'Fallido'),
+    )
+
+    clave = models.CharField(max_length=128, unique=True)  # idempotencia: un pago por clave
+    origen = models.ForeignKey(Wallet, on_delete=models.CASCADE, related_name='pagos_salientes')
+    receiver = models.CharField(max_length=128)
+    monto = models.BigIntegerField()  # microAlgos
+    transaccion = models.OneToOneField(Transaccion, on_delete=models.CASCADE, related_name='pago_saliente')
+    asignacion = models.ForeignKey(
+        ActividadAsignada, on_delete=models.SET_NULL, null=True, blank=True, related_name='pagos_salientes'
+    )
+    liquidacion = models.OneToOneField(
+        Liquidacion, on_delete=models.SET_NULL, null=True, blank=True, related_name='pago'
+    )
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default='pendiente')
+    intentos = models.IntegerField(default=0)
+    proximo_intento = models.DateTimeField(default=timezone.now)
+    ultimo_error = models.TextField(blank=True)
+    # Transacción firmada (msgpack en base64) y su txid, guardados antes de enviarla:
+    # un reintento reenvía los mismos bytes y algod no puede aplicarla dos veces.
+    firmada = models.TextField(blank=True)
+    txid = models.CharField(max_length=128, null=True, blank=True)
+    ultima_ronda_valida = models.BigIntegerField(null=True, blank=True)
+    fecha_creacion = models.DateTimeField(default=timezone.now)
+    fecha_envio = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['estado', 'proximo_intento'], name='pago_saliente_cola_idx'),
+        ]
+
+    @property
+    def monto_algos(self):
+        return self.monto / 1_000_000
+
+    def __str__(self):
+        return f"{self.clave} → {self.receiver[:8]}... ({self.monto_algos} ALGOs, {self.estado})"
+
+
+# =========================
+# HISTORIAL ON-CHAIN (ESPEJO DEL INDEXER)
+# =========================
+class MovimientoIndexado(models.Model):
+    wallet = models.ForeignKey(Wallet, on_delete=models.CASCADE, related_name='movimientos')
+    txid = models.CharField(max_length=128)
+    tipo = models.CharField(max_length=20)
+    sender = models.CharField(max_length=128)
+    receiver = models.CharField(max_length=128, blank=True)
+    amount = models.BigIntegerField(default=0)  # microAlgos
+    fee = models.BigIntegerField(default=0)  # microAlgos
+    confirmed_round = models.BigIntegerField()
+    fecha = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['wallet', 'txid'], name='movimiento_wallet_txid_unico'),
+        ]
+        indexes = [
+            models.Index(fields=['wallet', '-confirmed_round'], name='movimiento_wallet_ronda_idx'),
+        ]
+
+    @property
+    def monto(self):
+        return self.amount / 1_000_000
+
+    def __str__(self):
+        return f"{self.tipo} {self.txid[:8]}... ({self.monto} ALGOs)"
+
+
+class CursorIndexer(models.Model):
+    wallet = models.OneToOneField(Wallet, on_delete=models.CASCADE, related_name='cursor_indexer')
+    min_round = models.BigIntegerField(default=0)
+    actualizado = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.wallet.address[:8]}... desde ronda {self.min_round}"
+
+
+# =========================
+# VERIFICACIÓN DE TRANSACCIONES CONTRA EL INDEXER
+# =========================
+# Checkpoint de `manage.py reconcile_transactions` (wallet/verificacion.py).
+class CursorVerificacion(models.Model):
+    nombre = models.CharField(max_length=50, unique=True)
+    ultimo_id = models.BigIntegerField(default=0)  # último `Transaccion` revisado en la pasada en curso
+    revisadas = models.IntegerField(default=0)
+    corregidas = models.IntegerField(default=0)
+    inicio = models.DateTimeField(null=True, blank=True)  # None: no hay una pasada a medias
+    actualizado = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.nombre}: hasta id {self.ultimo_id} ({self.revisadas} revisadas)"
+
+
+# =========================
+# LEDGER LOCAL (MICROALGOS)
+# =========================
+# Asientos en microAlgos enteros y un saldo corrido por wallet, escritos en la misma
+# transacción (wallet/ledger.py). algod sólo se consulta para conciliar.
+class AsientoLedger(models.Model):
+    TIPO_CHOICES = (
+        ('pago', 'Pago enviado'),
+        ('cobro', 'Pago recibido'),
+        ('comision', 'Comisión de red'),
+        ('ajuste', 'Ajuste de conciliación'),
+    )
+
+    wallet = models.ForeignKey(Wallet, on_delete=models.CASCADE, related_name='asientos')
+    transaccion = models.ForeignKey(
+        Transaccion, on_delete=models.SET_NULL, null=True, blank=True, related_name='asientos'
+    )
+    tipo = models.CharField(max_length=20, choices=TIPO_CHOICES)
+    monto = models.BigIntegerField()  # microAlgos, con signo
+    saldo_resultante = models.BigIntegerField()  # microAlgos
+    fecha = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['wallet', '-id'], name='asiento_wallet_idx'),
+        ]
+        constraints = [
+            # Una transacción se asienta una sola vez por wallet y tipo; los ajustes y
+            # reversos no llevan `transaccion` y no entran en la restricción.
+            models.UniqueConstraint(fields=['transaccion', 'wallet', 'tipo'], name='asiento_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} {self.monto / 1_000_000} ALGOs ({self.wallet.address[:8]}...)"
+
+
+class SaldoWallet(models.Model):
+    wallet = models.OneToOneField(Wallet, on_delete=models.CASCADE, related_name='saldo_local')
+    saldo = models.BigIntegerField(default=0)  # microAlgos
+    total_pagado = models.BigIntegerField(default=0)  # microAlgos, sin comisiones
+    total_recibido = models.BigIntegerField(default=0)  # microAlgos
+    conciliado = models.DateTimeField(null=True, blank=True)
+
+    @property
+    def saldo_algos(self):
+        return self.saldo / 1_000_000
+
+    def __str__(self):
+        return f"{self.wallet.address[:8]}...: {self.saldo_algos} ALGOs"
+
+
+# =========================
+# POOL DE LLAVES PREGENERADAS
+# =========================
+class LlavePregenerada(models.Model):
+    address = models.CharField(max_length=128, unique=True)
+    private_key = models.TextField()
+    fecha_creacion = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Llave libre {self.address[:8]}..."
+
+
+# =========================
+# RESÚMENES PARA DASHBOARDS
+# =========================
+# Se mantienen de forma incremental desde wallet/summaries.py; `manage.py rebuild_summaries` los recalcula.
+class ResumenRol(models.Model):
+    role = models.CharField(max_length=20, choices=User.ROLES, unique=True)
+    total = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.role}: {self.total}"
+
+
+class ResumenDocente(models.Model):
+    docente = models.OneToOneField(User, on_delete=models.CASCADE, related_name='resumen_docente')
+    actividades = models.IntegerField(default=0)
+    asignaciones = models.IntegerField(default=0)
+    recompensas_algos = models.DecimalField(max_digits=18, decimal_places=6, default=0)
+
+    def __str__(self):
+        return f"Resumen de {self.docente.username}"
+
+
+class ResumenAlumno(models.Model):
+    alumno = models.OneToOneField(User, on_delete=models.CASCADE, related_name='resumen_alumno')
+    asignaciones = models.IntegerField(default=0)
+    algos_ganados = models.DecimalField(max_digits=18, decimal_places=6, default=0)
+
+    def __str__(self):
+        return f"Resumen de {self.alumno.username}"
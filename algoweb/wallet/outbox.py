@@ -0,0 +1,276 @@
+import hashlib
+import logging
+import time
+from datetime import timedelta
+from itertools import groupby
+
+from algosdk import encoding, transaction as algo_tx
+from django.conf import settings
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from .cache import invalidate_accounts
+from .ledger import a_algos
+from .models import PagoSaliente, Transaccion, ActividadAsignada, Liquidacion
+from .params import SuggestedParamsProvider
+from .payments import MAX_GROUP_SIZE, to_private_key
+
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# CONFIGURACIÓN
+# =========================
+OUTBOX_SETTINGS = {
+    # Pagos que toma el despachador en cada pasada.
+    'BATCH_SIZE': 256,
+    # Espera antes del reintento n: BACKOFF_BASE * 2**(n-1) segundos, hasta BACKOFF_MAX.
+    'BACKOFF_BASE': 2.0,
+    'BACKOFF_MAX': 300.0,
+    # Intentos antes de dar el pago por fallido.
+    'MAX_INTENTOS': 8,
+    # Segundos entre pasadas cuando la cola está vacía (`dispatch_outbox` sin --once).
+    'INTERVALO': 1.0,
+}
+OUTBOX_SETTINGS.update(getattr(settings, 'WALLET_OUTBOX', {}))
+
+
+# =========================
+# ENCOLADO (DESDE LAS VISTAS)
+# =========================
+def encolar(origen, tipo, pagos):
+    """Registra un `Transaccion` en cola y su `PagoSaliente` por cada pago de `origen`.
+
+    `pagos` es una lista de dicts con `clave`, `receptor` (User), `address`,
+    `monto` (microAlgos) y opcionalmente `asignacion` o `liquidacion`. Debe llamarse dentro
+    de la transacción que crea las asignaciones: si esa transacción se
+    revierte, no queda ningún pago en cola. Una clave repetida lanza
+    `IntegrityError` (restricción única de `clave`).
+    """
+    transacciones = Transaccion.objects.bulk_create([
+        Transaccion(
+            sender=origen.user.username,
+            receiver=pago['receptor'].username,
+            amount=a_algos(pago['monto']),
+            tipo=tipo,
+            estado='queued',
+        )
+        for pago in pagos
+    ])
+    return PagoSaliente.objects.bulk_create([
+        PagoSaliente(
+            clave=pago['clave'],
+            origen=origen,
+            receiver=pago['address'],
+            monto=pago['monto'],
+            transaccion=tx,
+            asignacion=pago.get('asignacion'),
+            liquidacion=pago.get('liquidacion'),
+        )
+        for pago, tx in zip(pagos, transacciones)
+    ])
+
+
+# =========================
+# DESPACHO
+# =========================
+def lease(clave):
+    """Lease de Algorand derivado de la clave de idempotencia.
+
+    Dos transacciones del mismo emisor con el mismo lease no pueden
+    confirmarse con ventanas de validez que se traslapen, así que volver a
+    firmar un pago no puede pagarlo dos veces aunque la primera firma siga
+    viva en algún pool.
+    """
+    return hashlib.sha256(clave.encode()).digest()
+
+
+def espera_reintento(intentos):
+    segundos = OUTBOX_SETTINGS['BACKOFF_BASE'] * 2 ** max(intentos - 1, 0)
+    return timedelta(seconds=min(segundos, OUTBOX_SETTINGS['BACKOFF_MAX']))
+
+
+def _ya_en_ledger(error):
+    return 'already in ledger' in str(error)
+
+
+class Despachador:
+    """Vacía el outbox: firma, envía con `send_transactions` y reintenta con backoff.
+
+    Cada pasada reclama un lote de pagos vencidos (`select_for_update` con
+    `skip_locked`, así varios despachadores no toman el mismo pago), guarda
+    la firma y el txid *antes* de enviar y adelanta `proximo_intento`; si el
+    proceso muere a medio envío, el pago vuelve a salir tras el backoff y el
+    reintento descubre por el txid guardado si ya había llegado a algod.
+
+    Los primeros intentos viajan en grupos atómicos de hasta 16 por emisor.
+    Los reintentos van de uno en uno, para que un pago rechazado no arrastre
+    a los demás de su grupo.
+    """
+
+    def __init__(self, client, batch_size=None, max_intentos=None):
+        self.client = client
+        self.batch_size = batch_size or OUTBOX_SETTINGS['BATCH_SIZE']
+        self.max_intentos = max_intentos or OUTBOX_SETTINGS['MAX_INTENTOS']
+        self.params = SuggestedParamsProvider(client)
+
+    def _reclamar(self):
+        """Toma los pagos vencidos, los firma y guarda el intento. Devuelve [(envio, pagos)]."""
+        ahora = timezone.now()
+        vencidos = PagoSaliente.objects.filter(estado='pendiente', proximo_intento__lte=ahora)
+        if not vencidos.exists():
+            return []
+        # Fuera del atomic: si hay que pedirlos a algod, la espera no retiene el
+        # lock de escritura (BEGIN IMMEDIATE) que toma la transacción.
+        params = self.params.get()
+
+        with transaction.atomic():
+            pagos = list(
+                vencidos.select_for_update(skip_locked=True, of=('self',))
+                .select_related('origen')
+                .order_by('origen_id', 'proximo_intento', 'id')[:self.batch_size]
+            )
+            if not pagos:
+                return []
+
+            envios = []
+            primeros = [p for p in pagos if not p.intentos]
+            for _, del_origen in groupby(primeros, key=lambda p: p.origen_id):
+                del_origen = list(del_origen)
+                for inicio in range(0, len(del_origen), MAX_GROUP_SIZE):
+                    envios.append(self._firmar(del_origen[inicio:inicio + MAX_GROUP_SIZE], params))
+            for pago in pagos:
+                if pago.intentos:
+                    envios.append(self._reintento(pago, params))
+
+            for pago in pagos:
+                pago.intentos += 1
+                pago.proximo_intento = ahora + espera_reintento(pago.intentos)
+            PagoSaliente.objects.bulk_update(
+                pagos, ['intentos', 'proximo_intento', 'firmada', 'txid', 'ultima_ronda_valida']
+            )
+        return envios
+
+    def _firmar(self, pagos, params):
+        sk = to_private_key(pagos[0].origen.private_key)
+        txns = [
+            algo_tx.PaymentTxn(pago.origen.address, params, pago.receiver, pago.monto, lease=lease(pago.clave))
+            for pago in pagos
+        ]
+        if len(txns) > 1:
+            algo_tx.assign_group_id(txns)
+        firmadas = [txn.sign(sk) for txn in txns]
+        for pago, stx in zip(pagos, firmadas):
+            pago.firmada = encoding.msgpack_encode(stx)
+            pago.txid = stx.get_txid()
+            pago.ultima_ronda_valida = stx.transaction.last_valid_round
+        return firmadas, pagos
+
+    def _reintento(self, pago, params):
+        """Reenvía la misma firma si sigue siendo válida y no era parte de un grupo; si no, vuelve a firmar."""
+        if pago.firmada:
+            stx = encoding.msgpack_decode(pago.firmada)
+            if stx.transaction.group is None and params.first <= pago.ultima_ronda_valida:
+                return [stx], [pago]
+            if self._ya_enviado(pago.txid):
+                return [], [pago]
+        return self._firmar([pago], params)
+
+    def _ya_enviado(self, txid):
+        """True si algod ya tiene `txid` en el pool sin error o confirmado."""
+        try:
+            info = self.client.pending_transaction_info(txid)
+        except Exception:
+            return False
+        if info.get('confirmed-round', 0) > 0:
+            # Una ronda real de la red: adelanta `first` si la estimación por tiempo se quedó atrás.
+            self.params.observe_round(info['confirmed-round'])
+            return True
+        return not info.get('pool-error')
+
+    def despachar(self):
+        """Una pasada sobre el outbox. Devuelve (enviados, fallidos definitivos)."""
+        enviados, con_error = [], []
+        for firmadas, pagos in self._reclamar():
+            if not firmadas:
+                enviados.extend(pagos)
+                continue
+            try:
+                self.client.send_transactions(firmadas)
+            except Exception as e:
+                if _ya_en_ledger(e):
+                    enviados.extend(pagos)
+                    continue
+                logger.warning("Envío de %d pagos del outbox rechazado: %s", len(pagos), e)
+                for pago in pagos:
+                    pago.ultimo_error = str(e)[:1000]
+                con_error.extend(pagos)
+            else:
+                enviados.extend(pagos)
+
+        fallidos = [p for p in con_error if p.intentos >= self.max_intentos]
+        self._resolver(enviados, con_error, fallidos)
+        return enviados, fallidos
+
+    def _resolver(self, enviados, con_error, fallidos):
+        ahora = timezone.now()
+        for pago in enviados:
+            pago.estado = 'enviado'
+            pago.fecha_envio = ahora
+        for pago in fallidos:
+            pago.estado = 'fallido'
+
+        with transaction.atomic():
+            PagoSaliente.objects.bulk_update(enviados + con_error, ['estado', 'fecha_envio', 'ultimo_error'])
+
+            # La confirmación la resuelve el tracker (manage.py track_confirmations).
+            transacciones = [
+                Transaccion(id=p.transaccion_id, txid=p.txid, estado='pending', detalle=None) for p in enviados
+            ] + [
+                Transaccion(id=p.transaccion_id, txid=None, estado='failed', detalle=p.ultimo_error) for p in fallidos
+            ]
+            Transaccion.objects.bulk_update(transacciones, ['txid', 'estado', 'detalle'])
+
+            asignaciones = [
+                ActividadAsignada(id=p.asignacion_id, txid=p.txid, estado='completada')
+                for p in enviados if p.asignacion_id
+            ]
+            ActividadAsignada.objects.bulk_update(asignaciones, ['txid', 'estado'])
+            # La recompensa no salió: la asignación queda pendiente y sin monto pagado.
+            ActividadAsignada.objects.filter(id__in=[p.asignacion_id for p in fallidos if p.asignacion_id]) \
+                .update(estado='pendiente', monto_algos=0)
+
+            # Una liquidación enviada salda sus asignaciones con su txid; si falla,
+            # las asignaciones vuelven a quedar adeudadas para la próxima liquidación.
+            liquidadas = [
+                Liquidacion(id=p.liquidacion_id, txid=p.txid, estado='enviada') for p in enviados if p.liquidacion_id
+            ]
+            Liquidacion.objects.bulk_update(liquidadas, ['txid', 'estado'])
+            ActividadAsignada.objects.filter(liquidacion_id__in=[l.id for l in liquidadas]).update(
+                estado='completada',
+                txid=Subquery(Liquidacion.objects.filter(pk=OuterRef('liquidacion_id')).values('txid')[:1]),
+            )
+            sin_liquidar = [p.liquidacion_id for p in fallidos if p.liquidacion_id]
+            Liquidacion.objects.filter(id__in=sin_liquidar).update(estado='fallida')
+            ActividadAsignada.objects.filter(liquidacion_id__in=sin_liquidar).update(liquidacion=None)
+
+        direcciones = set()
+        for pago in enviados:
+            direcciones.update([pago.origen.address, pago.receiver])
+        invalidate_accounts(*direcciones)
+
+    def run(self, intervalo=None, detener=None):
+        """Bucle del worker: pasa de inmediato mientras haya trabajo y espera `intervalo` si no."""
+        intervalo = intervalo if intervalo is not None else OUTBOX_SETTINGS['INTERVALO']
+        while detener is None or not detener.is_set():
+            try:
+                enviados, fallidos = self.despachar()
+                if enviados or fallidos:
+                    continue
+            except Exception as e:
+                logger.exception("Error en el despachador del outbox: %s", e)
+            if detener is None:
+                time.sleep(intervalo)
+            elif detener.wait(intervalo):
+                break
@@ -0,0 +1,126 @@
+import base64
+import json
+from functools import reduce
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+# =========================
+# CURSORES OPACOS
+# =========================
+def _codificar(valores, direccion):
+    crudo = json.dumps({'v': valores, 'd': direccion}, default=str, separators=(',', ':'))
+    return base64.urlsafe_b64encode(crudo.encode()).decode().rstrip('=')
+
+
+def _decodificar(cursor, campos):
+    """Devuelve `(valores, direccion)` o None si el cursor no es válido.
+
+    Cada valor se convierte con `to_python` del campo de orden que le toca:
+    un cursor alterado vuelve a la primera página en lugar de llegar al ORM.
+    """
+    if not cursor:
+        return None
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        datos = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        if datos['d'] not in ('n', 'p') or not isinstance(datos['v'], list) or len(datos['v']) != len(campos):
+            return None
+        valores = [campo.to_python(valor) for campo, valor in zip(campos, datos['v'])]
+        if None in valores:
+            return None
+        return valores, datos['d']
+    except (ValidationError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _campo(modelo, nombre):
+    """El campo del modelo al que llega `nombre` (admite `relacion__campo`)."""
+    for parte in nombre.split('__'):
+        campo = modelo._meta.get_field(parte)
+        modelo = campo.related_model
+    return campo
+
+
+# =========================
+# PAGINACIÓN POR KEYSET
+# =========================
+class KeysetPage:
+    def __init__(self, items, next_cursor, prev_cursor):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.prev_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def _condicion(campos, valores, adelante):
+    """(a, b) después de (va, vb) en el orden de `campos`, como OR de prefijos iguales."""
+    opciones = []
+    for i, campo in enumerate(campos):
+        nombre = campo.lstrip('-')
+        descendente = campo.startswith('-')
+        operador = 'lt' if descendente == adelante else 'gt'
+        iguales = {c.lstrip('-'): v for c, v in zip(campos[:i], valores[:i])}
+        opciones.append(Q(**iguales, **{f'{nombre}__{operador}': valores[i]}))
+    return reduce(lambda a, b: a | b, opciones)
+
+
+def _invertir(campo):
+    return campo[1:] if campo.startswith('-') else f'-{campo}'
+
+
+def paginar_keyset(queryset, cursor, campos=('-fecha_creacion', '-id'), por_pagina=25):
+    """Página de `queryset` ordenada por `campos` a partir de un cursor opaco.
+
+    Cada página es un `WHERE (campos) > (cursor) ORDER BY campos LIMIT n+1`,
+    así que el costo no crece con la profundidad como con OFFSET. El último
+    campo debe ser único (normalmente `id`) para que el orden sea total.
+    """
+    campos = list(campos)
+    nombres = [c.lstrip('-') for c in campos]
+    decodificado = _decodificar(cursor, [_campo(queryset.model, n) for n in nombres])
+
+    if decodificado is None:
+        filas = list(queryset.order_by(*campos)[:por_pagina + 1])
+        hay_mas = len(filas) > por_pagina
+        filas = filas[:por_pagina]
+        hay_siguiente, hay_anterior = hay_mas, False
+    else:
+        valores, direccion = decodificado
+        adelante = direccion == 'n'
+        orden = campos if adelante else [_invertir(c) for c in campos]
+        filas = list(queryset.filter(_condicion(campos, valores, adelante)).order_by(*orden)[:por_pagina + 1])
+        hay_mas = len(filas) > por_pagina
+        filas = filas[:por_pagina]
+        if adelante:
+            hay_siguiente, hay_anterior = hay_mas, True
+        else:
+            filas.reverse()
+            hay_siguiente, hay_anterior = True, hay_mas
+
+    def clave(obj):
+        valores = []
+        for nombre in nombres:
+            valor = obj
+            for parte in nombre.split('__'):
+                valor = getattr(valor, parte)
+            valores.append(valor)
+        return valores
+
+    siguiente = _codificar(clave(filas[-1]), 'n') if filas and hay_siguiente else None
+    anterior = _codificar(clave(filas[0]), 'p') if filas and hay_anterior else None
+    return KeysetPage(filas, siguiente, anterior)
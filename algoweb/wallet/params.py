@@ -0,0 +1,86 @@
+import copy
+import threading
+import time
+
+from django.conf import settings
+
+
+# =========================
+# CONFIGURACIÓN
+# =========================
+SUGGESTED_PARAMS_SETTINGS = {
+    # Rondas tras las cuales se vuelve a pedir /transactions/params.
+    'REFRESH_ROUNDS': 5,
+    # Duración aproximada de una ronda en TestNet.
+    'ROUND_SECONDS': 2.8,
+    # Ventana de validez (last - first) que se asigna localmente.
+    'VALIDITY_ROUNDS': 1000,
+}
+SUGGESTED_PARAMS_SETTINGS.update(getattr(settings, 'WALLET_SUGGESTED_PARAMS', {}))
+
+
+# =========================
+# PROVEEDOR DE SUGGESTED PARAMS
+# =========================
+class SuggestedParamsProvider:
+    """Cachea `suggested_params()` y calcula la ventana first/last sin ir a la red.
+
+    Los parámetros se refrescan cuando han pasado `refresh_rounds` rondas
+    (estimadas por tiempo o informadas con `observe_round`). `first` es la
+    última ronda conocida, así que nunca queda en el futuro respecto a la red.
+    """
+
+    def __init__(self, client, refresh_rounds=None, round_seconds=None, validity_rounds=None,
+                 reloj=time.monotonic):
+        self.client = client
+        self.refresh_rounds = refresh_rounds or SUGGESTED_PARAMS_SETTINGS['REFRESH_ROUNDS']
+        self.round_seconds = round_seconds or SUGGESTED_PARAMS_SETTINGS['ROUND_SECONDS']
+        self.validity_rounds = validity_rounds or SUGGESTED_PARAMS_SETTINGS['VALIDITY_ROUNDS']
+        self._reloj = reloj
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._base = None
+        self._ronda_base = 0
+        self._ronda_actual = 0
+        self._obtenido = 0.0
+
+    def _rondas_estimadas(self):
+        return int((self._reloj() - self._obtenido) / self.round_seconds)
+
+    def _vencido(self):
+        if self._base is None:
+            return True
+        transcurridas = max(self._rondas_estimadas(), self._ronda_actual - self._ronda_base)
+        return transcurridas >= self.refresh_rounds
+
+    def refresh(self):
+        params = self.client.suggested_params()
+        with self._lock:
+            self._base = params
+            self._ronda_base = params.first
+            self._ronda_actual = max(self._ronda_actual, params.first)
+            self._obtenido = self._reloj()
+        return params
+
+    def observe_round(self, ronda):
+        """Informa una ronda vista en otro lado (p. ej. `status_after_block`)."""
+        with self._lock:
+            self._ronda_actual = max(self._ronda_actual, ronda)
+
+    def get(self):
+        """Devuelve una copia de los params con first/last calculados localmente."""
+        with self._lock:
+            vencido = self._vencido()
+        if vencido:
+            # Un solo hilo refresca; los demás reutilizan su resultado.
+            with self._refresh_lock:
+                with self._lock:
+                    vencido = self._vencido()
+                if vencido:
+                    self.refresh()
+
+        with self._lock:
+            params = copy.copy(self._base)
+            params.first = self._ronda_actual
+            params.last = self._ronda_actual + self.validity_rounds
+        return params
@@ -0,0 +1,38 @@
+import base64
+
+from algosdk import mnemonic
+
+# Límite de transacciones por grupo atómico en Algorand (el outbox agrupa con él).
+MAX_GROUP_SIZE = 16
+
+
+# =========================
+# LLAVES
+# =========================
+def to_private_key(stored_key):
+    """Convierte el valor almacenado en la BD a la private key que .sign() acepta (base64)."""
+    if stored_key is None:
+        raise ValueError("No private key provided")
+
+    if isinstance(stored_key, (bytes, bytearray)):
+        return base64.b64encode(bytes(stored_key)).decode()
+
+    if isinstance(stored_key, str):
+        # mnemonic de 25 palabras
+        if len(stored_key.split()) == 25:
+            try:
+                return mnemonic.to_private_key(stored_key)
+            except Exception:
+                pass
+
+        # base64 (formato de account.generate_account)
+        try:
+            if base64.b64decode(stored_key, validate=True):
+                return stored_key
+        except Exception:
+            pass
+
+        # raw
+        return base64.b64encode(stored_key.encode()).decode()
+
+    raise ValueError("Formato de private_key no soportado")
@@ -0,0 +1,66 @@
+import contextvars
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+
+
+# =========================
+# LECTURAS EN RÉPLICA
+# =========================
+REPLICA_ALIAS = 'replica'
+
+# True mientras corre una vista de sólo lectura marcada con `lectura_en_replica`.
+LEER_DE_REPLICA = contextvars.ContextVar('wallet_leer_de_replica', default=False)
+
+
+def lectura_en_replica(vista):
+    """Manda las lecturas de la vista (GET/HEAD) a la réplica, si hay una configurada.
+
+    Sólo para dashboards y listados: la réplica puede ir unos instantes por
+    detrás de `default`, así que las vistas que leen lo que acaban de escribir
+    se quedan en la primaria. Funciona con vistas sync y async; el ContextVar
+    viaja con `sync_to_async` hasta el hilo del ORM.
+    """
+    if iscoroutinefunction(vista):
+        @wraps(vista)
+        async def envoltura(request, *args, **kwargs):
+            token = LEER_DE_REPLICA.set(request.method in ('GET', 'HEAD'))
+            try:
+                return await vista(request, *args, **kwargs)
+            finally:
+                LEER_DE_REPLICA.reset(token)
+    else:
+        @wraps(vista)
+        def envoltura(request, *args, **kwargs):
+            token = LEER_DE_REPLICA.set(request.method in ('GET', 'HEAD'))
+            try:
+                return vista(request, *args, **kwargs)
+            finally:
+                LEER_DE_REPLICA.reset(token)
+    return envoltura
+
+
+class ReplicaRouter:
+    """Escrituras y migraciones a `default`; lecturas marcadas a `replica` si existe."""
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == 'django_cache':
+            # Las versiones de CACHES['versiones'] se leen de la primaria: en la
+            # réplica podrían ir detrás de la invalidación que acaba de hacerse.
+            return 'default'
+        if LEER_DE_REPLICA.get() and REPLICA_ALIAS in settings.DATABASES:
+            return REPLICA_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # La réplica es una copia de `default`: los objetos de ambas se pueden relacionar.
+        if {obj1._state.db, obj2._state.db} <= {'default', REPLICA_ALIAS}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA_ALIAS
@@ -0,0 +1,106 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from . import fragmentos, ledger, summaries
+from .models import User, Wallet, Alumno, Actividad, ActividadAsignada, Transaccion
+
+
+# =========================
+# USUARIOS
+# =========================
+@receiver(pre_save, sender=User)
+def _guardar_rol_anterior(sender, instance, update_fields=None, **kwargs):
+    # El login guarda sólo last_login: no hace falta consultar el rol anterior.
+    if instance.pk and (update_fields is None or 'role' in update_fields):
+        instance._rol_anterior = User.objects.filter(pk=instance.pk).values_list('role', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+def _usuario_guardado(sender, instance, created, **kwargs):
+    if created:
+        summaries.usuario_creado(instance.role)
+        return
+    anterior = getattr(instance, '_rol_anterior', None)
+    if anterior and anterior != instance.role:
+        summaries.rol_cambiado(anterior, instance.role)
+
+
+@receiver(post_delete, sender=User)
+def _usuario_borrado(sender, instance, **kwargs):
+    summaries.usuario_creado(instance.role, -1)
+
+
+# =========================
+# ACTIVIDADES Y ASIGNACIONES
+# =========================
+@receiver(post_save, sender=Actividad)
+def _actividad_guardada(sender, instance, created, **kwargs):
+    if created:
+        summaries.actividad_creada(instance.docente_id)
+
+
+@receiver(post_delete, sender=Actividad)
+def _actividad_borrada(sender, instance, **kwargs):
+    summaries.actividad_creada(instance.docente_id, -1)
+
+
+@receiver(post_save, sender=ActividadAsignada)
+def _asignacion_guardada(sender, instance, created, **kwargs):
+    if created:
+        summaries.asignaciones_creadas([instance])
+
+
+@receiver(post_delete, sender=ActividadAsignada)
+def _asignacion_borrada(sender, instance, **kwargs):
+    summaries.asignaciones_creadas([instance], -1)
+
+
+# =========================
+# TRANSACCIONES
+# =========================
+@receiver(pre_save, sender=Transaccion)
+def _guardar_estado_anterior(sender, instance, **kwargs):
+    if instance.pk:
+        instance._estado_anterior = Transaccion.objects.filter(pk=instance.pk).values_list('estado', flat=True).first()
+
+
+@receiver(post_save, sender=Transaccion)
+def _transaccion_guardada(sender, instance, created, **kwargs):
+    anterior = None if created else getattr(instance, '_estado_anterior', None)
+    if instance.estado == 'confirmed' and anterior != 'confirmed':
+        summaries.pagos_confirmados([instance])
+        ledger.pagos_confirmados([instance])
+    elif anterior == 'confirmed' and instance.estado != 'confirmed':
+        summaries.pagos_confirmados([instance], -1)
+        ledger.pagos_confirmados([instance], -1)
+
+
+@receiver(post_delete, sender=Transaccion)
+def _transaccion_borrada(sender, instance, **kwargs):
+    if instance.estado == 'confirmed':
+        summaries.pagos_confirmados([instance], -1)
+        # La fila ya no existe: el reverso queda sin `transaccion`.
+        ledger.pagos_confirmados([instance], -1, ligar=False)
+
+
+# =========================
+# FRAGMENTOS EN CACHÉ
+# =========================
+# Las asignaciones y pagos llegan a los dashboards a través de los resúmenes,
+# que suben la versión 'resumenes' en summaries._incrementar.
+@receiver([post_save, post_delete], sender=Actividad)
+def _actividades_cambiaron(sender, **kwargs):
+    fragmentos.invalidar('actividades')
+
+
+@receiver([post_save, post_delete], sender=Alumno)
+@receiver([post_save, post_delete], sender=Wallet)
+def _alumnos_cambiaron(sender, **kwargs):
+    fragmentos.invalidar('alumnos')
+
+
+@receiver(post_save, sender=User)
+def _usuario_cambio(sender, update_fields=None, **kwargs):
+    # El login sólo guarda last_login, que no aparece en ningún listado.
+    if update_fields is None or set(update_fields) != {'last_login'}:
+        fragmentos.invalidar('alumnos')
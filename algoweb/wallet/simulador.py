@@ -0,0 +1,212 @@
+import base64
+import random
+import threading
+import time
+
+from algosdk import transaction
+from algosdk.error import AlgodHTTPError, IndexerHTTPError
+
+
+# =========================
+# LEDGER EN MEMORIA
+# =========================
+class LedgerSimulado:
+    """Estado determinista de una red Algorand local: saldos, rondas y transacciones.
+
+    Los saldos cambian al aceptar la transacción en el pool; la confirmación
+    llega `rondas_confirmacion` rondas después, cuando se llama a `avanzar`
+    (o el tracker espera con `status_after_block`). Sólo las confirmadas
+    aparecen en el indexer.
+    """
+
+    GENESIS_HASH = base64.b64encode(b'simulado'.ljust(32, b'\0')).decode()
+    GENESIS_ID = 'simulado-v1.0'
+    MIN_FEE = 1000
+    MIN_BALANCE = 100_000
+
+    def __init__(self, saldos=None, ronda=1000, rondas_confirmacion=1):
+        self.saldos = dict(saldos or {})
+        self.ronda = ronda
+        self.rondas_confirmacion = rondas_confirmacion
+        self.pendientes = {}
+        self.confirmadas = {}
+        self._lock = threading.Lock()
+
+    def fondear(self, address, monto):
+        with self._lock:
+            self.saldos[address] = self.saldos.get(address, 0) + monto
+
+    def avanzar(self, rondas=1):
+        """Avanza la red y confirma lo que ya cumplió sus rondas. Devuelve la ronda nueva."""
+        with self._lock:
+            self.ronda += rondas
+            for txid, info in list(self.pendientes.items()):
+                if info['_ronda_confirmacion'] <= self.ronda:
+                    del self.pendientes[txid]
+                    info['confirmed-round'] = info.pop('_ronda_confirmacion')
+                    self.confirmadas[txid] = info
+            return self.ronda
+
+    def aceptar(self, firmadas):
+        """Valida y aplica un grupo completo o ninguno, como el pool de algod."""
+        with self._lock:
+            cargos = {}
+            for stx in firmadas:
+                txn = stx.transaction
+                if stx.get_txid() in self.pendientes or stx.get_txid() in self.confirmadas:
+                    raise AlgodHTTPError(f"transaction {stx.get_txid()}: transaction already in ledger", 400)
+                if not txn.first_valid_round <= self.ronda <= txn.last_valid_round:
+                    raise AlgodHTTPError(f"txn dead: round {self.ronda} outside of "
+                                         f"{txn.first_valid_round}--{txn.last_valid_round}", 400)
+                cargos[txn.sender] = cargos.get(txn.sender, 0) + getattr(txn, 'amt', 0) + txn.fee
+            for sender, cargo in cargos.items():
+                if self.saldos.get(sender, 0) - cargo < self.MIN_BALANCE:
+                    raise AlgodHTTPError(f"overspend (account {sender})", 400)
+
+            for stx in firmadas:
+                txn = stx.transaction
+                amt = getattr(txn, 'amt', 0)
+                self.saldos[txn.sender] -= amt + txn.fee
+                receiver = getattr(txn, 'receiver', None)
+                if receiver:
+                    self.saldos[receiver] = self.saldos.get(receiver, 0) + amt
+                self.pendientes[stx.get_txid()] = {
+                    'pool-error': '',
+                    'txn': {'txn': {
+                        'type': txn.type, 'snd': txn.sender, 'rcv': receiver, 'amt': amt, 'fee': txn.fee,
+                        'fv': txn.first_valid_round, 'lv': txn.last_valid_round,
+                    }},
+                    '_ronda_confirmacion': self.ronda + self.rondas_confirmacion,
+                }
+            return firmadas[0].get_txid()
+
+
+# =========================
+# LATENCIA Y FALLAS
+# =========================
+class _ServicioSimulado:
+    error_http = AlgodHTTPError
+
+    def __init__(self, ledger, latencia=0.0, fallas=None, semilla=0):
+        """`latencia`: segundos por llamada, o dict método -> segundos.
+        `fallas`: dict método -> probabilidad de responder con error HTTP 503.
+        """
+        self.ledger = ledger
+        self.latencia = latencia
+        self.fallas = dict(fallas or {})
+        self.llamadas = {}
+        self._forzadas = {}
+        self._random = random.Random(semilla)
+        self._lock = threading.Lock()
+
+    def fallar(self, metodo, veces=1):
+        """Hace fallar las próximas `veces` llamadas a `metodo`."""
+        with self._lock:
+            self._forzadas[metodo] = self._forzadas.get(metodo, 0) + veces
+
+    def _llamar(self, metodo):
+        with self._lock:
+            self.llamadas[metodo] = self.llamadas.get(metodo, 0) + 1
+            forzada = self._forzadas.get(metodo, 0) > 0
+            if forzada:
+                self._forzadas[metodo] -= 1
+            falla = forzada or self._random.random() < self.fallas.get(metodo, 0)
+        latencia = self.latencia.get(metodo, 0) if isinstance(self.latencia, dict) else self.latencia
+        if latencia:
+            time.sleep(latencia)
+        if falla:
+            raise self.error_http(f"{metodo}: falla simulada", 503)
+
+
+class AlgodSimulado(_ServicioSimulado):
+    """Los métodos de `AlgodClient` que usa la app, contra un `LedgerSimulado`."""
+
+    def status(self):
+        self._llamar('status')
+        return {'last-round': self.ledger.ronda}
+
+    def status_after_block(self, block_num):
+        self._llamar('status_after_block')
+        if self.ledger.ronda <= block_num:
+            self.ledger.avanzar(block_num + 1 - self.ledger.ronda)
+        return {'last-round': self.ledger.ronda}
+
+    def suggested_params(self):
+        self._llamar('suggested_params')
+        ronda = self.ledger.ronda
+        return transaction.SuggestedParams(
+            self.ledger.MIN_FEE, ronda, ronda + 1000, self.ledger.GENESIS_HASH, self.ledger.GENESIS_ID,
+            flat_fee=True, min_fee=self.ledger.MIN_FEE,
+        )
+
+    def account_info(self, address):
+        self._llamar('account_info')
+        monto = self.ledger.saldos.get(address, 0)
+        return {
+            'address': address, 'amount': monto, 'amount-without-pending-rewards': monto,
+            'min-balance': self.ledger.MIN_BALANCE, 'assets': [], 'round': self.ledger.ronda,
+            'status': 'Offline',
+        }
+
+    def send_transaction(self, txn):
+        self._llamar('send_transaction')
+        return self.ledger.aceptar([txn])
+
+    def send_transactions(self, txns):
+        self._llamar('send_transactions')
+        return self.ledger.aceptar(list(txns))
+
+    def pending_transaction_info(self, transaction_id):
+        self._llamar('pending_transaction_info')
+        info = self.ledger.pendientes.get(transaction_id)
+        if info is not None:
+            return {k: v for k, v in info.items() if not k.startswith('_')}
+        if transaction_id in self.ledger.confirmadas:
+            return self.ledger.confirmadas[transaction_id]
+        raise AlgodHTTPError("txn does not exist", 404)
+
+
+class IndexerSimulado(_ServicioSimulado):
+    """`search_transactions_by_address` y `transaction` del indexer sobre las transacciones confirmadas."""
+
+    error_http = IndexerHTTPError
+    ROUND_TIME_BASE = 1_700_000_000
+
+    def _formatear(self, txid, info):
+        txn = info['txn']['txn']
+        ronda = info['confirmed-round']
+        tx = {
+            'id': txid, 'tx-type': txn['type'], 'sender': txn['snd'], 'fee': txn['fee'],
+            'confirmed-round': ronda, 'round-time': self.ROUND_TIME_BASE + ronda,
+        }
+        if txn['type'] == 'pay':
+            tx['payment-transaction'] = {'receiver': txn['rcv'], 'amount': txn['amt']}
+        return tx
+
+    def transaction(self, txid, **kwargs):
+        self._llamar('transaction')
+        info = self.ledger.confirmadas.get(txid)
+        if info is None:
+            raise self.error_http(f"no transaction found for transaction id: {txid}", 404)
+        return {'current-round': self.ledger.ronda, 'transaction': self._formatear(txid, info)}
+
+    def search_transactions_by_address(self, address, limit=None, next_page=None, min_round=None,
+                                       max_round=None, **kwargs):
+        self._llamar('search_transactions_by_address')
+        txs = []
+        for txid, info in list(self.ledger.confirmadas.items()):
+            txn = info['txn']['txn']
+            ronda = info['confirmed-round']
+            if address not in (txn['snd'], txn['rcv']):
+                continue
+            if (min_round and ronda < min_round) or (max_round and ronda > max_round):
+                continue
+            txs.append(self._formatear(txid, info))
+
+        txs.sort(key=lambda tx: -tx['confirmed-round'])
+        inicio = int(next_page or 0)
+        limit = limit or 1000
+        respuesta = {'current-round': self.ledger.ronda, 'transactions': txs[inicio:inicio + limit]}
+        if inicio + limit < len(txs):
+            respuesta['next-token'] = str(inicio + limit)
+        return respuesta
@@ -0,0 +1,118 @@
+from collections import Counter, defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+
+from . import fragmentos
+from .models import (
+    User, Actividad, ActividadAsignada, Transaccion, ResumenRol, ResumenDocente, ResumenAlumno,
+)
+
+
+# =========================
+# ACTUALIZACIÓN INCREMENTAL
+# =========================
+# Todas las funciones corren dentro de la transacción de la escritura que las dispara,
+# así que el resumen se guarda (o se revierte) junto con los datos.
+def _incrementar(modelo, filtro, **deltas):
+    """`UPDATE ... SET campo = campo + delta` sobre la fila de `filtro`.
+
+    La fila sólo se crea al sumar: al restar (borrados en cascada) puede que
+    el usuario dueño del resumen ya no exista.
+    """
+    deltas = {campo: delta for campo, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    if any(delta > 0 for delta in deltas.values()):
+        modelo.objects.get_or_create(**filtro)
+    modelo.objects.filter(**filtro).update(**{campo: F(campo) + delta for campo, delta in deltas.items()})
+    fragmentos.invalidar('resumenes')
+
+
+def usuario_creado(role, signo=1):
+    _incrementar(ResumenRol, {'role': role}, total=signo)
+
+
+def usuarios_creados(usuarios, signo=1):
+    """Suma un lote de `User` (p. ej. tras un bulk_create) al conteo por rol."""
+    for role, n in Counter(u.role for u in usuarios).items():
+        usuario_creado(role, signo * n)
+
+
+def rol_cambiado(anterior, nuevo):
+    usuario_creado(anterior, -1)
+    usuario_creado(nuevo)
+
+
+def actividad_creada(docente_id, signo=1):
+    _incrementar(ResumenDocente, {'docente_id': docente_id}, actividades=signo)
+
+
+def asignaciones_creadas(asignaciones, signo=1):
+    """Suma un lote de `ActividadAsignada` (p. ej. tras un bulk_create) a los resúmenes."""
+    por_docente = Counter(a.docente_id for a in asignaciones)
+    por_alumno = Counter(a.alumno_id for a in asignaciones)
+    for docente_id, n in por_docente.items():
+        _incrementar(ResumenDocente, {'docente_id': docente_id}, asignaciones=signo * n)
+    for alumno_id, n in por_alumno.items():
+        _incrementar(ResumenAlumno, {'alumno_id': alumno_id}, asignaciones=signo * n)
+
+
+def pagos_confirmados(transacciones, signo=1):
+    """Suma los pagos docente → alumno recién confirmados a recompensas y ALGOs ganados."""
+    pagos = [t for t in transacciones if t.tipo == 'docente_to_alumno']
+    if not pagos:
+        return
+
+    enviados = defaultdict(Decimal)
+    recibidos = defaultdict(Decimal)
+    for t in pagos:
+        enviados[t.sender] += Decimal(t.amount) * signo
+        recibidos[t.receiver] += Decimal(t.amount) * signo
+
+    ids = dict(User.objects.filter(username__in=set(enviados) | set(recibidos)).values_list('username', 'id'))
+    for username, monto in enviados.items():
+        if username in ids:
+            _incrementar(ResumenDocente, {'docente_id': ids[username]}, recompensas_algos=monto)
+    for username, monto in recibidos.items():
+        if username in ids:
+            _incrementar(ResumenAlumno, {'alumno_id': ids[username]}, algos_ganados=monto)
+
+
+# =========================
+# RECONSTRUCCIÓN COMPLETA
+# =========================
+@transaction.atomic
+def reconstruir():
+    """Recalcula todos los resúmenes desde cero con consultas agregadas."""
+    ResumenRol.objects.all().delete()
+    ResumenDocente.objects.all().delete()
+    ResumenAlumno.objects.all().delete()
+
+    ResumenRol.objects.bulk_create([
+        ResumenRol(role=fila['role'], total=fila['total'])
+        for fila in User.objects.values('role').annotate(total=Count('id'))
+    ])
+
+    docentes = defaultdict(dict)
+    alumnos = defaultdict(dict)
+    for fila in Actividad.objects.values('docente_id').annotate(n=Count('id')):
+        docentes[fila['docente_id']]['actividades'] = fila['n']
+    for fila in ActividadAsignada.objects.values('docente_id').annotate(n=Count('id')):
+        docentes[fila['docente_id']]['asignaciones'] = fila['n']
+    for fila in ActividadAsignada.objects.values('alumno_id').annotate(n=Count('id')):
+        alumnos[fila['alumno_id']]['asignaciones'] = fila['n']
+
+    confirmados = Transaccion.objects.filter(tipo='docente_to_alumno', estado='confirmed')
+    ids = dict(User.objects.values_list('username', 'id'))
+    for fila in confirmados.values('sender').annotate(total=Sum('amount')):
+        if fila['sender'] in ids:
+            docentes[ids[fila['sender']]]['recompensas_algos'] = fila['total']
+    for fila in confirmados.values('receiver').annotate(total=Sum('amount')):
+        if fila['receiver'] in ids:
+            alumnos[ids[fila['receiver']]]['algos_ganados'] = fila['total']
+
+    ResumenDocente.objects.bulk_create([ResumenDocente(docente_id=k, **v) for k, v in docentes.items()])
+    ResumenAlumno.objects.bulk_create([ResumenAlumno(alumno_id=k, **v) for k, v in alumnos.items()])
+    fragmentos.invalidar('resumenes')
@@ -0,0 +1,93 @@
+import logging
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+
+from .clients import INDEXER_CLIENT
+from .models import Wallet, MovimientoIndexado, CursorIndexer
+
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# CONFIGURACIÓN
+# =========================
+SYNC_SETTINGS = {
+    # Transacciones por página pedidas al indexer.
+    'PAGE_SIZE': 1000,
+}
+SYNC_SETTINGS.update(getattr(settings, 'WALLET_INDEXER_SYNC', {}))
+
+
+# =========================
+# PARSEO
+# =========================
+def _parsear(wallet, tx):
+    """Convierte una transacción del indexer en un `MovimientoIndexado` sin guardar."""
+    pago = tx.get("payment-transaction", {})
+    round_time = tx.get("round-time")
+    return MovimientoIndexado(
+        wallet=wallet,
+        txid=tx["id"],
+        tipo=tx.get("tx-type", "desconocido"),
+        sender=tx.get("sender", ""),
+        receiver=pago.get("receiver", ""),
+        amount=pago.get("amount", 0),
+        fee=tx.get("fee", 0),
+        confirmed_round=tx.get("confirmed-round", 0),
+        fecha=datetime.fromtimestamp(round_time, tz=dt_timezone.utc) if round_time else None,
+    )
+
+
+# =========================
+# SINCRONIZACIÓN
+# =========================
+def sincronizar_wallet(wallet, client=INDEXER_CLIENT, page_size=None):
+    """Trae al espejo local las transacciones de `wallet` desde su cursor `min_round`.
+
+    Recorre todas las páginas con `next-token`. El cursor sólo avanza al
+    terminar, así que una sincronización interrumpida se repite completa; las
+    filas ya guardadas se ignoran por la restricción única (wallet, txid).
+    Devuelve el número de transacciones leídas.
+    """
+    cursor, _ = CursorIndexer.objects.get_or_create(wallet=wallet)
+    page_size = page_size or SYNC_SETTINGS['PAGE_SIZE']
+    ultima_ronda = cursor.min_round
+    leidas = 0
+    next_token = None
+
+    while True:
+        respuesta = client.search_transactions_by_address(
+            wallet.address,
+            limit=page_size,
+            next_page=next_token,
+            min_round=cursor.min_round or None,
+        )
+        txs = respuesta.get("transactions", [])
+        if txs:
+            MovimientoIndexado.objects.bulk_create(
+                [_parsear(wallet, tx) for tx in txs], ignore_conflicts=True
+            )
+            ultima_ronda = max(ultima_ronda, *(tx.get("confirmed-round", 0) for tx in txs))
+            leidas += len(txs)
+
+        next_token = respuesta.get("next-token")
+        if not txs or not next_token:
+            break
+
+    # min_round es inclusivo: la próxima vez se relee la última ronda y se deduplica.
+    cursor.min_round = ultima_ronda
+    cursor.save(update_fields=['min_round', 'actualizado'])
+    return leidas
+
+
+def sincronizar_todas(client=INDEXER_CLIENT, page_size=None):
+    """Sincroniza todas las wallets registradas; un error en una no detiene las demás."""
+    resultados = {}
+    for wallet in Wallet.objects.all().only('id', 'address'):
+        try:
+            resultados[wallet.address] = sincronizar_wallet(wallet, client, page_size)
+        except Exception as e:
+            logger.warning("No se pudo sincronizar %s: %s", wallet.address, e)
+            resultados[wallet.address] = e
+    return resultados
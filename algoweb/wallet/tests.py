@@ -1,3 +1,1529 @@
-from django.test import TestCase
+import asyncio
+import base64
+import csv
+import gzip
+import io
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from algosdk import account, transaction
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .admin import WalletAdmin
+from .cache import ACCOUNT_CACHE, TTLCache, get_account_info, invalidate_accounts
+from .importacion import enlace_activacion, importar_alumnos, leer_csv
+from .clients import (
+    CALL_COUNTERS, AsyncHTTPConnectionPool, AsyncPooledAlgodClient, HTTPConnectionPool, PooledAlgodClient,
+)
+from .keypool import reclamar_llave, rellenar_pool
+from .metrics import REGISTRO
+from .outbox import Despachador
+from .models import (
+    User, Wallet, Alumno, Actividad, ActividadAsignada, Transaccion, MovimientoIndexado, LlavePregenerada,
+    PagoSaliente, Liquidacion, SaldoWallet, CursorVerificacion,
+    ResumenRol, ResumenDocente, ResumenAlumno,
+)
+from .pagination import paginar_keyset
+from .params import SuggestedParamsProvider
+from .routers import ReplicaRouter, lectura_en_replica
+from .simulador import AlgodSimulado, IndexerSimulado, LedgerSimulado
+from .sync import sincronizar_wallet
+from . import eventos, ledger, liquidacion, summaries, verificacion
+from .tracker import ConfirmationTracker
+
+
+# =========================
+# CACHÉ DE CUENTAS
+# =========================
+class RelojFalso:
+    def __init__(self):
+        self.ahora = 0.0
+
+    def __call__(self):
+        return self.ahora
+
+
+class TTLCacheTests(SimpleTestCase):
+    def test_expira_despues_del_ttl(self):
+        reloj = RelojFalso()
+        cache = TTLCache(ttl=3, max_entries=10, reloj=reloj)
+        llamadas = []
+
+        def loader():
+            llamadas.append(1)
+            return len(llamadas)
+
+        self.assertEqual(cache.get_or_load('A', loader), 1)
+        reloj.ahora = 2.9
+        self.assertEqual(cache.get_or_load('A', loader), 1)
+        reloj.ahora = 3.1
+        self.assertEqual(cache.get_or_load('A', loader), 2)
+
+    def test_desaloja_la_entrada_menos_usada(self):
+        cache = TTLCache(ttl=60, max_entries=2)
+        cache.get_or_load('A', lambda: 'a')
+        cache.get_or_load('B', lambda: 'b')
+        cache.get_or_load('A', lambda: 'otro')
+        cache.get_or_load('C', lambda: 'c')
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get_or_load('A', lambda: 'nuevo'), 'a')
+        self.assertEqual(cache.get_or_load('B', lambda: 'nuevo'), 'nuevo')
+
+    def test_invalidate_fuerza_recarga(self):
+        cache = TTLCache(ttl=60, max_entries=10)
+        cache.get_or_load('A', lambda: 1)
+        cache.invalidate('A')
+        self.assertEqual(cache.get_or_load('A', lambda: 2), 2)
+
+    def test_errores_no_se_guardan(self):
+        cache = TTLCache(ttl=60, max_entries=10)
+
+        def falla():
+            raise ConnectionError('algod caído')
+
+        with self.assertRaises(ConnectionError):
+            cache.get_or_load('A', falla)
+        self.assertEqual(cache.get_or_load('A', lambda: 'ok'), 'ok')
+
+    def test_peticiones_concurrentes_comparten_una_llamada(self):
+        cache = TTLCache(ttl=60, max_entries=10)
+        liberar = threading.Event()
+        llamadas = []
+
+        def loader():
+            llamadas.append(1)
+            liberar.wait(5)
+            return 'info'
+
+        resultados = []
+        hilos = [
+            threading.Thread(target=lambda: resultados.append(cache.get_or_load('A', loader)))
+            for _ in range(8)
+        ]
+        for h in hilos:
+            h.start()
+        liberar.set()
+        for h in hilos:
+            h.join(5)
+
+        self.assertEqual(len(llamadas), 1)
+        self.assertEqual(resultados, ['info'] * 8)
+
+    def test_invalidar_cuenta_alcanza_a_otros_procesos(self):
+        algod = AlgodLento(set())
+        web = TTLCache(ttl=60, max_entries=10)
+        with mock.patch('wallet.cache.ACCOUNT_CACHE', web):
+            self.assertEqual(get_account_info(algod, 'ADDR-WEB')['amount'], 2_500_000)
+            algod.monto = 4_000_000
+            self.assertEqual(get_account_info(algod, 'ADDR-WEB')['amount'], 2_500_000)
+
+        # El worker invalida con su propia ACCOUNT_CACHE: la del proceso web no se toca...
+        invalidate_accounts('ADDR-WEB')
+        self.assertEqual(len(web), 1)
+        # ...pero la versión compartida cambió y su entrada ya no se lee.
+        with mock.patch('wallet.cache.ACCOUNT_CACHE', web):
+            self.assertEqual(get_account_info(algod, 'ADDR-WEB')['amount'], 4_000_000)
+
+
+# =========================
+# TRACKER DE CONFIRMACIONES
+# =========================
+class AlgodPendientes:
+    """Responde `pending_transaction_info` desde un diccionario txid -> info."""
+
+    def __init__(self, infos):
+        self.infos = infos
+
+    def pending_transaction_info(self, txid):
+        return self.infos[txid]
+
+
+class ConfirmationTrackerTests(TestCase):
+    def setUp(self):
+        self.docente = User.objects.create_user(username='doc', password='x', role='docente')
+        self.alumno = User.objects.create_user(username='alu', password='x', role='estudiante')
+        actividad = Actividad.objects.create(titulo='A', descripcion='d', docente=self.docente)
+        for txid in ('OK', 'POOL', 'LENTA'):
+            Transaccion.objects.create(
+                sender='doc', receiver='alu', amount=1, txid=txid, tipo='docente_to_alumno'
+            )
+            ActividadAsignada.objects.create(
+                actividad=actividad, docente=self.docente, alumno=self.alumno,
+                txid=txid, estado='completada'
+            )
+
+    def test_resuelve_pendientes_en_una_pasada(self):
+        client = AlgodPendientes({
+            'OK': {'confirmed-round': 120, 'txn': {'txn': {'snd': 'S', 'rcv': 'R', 'lv': 1100}}},
+            'POOL': {'pool-error': 'overspend', 'txn': {'txn': {'lv': 1100}}},
+            'LENTA': {'confirmed-round': 0, 'txn': {'txn': {'lv': 1100}}},
+        })
+        tracker = ConfirmationTracker(client, timeout_rounds=3)
+
+        tracker.procesar_ronda(100)
+        estados = dict(Transaccion.objects.values_list('txid', 'estado'))
+        self.assertEqual(estados, {'OK': 'confirmed', 'POOL': 'failed', 'LENTA': 'pending'})
+        self.assertEqual(Transaccion.objects.get(txid='OK').confirmed_round, 120)
+
+        tracker.procesar_ronda(103)
+        self.assertEqual(Transaccion.objects.get(txid='LENTA').estado, 'failed')
+        self.assertEqual(
+            set(ActividadAsignada.objects.filter(estado='pendiente').values_list('txid', flat=True)),
+            {'POOL', 'LENTA'},
+        )
+
+
+    def test_consulta_fallida_no_cuenta_para_el_timeout(self):
+        client = AlgodPendientes({
+            'OK': {'confirmed-round': 120, 'txn': {'txn': {'snd': 'S', 'rcv': 'R', 'fee': 1000, 'lv': 1100}}},
+            'POOL': {'confirmed-round': 0, 'txn': {'txn': {'lv': 1100}}},
+        })
+        tracker = ConfirmationTracker(client, timeout_rounds=3)
+
+        tracker.procesar_ronda(100)
+        tracker.procesar_ronda(110)
+        estados = dict(Transaccion.objects.values_list('txid', 'estado'))
+        self.assertEqual(estados, {'OK': 'confirmed', 'POOL': 'failed', 'LENTA': 'pending'})
+        self.assertEqual(Transaccion.objects.get(txid='OK').fee, 1000)
+
+
+# =========================
+# SUGGESTED PARAMS
+# =========================
+class AlgodFalso:
+    """Algod mínimo que registra los grupos enviados."""
+
+    def __init__(self):
+        self.grupos = []
+        self.params_pedidos = 0
+
+    def suggested_params(self):
+        self.params_pedidos += 1
+        return transaction.SuggestedParams(
+            1000, 100, 1100, base64.b64encode(b'g' * 32).decode(), 'testnet-v1.0', True
+        )
+
+    def send_transactions(self, signed):
+        self.grupos.append(signed)
+        return signed[0].get_txid()
+
+    def account_info(self, address):
+        return {'amount': 0, 'assets': []}
+
+
+class SuggestedParamsProviderTests(SimpleTestCase):
+    def test_reutiliza_params_hasta_n_rondas(self):
+        client = AlgodFalso()
+        reloj = RelojFalso()
+        provider = SuggestedParamsProvider(
+            client, refresh_rounds=5, round_seconds=3, validity_rounds=1000, reloj=reloj
+        )
+
+        params = provider.get()
+        self.assertEqual((params.first, params.last), (100, 1100))
+        reloj.ahora = 12
+        provider.get()
+        self.assertEqual(client.params_pedidos, 1)
+
+        provider.observe_round(104)
+        params = provider.get()
+        self.assertEqual((params.first, params.last), (104, 1104))
+        self.assertEqual(client.params_pedidos, 1)
+
+        reloj.ahora = 15
+        provider.get()
+        self.assertEqual(client.params_pedidos, 2)
+
+    def test_el_despachador_informa_las_rondas_que_ve(self):
+        class AlgodConfirmada(AlgodFalso):
+            def pending_transaction_info(self, txid):
+                return {'confirmed-round': 150}
+
+        despachador = Despachador(AlgodConfirmada())
+        self.assertTrue(despachador._ya_enviado('T1'))
+        self.assertEqual(despachador.params.get().first, 150)
+
+
+class AsignacionEnLoteTests(TestCase):
+    def test_asigna_y_paga_a_varios_alumnos(self):
+        docente = User.objects.create_user(username='doc', password='x', role='docente')
+        sk, address = account.generate_account()
+        Wallet.objects.create(user=docente, address=address, private_key=sk)
+        actividad = Actividad.objects.create(titulo='A', descripcion='d', docente=docente)
+        alumnos = []
+        for i in range(20):
+            user = User.objects.create_user(username=f'alu{i}', password='x')
+            sk_alumno, address_alumno = account.generate_account()
+            wallet = Wallet.objects.create(user=user, address=address_alumno, private_key=sk_alumno)
+            alumnos.append(Alumno.objects.create(user=user, email=f'a{i}@x.mx', matricula=f'M{i}', wallet=wallet))
+
+        client = AlgodFalso()
+        self.client.force_login(docente)
+        self.client.post(reverse('asignar_actividad'), {
+            'actividad': actividad.id,
+            'alumno': [a.id for a in alumnos],
+            'monto': '1.5',
+        })
+        self.assertEqual(Transaccion.objects.filter(estado='queued').count(), 20)
+        Despachador(client).despachar()
+
+        self.assertEqual([len(g) for g in client.grupos], [16, 4])
+        self.assertEqual(ActividadAsignada.objects.filter(estado='completada').count(), 20)
+        self.assertEqual(Transaccion.objects.filter(estado='pending').count(), 20)
+
+
+# =========================
+# CLIENTES CON POOL
+# =========================
+class AlgodHTTPFalso(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    puertos = set()
+
+    def do_GET(self):
+        AlgodHTTPFalso.puertos.add(self.client_address[1])
+        cuerpo = json.dumps({'address': self.path.split('/')[-1], 'amount': 5}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *args):
+        pass
+
+
+class PooledAlgodClientTests(SimpleTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), AlgodHTTPFalso)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        AlgodHTTPFalso.puertos = set()
+        CALL_COUNTERS.reset()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_reutiliza_la_conexion_y_cuenta_llamadas(self):
+        _, address = account.generate_account()
+        client = PooledAlgodClient('', f'http://127.0.0.1:{self.server.server_port}', pool_size=2)
+
+        for _ in range(3):
+            self.assertEqual(client.account_info(address)['amount'], 5)
+        client.pool.close()
+
+        self.assertEqual(len(AlgodHTTPFalso.puertos), 1)
+        self.assertEqual(CALL_COUNTERS.snapshot()[('algod', 'GET', '/v2/accounts/{id}')]['calls'], 3)
+
+    def test_cierra_la_conexion_del_reintento_fallido(self):
+        class ConexionRota:
+            sock = None
+            cerrada = False
+
+            def request(self, *args, **kwargs):
+                raise ConnectionResetError
+
+            def close(self):
+                self.cerrada = True
+
+        pool = HTTPConnectionPool(f'http://127.0.0.1:{self.server.server_port}', 1, 1)
+        vieja, nueva = ConexionRota(), ConexionRota()
+        pool._libres.append(vieja)
+        with mock.patch.object(pool, '_nueva_conexion', return_value=nueva):
+            with self.assertRaises(ConnectionResetError):
+                pool.request('GET', '/v2/status')
+        self.assertTrue(vieja.cerrada and nueva.cerrada)
+        self.assertEqual(pool._libres, [])
+
+
+# =========================
+# ESPEJO DEL INDEXER
+# =========================
+class IndexerFalso:
+    """Pagina `search_transactions_by_address` como el indexer (ronda descendente)."""
+
+    def __init__(self, txs):
+        self.txs = txs
+        self.llamadas = []
+
+    def search_transactions_by_address(self, address, limit=None, next_page=None, min_round=None):
+        self.llamadas.append((next_page, min_round))
+        txs = sorted(
+            (tx for tx in self.txs if tx['confirmed-round'] >= (min_round or 0)),
+            key=lambda tx: -tx['confirmed-round'],
+        )
+        inicio = int(next_page or 0)
+        pagina = txs[inicio:inicio + limit]
+        respuesta = {'transactions': pagina}
+        if inicio + limit < len(txs):
+            respuesta['next-token'] = str(inicio + limit)
+        return respuesta
+
+
+def tx_indexer(ronda, monto=1_000_000):
+    return {
+        'id': f'TX{ronda}', 'tx-type': 'pay', 'sender': 'S', 'fee': 1000,
+        'confirmed-round': ronda, 'round-time': 1_700_000_000 + ronda,
+        'payment-transaction': {'receiver': 'R', 'amount': monto},
+    }
+
+
+class SincronizacionIndexerTests(TestCase):
+    def test_pagina_y_continua_desde_el_cursor(self):
+        user = User.objects.create_user(username='alu', password='x')
+        wallet = Wallet.objects.create(user=user, address='ADDR', private_key='x')
+        indexer = IndexerFalso([tx_indexer(r) for r in range(1, 8)])
+
+        self.assertEqual(sincronizar_wallet(wallet, indexer, page_size=3), 7)
+        self.assertEqual(len(indexer.llamadas), 3)
+        self.assertEqual(wallet.cursor_indexer.min_round, 7)
+
+        indexer.txs += [tx_indexer(8), tx_indexer(9)]
+        indexer.llamadas = []
+        sincronizar_wallet(wallet, indexer, page_size=3)
+        self.assertEqual(indexer.llamadas, [(None, 7)])
+        self.assertEqual(MovimientoIndexado.objects.filter(wallet=wallet).count(), 9)
+
+        self.client.force_login(user)
+        response = self.client.get(reverse('transacciones'))
+        self.assertEqual(len(response.context['transacciones']), 9)
+
+
+# =========================
+# ADMIN DE WALLETS
+# =========================
+class AlgodLento:
+    def __init__(self, lentas, monto=2_500_000):
+        self.lentas = lentas
+        self.monto = monto
+
+    def account_info(self, address):
+        if address in self.lentas:
+            time.sleep(1)
+        return {'amount': self.monto}
+
+
+class WalletAdminBalancesTests(TestCase):
+    def setUp(self):
+        ACCOUNT_CACHE.clear()
+        self.admin = User.objects.create_superuser(username='root', password='x', role='admin')
+        for i in range(6):
+            user = User.objects.create_user(username=f'u{i}', password='x')
+            Wallet.objects.create(user=user, address=f'ADDR{i}', private_key='x')
+
+    def tearDown(self):
+        ACCOUNT_CACHE.clear()
+
+    def test_filas_lentas_no_bloquean_la_pagina(self):
+        self.client.force_login(self.admin)
+        inicio = time.perf_counter()
+        with mock.patch('wallet.admin.ALGOD_CLIENT', AlgodLento({'ADDR3'})), \
+                mock.patch.object(WalletAdmin, 'balance_budget', 0.2):
+            response = self.client.get(reverse('admin:wallet_wallet_changelist'))
+
+        self.assertLess(time.perf_counter() - inicio, 0.9)
+        self.assertContains(response, '2.500000 ALGOs', count=5)
+        self.assertContains(response, 'Desconocido', count=1)
+
+
+# =========================
+# POOL DE LLAVES
+# =========================
+class PoolLlavesTests(TestCase):
+    def test_registro_reclama_una_llave_del_pool(self):
+        self.assertEqual(rellenar_pool(objetivo=3, batch_size=2), 3)
+        self.assertEqual(rellenar_pool(objetivo=3), 0)
+        libres = set(LlavePregenerada.objects.values_list('address', flat=True))
+
+        self.client.post(reverse('registro'), {'username': 'nuevo', 'password': 'x', 'rol': 'estudiante'})
+
+        wallet = Wallet.objects.get(user__username='nuevo')
+        self.assertIn(wallet.address, libres)
+        self.assertEqual(LlavePregenerada.objects.count(), 2)
+
+    def test_pool_vacio_genera_la_llave_al_vuelo(self):
+        private_key, address = reclamar_llave()
+        self.assertEqual(len(address), 58)
+        self.assertTrue(private_key)
+
+
+# =========================
+# PRESUPUESTO DE QUERIES POR URL
+# =========================
+def sembrar_escuela(n_alumnos=25, n_actividades=5):
+    """Datos realistas: admin, docente con actividades y alumnos con wallet, asignaciones y pagos."""
+    admin_user = User.objects.create_user(username='admin', password='x', role='admin', is_staff=True,
+                                          is_superuser=True)
+    Wallet.objects.create(user=admin_user, address='ADMINADDR', private_key='x')
+    docente = User.objects.create_user(username='docente', password='x', role='docente')
+    wallet_docente = Wallet.objects.create(user=docente, address='DOCADDR', private_key='x')
+    actividades = [
+        Actividad.objects.create(titulo=f'Act {i}', descripcion='d', docente=docente)
+        for i in range(n_actividades)
+    ]
+    alumnos = []
+    for i in range(n_alumnos):
+        user = User.objects.create_user(username=f'alumno{i}', password='x')
+        wallet = Wallet.objects.create(user=user, address=f'ALUADDR{i}', private_key='x')
+        alumnos.append(Alumno.objects.create(
+            user=user, email=f'a{i}@x.mx', matricula=f'M{i}', wallet=wallet_docente if i % 2 else wallet
+        ))
+        for actividad in actividades[:2]:
+            ActividadAsignada.objects.create(actividad=actividad, docente=docente, alumno=user)
+        Transaccion.objects.create(sender='docente', receiver=user.username, amount=1, txid=f'T{i}',
+                                   tipo='docente_to_alumno')
+        MovimientoIndexado.objects.create(wallet=wallet, txid=f'T{i}', tipo='pay', sender='DOCADDR',
+                                          receiver=wallet.address, amount=1_000_000, confirmed_round=i)
+    return admin_user, docente, alumnos
+
+
+class PresupuestoQueriesTests(TestCase):
+    """Cada URL de wallet/urls.py debe cargar en un número fijo de queries, sin N+1.
+
+    `info` no se incluye: su plantilla wallet/info.html no existe. Las
+    respuestas en streaming se cuentan completas, salvo `eventos_wallet`,
+    que no termina: ahí se cuenta la apertura del flujo.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin, cls.docente, cls.alumnos = sembrar_escuela()
+        cls.estudiante = cls.alumnos[0].user
+
+    def setUp(self):
+        ACCOUNT_CACHE.clear()
+        caches['fragmentos'].clear()
+        algod = AlgodFalso()
+        for objetivo, valor in (
+            ('wallet.views.ALGOD_CLIENT', algod),
+            ('wallet.views.ASYNC_ALGOD_CLIENT', algod),
+            ('wallet.admin.ALGOD_CLIENT', algod),
+        ):
+            parche = mock.patch(objetivo, valor)
+            parche.start()
+            self.addCleanup(parche.stop)
+
+    def assertPresupuesto(self, url, usuario, queries, **kwargs):
+        if usuario:
+            self.client.force_login(usuario)
+        with self.assertNumQueries(queries):
+            response = self.client.get(url, kwargs)
+            if response.streaming:
+                # Las queries de una respuesta en streaming corren al consumirla.
+                b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, 200)
+
+    def test_autenticacion(self):
+        self.assertPresupuesto(reverse('login'), None, 0)
+        self.assertPresupuesto(reverse('registro'), None, 0)
+        self.assertPresupuesto(reverse('index'), None, 0)
+        self.assertPresupuesto(reverse('envio'), None, 0)
+        self.client.force_login(self.estudiante)
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('logout'))
+        self.assertRedirects(response, reverse('login'))
+
+    def test_dashboards(self):
+        self.assertPresupuesto(reverse('dashboard_admin'), self.admin, 4)
+        self.assertPresupuesto(reverse('dashboard_docente'), self.docente, 3)
+        self.assertPresupuesto(reverse('dashboard_estudiante'), self.estudiante, 4)
+
+    def test_wallet(self):
+        self.assertPresupuesto(reverse('mi_wallet'), self.estudiante, 3)
+        self.assertPresupuesto(reverse('registrar_wallet'), self.estudiante, 2)
+        self.assertPresupuesto(reverse('get_balance'), self.estudiante, 2, address='ALUADDR0')
+        self.assertPresupuesto(reverse('get_balances'), self.estudiante, 2, address=['ALUADDR0', 'ALUADDR1'])
+        self.assertPresupuesto(reverse('transacciones'), self.estudiante, 4)
+
+    def test_alumnos_y_actividades(self):
+        self.assertPresupuesto(reverse('alumnos'), self.docente, 4)
+        self.assertPresupuesto(reverse('agregar_alumno'), self.docente, 3)
+        self.assertPresupuesto(reverse('importar_alumnos'), self.docente, 2)
+        self.assertPresupuesto(reverse('asignar_actividad'), self.docente, 4)
+        self.assertPresupuesto(reverse('crear_actividad'), self.admin, 2)
+        self.assertPresupuesto(reverse('enviar_algos_admin'), self.admin, 3)
+
+    def test_exportacion_y_metricas(self):
+        self.assertPresupuesto(reverse('exportar_ledger'), self.admin, 3)
+        self.assertPresupuesto(reverse('exportar_ledger'), self.admin, 3, tabla='asignaciones', formato='jsonl')
+        self.assertPresupuesto(reverse('metricas'), self.admin, 2)
+
+    def test_activar_cuenta(self):
+        url = enlace_activacion(self.estudiante)
+        # Redirige a .../set-password/ con el token en la sesión, como PasswordResetConfirmView.
+        with self.assertNumQueries(7):
+            response = self.client.get(url, follow=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['validlink'])
+
+    def test_eventos(self):
+        # Sólo la apertura del flujo: las revisiones las hace el vigilante, una por
+        # ronda para todas las pestañas (EventosWalletTests).
+        self.async_client.force_login(self.estudiante)
+
+        async def abrir():
+            response = await self.async_client.get(reverse('eventos_wallet'))
+            await sync_to_async(response.close)()
+            return response
+
+        with self.assertNumQueries(3):
+            response = async_to_sync(abrir)()
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+    def test_admin(self):
+        presupuestos = {'user': 5, 'wallet': 5, 'alumno': 6, 'transaccion': 5, 'actividadasignada': 6}
+        for modelo, queries in presupuestos.items():
+            with self.subTest(modelo=modelo):
+                self.assertPresupuesto(reverse(f'admin:wallet_{modelo}_changelist'), self.admin, queries)
+
+
+# =========================
+# RESÚMENES DE DASHBOARD
+# =========================
+def foto_resumenes():
+    return (
+        sorted(ResumenRol.objects.filter(total__gt=0).values_list('role', 'total')),
+        sorted(ResumenDocente.objects.values_list('docente_id', 'actividades', 'asignaciones', 'recompensas_algos')),
+        sorted(ResumenAlumno.objects.values_list('alumno_id', 'asignaciones', 'algos_ganados')),
+    )
+
+
+class ResumenesTests(TestCase):
+    def test_incremental_coincide_con_reconstruccion(self):
+        _, docente, alumnos = sembrar_escuela(n_alumnos=6, n_actividades=3)
+        Actividad.objects.filter(titulo='Act 2').delete()
+        alumnos[5].user.delete()
+        cambio = alumnos[4].user
+        cambio.role = 'docente'
+        cambio.save()
+
+        client = AlgodPendientes({
+            f'T{i}': {'confirmed-round': 10, 'txn': {'txn': {'lv': 1000}}} for i in range(5)
+        })
+        ConfirmationTracker(client).procesar_ronda(10)
+        tx = Transaccion.objects.get(txid='T0')
+        tx.estado = 'failed'
+        tx.save()
+
+        incremental = foto_resumenes()
+        summaries.reconstruir()
+        self.assertEqual(incremental, foto_resumenes())
+        self.assertEqual(ResumenDocente.objects.get(docente=docente).recompensas_algos, 4)
+
+
+# =========================
+# PAGINACIÓN POR KEYSET
+# =========================
+class PaginacionKeysetTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username='alu', password='x')
+        self.wallet = Wallet.objects.create(user=user, address='ADDR', private_key='x')
+        # Rondas repetidas para ejercitar el desempate por id.
+        MovimientoIndexado.objects.bulk_create([
+            MovimientoIndexado(wallet=self.wallet, txid=f'T{i}', tipo='pay', sender='S', confirmed_round=i // 3)
+            for i in range(23)
+        ])
+        self.qs = MovimientoIndexado.objects.filter(wallet=self.wallet)
+        self.esperado = list(self.qs.order_by('-confirmed_round', '-id').values_list('id', flat=True))
+
+    def test_recorre_hacia_adelante_y_atras(self):
+        paginas = []
+        pagina = paginar_keyset(self.qs, None, ('-confirmed_round', '-id'), por_pagina=5)
+        self.assertFalse(pagina.has_previous)
+        while True:
+            paginas.append([m.id for m in pagina])
+            if not pagina.has_next:
+                break
+            pagina = paginar_keyset(self.qs, pagina.next_cursor, ('-confirmed_round', '-id'), por_pagina=5)
+
+        self.assertEqual(sum(paginas, []), self.esperado)
+        self.assertEqual([len(p) for p in paginas], [5, 5, 5, 5, 3])
+
+        for esperada in reversed(paginas[:-1]):
+            pagina = paginar_keyset(self.qs, pagina.prev_cursor, ('-confirmed_round', '-id'), por_pagina=5)
+            self.assertEqual([m.id for m in pagina], esperada)
+        self.assertFalse(pagina.has_previous)
+
+    def test_cursor_invalido_vuelve_a_la_primera_pagina(self):
+        pagina = paginar_keyset(self.qs, 'basura!!', ('-confirmed_round', '-id'), por_pagina=5)
+        self.assertEqual([m.id for m in pagina], self.esperado[:5])
+
+    def test_cursor_alterado_vuelve_a_la_primera_pagina(self):
+        for valores in (['zzz', 1], [None, 1], [[1], 1], [1, {'a': 1}], [1]):
+            crudo = json.dumps({'d': 'n', 'v': valores}).encode()
+            cursor = base64.urlsafe_b64encode(crudo).decode().rstrip('=')
+            pagina = paginar_keyset(self.qs, cursor, ('-confirmed_round', '-id'), por_pagina=5)
+            self.assertEqual([m.id for m in pagina], self.esperado[:5], valores)
+
+
+# =========================
+# EXPORTACIÓN DEL LEDGER
+# =========================
+class ExportacionLedgerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin, cls.docente, cls.alumnos = sembrar_escuela(n_alumnos=6, n_actividades=2)
+        Transaccion.objects.filter(txid__in=['T0', 'T1']).update(estado='confirmed')
+        Transaccion.objects.create(sender='admin', receiver='docente', amount=5, tipo='admin_to_docente')
+
+    def descargar(self, **params):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('exportar_ledger'), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content)
+
+    def test_csv_comprimido_con_filtros(self):
+        response, cuerpo = self.descargar(tabla='transacciones', tipo='docente_to_alumno', estado='confirmed')
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertIn('.csv.gz', response['Content-Disposition'])
+        filas = list(csv.DictReader(io.StringIO(gzip.decompress(cuerpo).decode())))
+        self.assertEqual([f['txid'] for f in filas], ['T0', 'T1'])
+
+    def test_jsonl_de_asignaciones_sin_comprimir(self):
+        _, cuerpo = self.descargar(tabla='asignaciones', formato='jsonl', gzip='0')
+        filas = [json.loads(linea) for linea in cuerpo.decode().splitlines()]
+        self.assertEqual(len(filas), ActividadAsignada.objects.count())
+        self.assertEqual(filas[0]['docente__username'], 'docente')
+
+    def test_rango_de_fechas_y_filtros_invalidos(self):
+        _, cuerpo = self.descargar(tabla='transacciones', gzip='0', hasta='2000-01-01')
+        self.assertEqual(len(cuerpo.decode().splitlines()), 1)  # sólo encabezado
+
+        self.client.force_login(self.admin)
+        for params in ({'tabla': 'usuarios'}, {'desde': 'ayer'}, {'tabla': 'asignaciones', 'tipo': 'x'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(reverse('exportar_ledger'), params).status_code, 400)
+
+    def test_solo_admin(self):
+        self.client.force_login(self.docente)
+        self.assertEqual(self.client.get(reverse('exportar_ledger')).status_code, 302)
+
+
+# =========================
+# IMPORTACIÓN DE ALUMNOS
+# =========================
+def csv_alumnos(n, inicio=0, separador=','):
+    filas = [separador.join(['nombre', 'email', 'matrícula'])]
+    filas += [separador.join([f'Alumno {i} Pérez', f'alu{i}@x.mx', f'A{i:05d}']) for i in range(inicio, inicio + n)]
+    return '\n'.join(filas).encode()
+
+
+class ImportacionAlumnosTests(TestCase):
+    def test_importa_en_lotes_y_reporta_errores_por_fila(self):
+        User.objects.create_user(username='ocupado', password='x')
+        existente = User.objects.create_user(username='previo', password='x')
+        Alumno.objects.create(user=existente, email='previo@x.mx', matricula='P1')
+        LlavePregenerada.objects.bulk_create([LlavePregenerada(private_key=f'k{i}', address=f'POOL{i}') for i in range(3)])
+
+        contenido = csv_alumnos(5) + (
+            '\nSin Correo,,B1'
+            '\nMal Correo,no-es-correo,B2'
+            '\nRepetida,otra@x.mx,A00001'
+            '\nYa Existe,PREVIO@x.mx,B3'
+            '\nMatricula Vieja,nueva@x.mx,P1'
+        ).encode()
+        filas = leer_csv(contenido)
+        filas.append((99, {'nombre': 'Con Usuario', 'email': 'u@x.mx', 'matricula': 'B4', 'username': 'ocupado'}))
+
+        resultado = importar_alumnos(filas, batch_size=2)
+
+        self.assertEqual(len(resultado.creados), 5)
+        self.assertEqual([linea for linea, _ in resultado.errores], [7, 8, 9, 10, 11, 99])
+        alumno = Alumno.objects.select_related('user', 'wallet').get(matricula='A00000')
+        self.assertEqual((alumno.user.username, alumno.user.first_name, alumno.user.role), ('A00000', 'Alumno', 'estudiante'))
+        self.assertFalse(alumno.user.has_usable_password())
+        self.assertEqual(alumno.wallet.user, alumno.user)
+        self.assertEqual(LlavePregenerada.objects.count(), 0)
+        self.assertEqual(Wallet.objects.filter(address__startswith='POOL').count(), 3)
+        self.assertEqual(ResumenRol.objects.get(role='estudiante').total, 7)
+
+    def test_queries_no_crecen_con_el_tamano_del_archivo(self):
+        importar_alumnos(leer_csv(csv_alumnos(1, 9000)))  # crea la fila de ResumenRol
+        conteos = []
+        for inicio, n in ((0, 10), (100, 60)):
+            with CaptureQueriesContext(connection) as ctx:
+                resultado = importar_alumnos(leer_csv(csv_alumnos(n, inicio, ';')), batch_size=500)
+            self.assertEqual(len(resultado.creados), n)
+            conteos.append(len(ctx.captured_queries))
+        self.assertEqual(conteos[0], conteos[1])
+
+    def test_vista(self):
+        docente = User.objects.create_user(username='docente', password='x', role='docente')
+        self.client.force_login(docente)
+        archivo = SimpleUploadedFile('alumnos.csv', csv_alumnos(3) + b'\nIncompleto,,', content_type='text/csv')
+        response = self.client.post(reverse('importar_alumnos'), {'archivo': archivo})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['resultado'].creados), 3)
+        self.assertContains(response, 'Falta')
+
+        archivo = SimpleUploadedFile('malo.csv', b'a,b\n1,2', content_type='text/csv')
+        response = self.client.post(reverse('importar_alumnos'), {'archivo': archivo})
+        self.assertContains(response, 'Faltan columnas')
+
+    def test_enlace_de_activacion(self):
+        resultado = importar_alumnos(leer_csv(csv_alumnos(2)))
+        username, enlace = resultado.enlaces[0]
+        self.assertEqual(username, 'A00000')
+
+        formulario = self.client.get(enlace, follow=True)
+        self.assertTrue(formulario.context['validlink'])
+        self.client.post(formulario.redirect_chain[-1][0], {
+            'new_password1': 'Cadena-Larga-2024', 'new_password2': 'Cadena-Larga-2024',
+        })
+        self.assertTrue(self.client.login(username='A00000', password='Cadena-Larga-2024'))
+        # El enlace ya usado deja de servir; el comando sólo lista a quien sigue sin contraseña.
+        self.client.logout()
+        self.assertFalse(self.client.get(enlace, follow=True).context['validlink'])
+        salida = io.StringIO()
+        call_command('enlaces_activacion', '--base-url', 'https://x.mx', stdout=salida)
+        self.assertEqual([l.split(',')[0] for l in salida.getvalue().split()], ['A00001'])
+        self.assertTrue(salida.getvalue().startswith('A00001,https://x.mx/activar/'))
+
+
+# =========================
+# RED SIMULADA
+# =========================
+@contextmanager
+def conectar(algod):
+    """Sustituye el cliente algod de views/admin por `algod` mientras dure el bloque.
+
+    Las funciones de sync, el tracker y el despachador del outbox reciben el
+    cliente como argumento, así que ahí basta con pasarles el
+    `IndexerSimulado`/`AlgodSimulado`.
+    """
+    ACCOUNT_CACHE.clear()
+    try:
+        with mock.patch('wallet.views.ALGOD_CLIENT', algod), \
+                mock.patch('wallet.views.ASYNC_ALGOD_CLIENT', algod), \
+                mock.patch('wallet.admin.ALGOD_CLIENT', algod):
+            yield
+    finally:
+        ACCOUNT_CACHE.clear()
+
+
+class RedSimuladaTests(TestCase):
+    def setUp(self):
+        self.docente = User.objects.create_user(username='doc', password='x', role='docente')
+        sk, address = account.generate_account()
+        Wallet.objects.create(user=self.docente, address=address, private_key=sk)
+        self.actividad = Actividad.objects.create(titulo='A', descripcion='d', docente=self.docente)
+        self.alumnos = []
+        for i in range(3):
+            user = User.objects.create_user(username=f'alu{i}', password='x')
+            sk_alumno, address_alumno = account.generate_account()
+            wallet = Wallet.objects.create(user=user, address=address_alumno, private_key=sk_alumno)
+            self.alumnos.append(Alumno.objects.create(user=user, email=f'a{i}@x.mx', matricula=f'M{i}', wallet=wallet))
+
+        self.ledger = LedgerSimulado({address: 10_000_000})
+        self.algod = AlgodSimulado(self.ledger)
+        self.client.force_login(self.docente)
+
+    def asignar(self, monto, **extra):
+        with conectar(self.algod):
+            self.client.post(reverse('asignar_actividad'), {
+                'actividad': self.actividad.id, 'alumno': [a.id for a in self.alumnos], 'monto': monto, **extra,
+            })
+        return Despachador(self.algod).despachar()
+
+    def test_pago_confirmacion_y_espejo_del_indexer(self):
+        self.asignar('2')
+        wallet = self.alumnos[0].wallet
+        self.assertEqual(self.ledger.saldos[wallet.address], 2_000_000)
+        self.assertEqual(self.ledger.saldos[self.docente.wallet.address], 10_000_000 - 3 * 2_001_000)
+
+        ConfirmationTracker(self.algod).procesar_ronda(self.algod.status_after_block(self.ledger.ronda)['last-round'])
+        self.assertEqual(Transaccion.objects.filter(estado='confirmed').count(), 3)
+
+        self.assertEqual(sincronizar_wallet(wallet, IndexerSimulado(self.ledger)), 1)
+        self.assertEqual(MovimientoIndexado.objects.get(wallet=wallet).amount, 2_000_000)
+
+    def test_inyeccion_de_fallas_y_sobregiro(self):
+        self.algod.fallar('send_transactions')
+        enviados, _ = self.asignar('1')
+        self.assertEqual(enviados, [])
+        self.assertEqual(ActividadAsignada.objects.filter(estado='pendiente').count(), 3)
+        self.assertEqual(Transaccion.objects.filter(estado='queued').count(), 3)
+
+        # Tras el backoff los reintentos salen de uno en uno.
+        PagoSaliente.objects.update(proximo_intento=timezone.now())
+        enviados, _ = Despachador(self.algod).despachar()
+        self.assertEqual(len(enviados), 3)
+        self.assertEqual(self.algod.llamadas['send_transactions'], 4)
+
+        # 15 ALGOs con ~7 de saldo: algod rechaza el grupo completo...
+        enviados, _ = self.asignar('5')
+        self.assertEqual(enviados, [])
+        self.assertEqual(len(self.ledger.pendientes), 3)
+        # ...y al reintentar por separado sólo el pago que no cabe sigue en cola.
+        PagoSaliente.objects.update(proximo_intento=timezone.now())
+        enviados, _ = Despachador(self.algod).despachar()
+        self.assertEqual(len(enviados), 1)
+        self.assertEqual(PagoSaliente.objects.filter(estado='pendiente').count(), 2)
+
+
+class AlgodSinRespuesta(AlgodSimulado):
+    """Algod que acepta el envío pero cuya respuesta nunca llega (timeout)."""
+
+    def send_transactions(self, txns):
+        super().send_transactions(txns)
+        raise TimeoutError("timed out")
+
+
+class OutboxTests(TestCase):
+    def setUp(self):
+        self.docente = User.objects.create_user(username='doc', password='x', role='docente')
+        sk, address = account.generate_account()
+        Wallet.objects.create(user=self.docente, address=address, private_key=sk)
+        self.actividad = Actividad.objects.create(titulo='A', descripcion='d', docente=self.docente)
+        self.alumnos = []
+        for i in range(3):
+            user = User.objects.create_user(username=f'alu{i}', password='x')
+            wallet = Wallet.objects.create(user=user, address=account.generate_account()[1], private_key='x')
+            self.alumnos.append(Alumno.objects.create(user=user, email=f'a{i}@x.mx', matricula=f'M{i}', wallet=wallet))
+        self.ledger = LedgerSimulado({address: 10_000_000})
+        self.client.force_login(self.docente)
+
+    def asignar(self, alumnos, clave='form-1'):
+        self.client.post(reverse('asignar_actividad'), {
+            'actividad': self.actividad.id, 'alumno': [a.id for a in alumnos], 'monto': '1',
+            'idempotency_key': clave,
+        })
+
+    def test_params_se_piden_fuera_de_la_transaccion(self):
+        self.asignar(self.alumnos)
+        despachador = Despachador(AlgodSimulado(self.ledger))
+        pedir = despachador.params.get
+        profundidades = []
+
+        def get():
+            # La espera a algod no debe retener el lock de escritura del reclamo.
+            profundidades.append(len(connection.atomic_blocks))
+            return pedir()
+
+        profundidad = len(connection.atomic_blocks)
+        with mock.patch.object(despachador.params, 'get', get):
+            enviados, _ = despachador.despachar()
+        self.assertEqual(len(enviados), 3)
+        self.assertEqual(profundidades, [profundidad])
+
+    def test_reenviar_el_formulario_no_duplica_pagos(self):
+        self.asignar(self.alumnos)
+        self.asignar(self.alumnos)
+        self.asignar(self.alumnos[:1])
+        self.assertEqual(PagoSaliente.objects.count(), 3)
+        self.assertEqual(ActividadAsignada.objects.count(), 3)
+
+        self.asignar(self.alumnos[:1], clave='form-2')
+        self.assertEqual(PagoSaliente.objects.count(), 4)
+        enviados, _ = Despachador(AlgodSimulado(self.ledger)).despachar()
+        self.assertEqual(len(enviados), 4)
+        self.assertEqual(self.ledger.saldos[self.alumnos[0].wallet.address], 2_000_000)
+
+    def test_respuesta_perdida_no_paga_dos_veces(self):
+        self.asignar(self.alumnos[:1])
+        algod = AlgodSinRespuesta(self.ledger)
+        self.assertEqual(Despachador(algod).despachar(), ([], []))
+        pago = PagoSaliente.objects.get()
+        self.assertEqual((pago.estado, pago.intentos), ('pendiente', 1))
+        self.assertIn(pago.txid, self.ledger.pendientes)
+
+        # El reintento reenvía la misma firma: algod la reconoce y no se aplica otra vez.
+        PagoSaliente.objects.update(proximo_intento=timezone.now())
+        enviados, _ = Despachador(AlgodSimulado(self.ledger)).despachar()
+        self.assertEqual([p.txid for p in enviados], [pago.txid])
+        self.assertEqual(self.ledger.saldos[self.alumnos[0].wallet.address], 1_000_000)
+        self.assertEqual(Transaccion.objects.get().txid, pago.txid)
+        self.assertEqual(ActividadAsignada.objects.get().estado, 'completada')
+
+    def test_agotar_los_intentos_marca_el_pago_fallido(self):
+        self.asignar(self.alumnos)
+        algod = AlgodSimulado(self.ledger)
+        algod.fallar('send_transactions', 10)
+        despachador = Despachador(algod, max_intentos=2)
+        despachador.despachar()
+        PagoSaliente.objects.update(proximo_intento=timezone.now())
+        _, fallidos = despachador.despachar()
+
+        self.assertEqual(len(fallidos), 3)
+        self.assertEqual(set(PagoSaliente.objects.values_list('estado', flat=True)), {'fallido'})
+        self.assertEqual(set(Transaccion.objects.values_list('estado', flat=True)), {'failed'})
+        self.assertEqual(set(ActividadAsignada.objects.values_list('estado', 'monto_algos')), {('pendiente', 0)})
+        PagoSaliente.objects.update(proximo_intento=timezone.now())
+        self.assertEqual(despachador.despachar(), ([], []))
+
+
+# =========================
+# INSTRUMENTACIÓN Y MÉTRICAS
+# =========================
+class InstrumentacionTests(TestCase):
+    def setUp(self):
+        REGISTRO.reset()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), AlgodHTTPFalso)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.algod = PooledAlgodClient('', f'http://127.0.0.1:{self.server.server_port}')
+        ACCOUNT_CACHE.clear()
+
+    def tearDown(self):
+        self.algod.pool.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_server_timing_y_metricas_por_vista(self):
+        user = User.objects.create_user(username='alu', password='x')
+        _, address = account.generate_account()
+        Wallet.objects.create(user=user, address=address, private_key='x')
+        self.client.force_login(user)
+        with mock.patch('wallet.views.ALGOD_CLIENT', self.algod):
+            response = self.client.get(reverse('mi_wallet'))
+
+        timing = response['Server-Timing']
+        self.assertRegex(timing, r'^db;dur=[\d.]+;desc="3 queries", algod;dur=[\d.]+;desc="1 llamadas", app;dur=')
+        self.assertIn('total;dur=', timing)
+
+        admin = User.objects.create_user(username='staff', password='x', role='admin', is_staff=True)
+        self.client.force_login(admin)
+        cuerpo = self.client.get('/metrics').content.decode()
+        self.assertIn('wallet_request_duration_seconds_count{method="GET",status="2xx",view="mi_wallet"} 1', cuerpo)
+        self.assertIn('wallet_request_db_queries_bucket{view="mi_wallet",le="3"} 1', cuerpo)
+        self.assertIn(
+            'wallet_upstream_duration_seconds_count{endpoint="/v2/accounts/{id}",method="GET",'
+            'service="algod",view="mi_wallet"} 1', cuerpo,
+        )
+
+    def test_metrics_solo_staff(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.client.force_login(User.objects.create_user(username='alu', password='x'))
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+
+
+# =========================
+# VISTAS ASYNC (ASGI)
+# =========================
+class VistasAsyncTests(TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), AlgodHTTPFalso)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        AlgodHTTPFalso.puertos = set()
+        CALL_COUNTERS.reset()
+        ACCOUNT_CACHE.clear()
+        self.user = User.objects.create_user(username='alu', password='x')
+        self.direcciones = [account.generate_account()[1] for _ in range(12)]
+        Wallet.objects.create(user=self.user, address=self.direcciones[0], private_key='x')
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    async def test_balances_concurrentes_con_el_cliente_async(self):
+        algod = AsyncPooledAlgodClient('', f'http://127.0.0.1:{self.server.server_port}', pool_size=3)
+        await self.async_client.aforce_login(self.user)
+        pedidas = self.direcciones + [self.direcciones[1]] * 10
+
+        with mock.patch('wallet.views.ASYNC_ALGOD_CLIENT', algod), mock.patch('wallet.views.ALGOD_CLIENT', None):
+            respuestas = await asyncio.gather(*[
+                self.async_client.get(reverse('get_balance'), {'address': a}) for a in pedidas
+            ])
+            dashboard = await self.async_client.get(reverse('dashboard_estudiante'))
+            await algod.pool.close()
+
+        self.assertEqual({r.json()['balance'] for r in respuestas}, {5 / 1_000_000})
+        self.assertEqual(dashboard.context['balance'], 5 / 1_000_000)
+        # Una llamada por dirección distinta, por no más de 3 conexiones keep-alive.
+        self.assertEqual(CALL_COUNTERS.snapshot()[('algod', 'GET', '/v2/accounts/{id}')]['calls'], 12)
+        self.assertLessEqual(len(AlgodHTTPFalso.puertos), 3)
+
+
+class HTTPVariado(BaseHTTPRequestHandler):
+    """Respuestas sin cuerpo, sin Content-Length y con `Connection: close`."""
+    protocol_version = 'HTTP/1.1'
+    puertos = set()
+
+    def do_HEAD(self):
+        HTTPVariado.puertos.add(self.client_address[1])
+        self.send_response(200)
+        self.send_header('Content-Length', '10')
+        self.end_headers()
+
+    def do_GET(self):
+        HTTPVariado.puertos.add(self.client_address[1])
+        if self.path in ('/204', '/304'):
+            self.send_response(int(self.path[1:]))
+            self.send_header('Content-Length', '10')
+            self.end_headers()
+        elif self.path == '/sin-largo':
+            self.send_response(200)
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            self.wfile.write(b'hasta el cierre')
+        else:
+            self.send_response(200)
+            self.send_header('Content-Length', '2')
+            if self.path == '/cerrar':
+                self.send_header('Connection', 'close')
+            self.end_headers()
+            self.wfile.write(b'ok')
+
+    def log_message(self, *args):
+        pass
+
+
+class AsyncHTTPConnectionPoolTests(SimpleTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), HTTPVariado)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        HTTPVariado.puertos = set()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    async def test_delimita_respuestas_y_respeta_connection_close(self):
+        pool = AsyncHTTPConnectionPool(f'http://127.0.0.1:{self.server.server_port}', 1, 2)
+        self.assertEqual(await pool.request('HEAD', '/'), (200, b''))
+        self.assertEqual(await pool.request('GET', '/204'), (204, b''))
+        self.assertEqual(await pool.request('GET', '/304'), (304, b''))
+        self.assertEqual(await pool.request('GET', '/'), (200, b'ok'))
+        self.assertEqual(len(HTTPVariado.puertos), 1)
+
+        self.assertEqual(await pool.request('GET', '/sin-largo'), (200, b'hasta el cierre'))
+        self.assertEqual(await pool.request('GET', '/cerrar'), (200, b'ok'))
+        self.assertEqual(await pool.request('GET', '/'), (200, b'ok'))
+        await pool.close()
+        # Cada respuesta que cerró la conexión obligó a abrir una nueva.
+        self.assertEqual(len(HTTPVariado.puertos), 3)
+
+
+# =========================
+# EVENTOS EN VIVO (SSE)
+# =========================
+class EventosWalletTests(TestCase):
+    def setUp(self):
+        ACCOUNT_CACHE.clear()
+        self.user = User.objects.create_user(username='alu', password='x')
+        self.address = account.generate_account()[1]
+        Wallet.objects.create(user=self.user, address=self.address, private_key='x')
+        self.algod = AlgodSimulado(LedgerSimulado({self.address: 1_000_000}))
+
+    async def siguiente(self, pestana):
+        while True:
+            trozo = await asyncio.wait_for(anext(pestana), 2)
+            trozo = trozo.decode() if isinstance(trozo, bytes) else trozo
+            if trozo.startswith('event:'):
+                evento, datos = trozo.split('\n')[:2]
+                return evento[len('event: '):], json.loads(datos[len('data: '):])
+
+    async def test_un_vigilante_para_todas_las_pestanas(self):
+        await self.async_client.aforce_login(self.user)
+        with mock.patch('wallet.views.ASYNC_ALGOD_CLIENT', self.algod), \
+                mock.patch.dict('wallet.eventos.EVENTOS_SETTINGS', {'INTERVALO': 60}), \
+                mock.patch.object(ACCOUNT_CACHE, 'ttl', 0):
+            respuestas, pestanas = [], []
+            for _ in range(3):
+                response = await self.async_client.get(reverse('eventos_wallet'))
+                self.assertEqual(response['Content-Type'], 'text/event-stream')
+                respuestas.append(response)
+                pestanas.append(response.streaming_content)
+                self.assertEqual(await self.siguiente(pestanas[-1]), ('balance', {'address': self.address, 'balance': 1.0}))
+
+            vigilante = eventos.obtener_vigilante(self.algod)
+            self.algod.ledger.fondear(self.address, 2_000_000)
+            await vigilante.revisar()
+            for pestana in pestanas:
+                self.assertEqual((await self.siguiente(pestana))[1]['balance'], 3.0)
+
+            tx = await Transaccion.objects.acreate(sender='doc', receiver='alu', amount=1,
+                                                   tipo='docente_to_alumno', estado='queued')
+            await vigilante.revisar()
+            await Transaccion.objects.filter(pk=tx.pk).aupdate(estado='confirmed', txid='TX1')
+            await vigilante.revisar()
+            for pestana in pestanas:
+                self.assertEqual((await self.siguiente(pestana))[1]['estado'], 'queued')
+                datos = (await self.siguiente(pestana))[1]
+                self.assertEqual((datos['anterior'], datos['estado'], datos['txid']), ('queued', 'confirmed', 'TX1'))
+
+            # Cuatro revisiones para tres pestañas: una consulta a algod por revisión.
+            self.assertEqual(self.algod.llamadas['account_info'], 4)
+            # Al cerrarse la respuesta (el navegador se fue) la pestaña se da de baja.
+            for response in respuestas:
+                await sync_to_async(response.close)()
+            self.assertIsNone(vigilante._tarea)
+            self.assertEqual(vigilante._colas, {})
+
+    def test_requiere_asgi(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(reverse('eventos_wallet')).status_code, 501)
+
+    def test_desuscribir_deja_de_seguir_las_transacciones_del_usuario(self):
+        vigilante = eventos.Vigilante(self.algod)
+        pestana, otra = object(), object()
+        vigilante._colas = {'A': {pestana}, 'B': {otra}}
+        vigilante._usuarios = {'A': 'alu', 'B': 'otro'}
+        vigilante._estados = {1: ('pending', {'alu', 'doc'}), 2: ('pending', {'otro', 'doc'})}
+
+        vigilante.desuscribir('A', pestana)
+        self.assertEqual(set(vigilante._estados), {2})
+        vigilante.desuscribir('B', otra)
+        self.assertEqual(vigilante._estados, {})
+
+
+# =========================
+# SALDOS EN LOTE
+# =========================
+class AlgodConFallas:
+    def __init__(self, demora, rotas):
+        self.demora = demora
+        self.rotas = rotas
+        self.llamadas = []
+
+    def account_info(self, address):
+        self.llamadas.append(address)
+        time.sleep(self.demora)
+        if address in self.rotas:
+            raise RuntimeError("algod no disponible")
+        return {'amount': 3_000_000}
+
+
+class SaldosEnLoteTests(TestCase):
+    def setUp(self):
+        ACCOUNT_CACHE.clear()
+        self.client.force_login(User.objects.create_user(username='doc', password='x', role='docente'))
+        self.direcciones = [account.generate_account()[1] for _ in range(10)]
+
+    def test_deduplica_consulta_en_paralelo_y_reporta_errores(self):
+        algod = AlgodConFallas(0.2, rotas={self.direcciones[1]})
+        pedidas = self.direcciones + [self.direcciones[0]]
+        inicio = time.monotonic()
+        with mock.patch('wallet.views.ALGOD_CLIENT', algod):
+            response = self.client.get(reverse('get_balances'), {
+                'address': pedidas, 'addresses': f'{self.direcciones[2]},NO-ES-DIRECCION',
+            })
+        transcurrido = time.monotonic() - inicio
+
+        balances = response.json()['balances']
+        self.assertEqual(len(balances), 11)
+        self.assertEqual(balances[self.direcciones[0]], {'balance': 3.0})
+        self.assertEqual(balances[self.direcciones[1]], {'error': 'algod no disponible'})
+        self.assertEqual(balances['NO-ES-DIRECCION'], {'error': 'Invalid address'})
+        self.assertEqual(sorted(algod.llamadas), sorted(self.direcciones))
+        self.assertLess(transcurrido, 1.0)  # 10 consultas de 0.2 s en paralelo, no en serie
+
+    def test_limites(self):
+        self.assertEqual(self.client.get(reverse('get_balances')).status_code, 400)
+        with mock.patch.dict('wallet.views.BALANCE_BATCH_SETTINGS', {'MAX_ADDRESSES': 5}):
+            response = self.client.get(reverse('get_balances'), {'address': self.direcciones})
+        self.assertEqual(response.status_code, 400)
+
+    def test_presupuesto_de_tiempo(self):
+        algod = AlgodConFallas(1.0, rotas=set())
+        with mock.patch('wallet.views.ALGOD_CLIENT', algod), \
+                mock.patch.dict('wallet.views.BALANCE_BATCH_SETTINGS', {'TIMEOUT': 0.2}):
+            balances = self.client.get(reverse('get_balances'), {'address': self.direcciones[:2]}).json()['balances']
+        self.assertEqual(balances[self.direcciones[0]], {'error': 'Sin respuesta dentro del presupuesto'})
+
+
+# =========================
+# PERFIL DE BASE DE DATOS
+# =========================
+class PerfilBaseDatosTests(TestCase):
+    def test_pragmas_al_conectar(self):
+        with connection.cursor() as cursor:
+            valores = {}
+            for pragma in ('synchronous', 'cache_size', 'temp_store'):
+                cursor.execute(f'PRAGMA {pragma}')
+                valores[pragma] = cursor.fetchone()[0]
+        self.assertEqual(valores, {'synchronous': 1, 'cache_size': -64 * 1024, 'temp_store': 2})
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+
+    def test_solo_lecturas_marcadas_van_a_la_replica(self):
+        router = ReplicaRouter()
+
+        @lectura_en_replica
+        def vista(request):
+            return router.db_for_read(Transaccion)
+
+        @lectura_en_replica
+        async def vista_async(request):
+            return await sync_to_async(router.db_for_read)(Transaccion)
+
+        factory = RequestFactory()
+        with mock.patch.dict(settings.DATABASES, {'replica': {}}):
+            self.assertEqual(vista(factory.get('/')), 'replica')
+            self.assertEqual(async_to_sync(vista_async)(factory.get('/')), 'replica')
+            self.assertIsNone(vista(factory.post('/')))
+            self.assertIsNone(router.db_for_read(Transaccion))
+            self.assertEqual(router.db_for_write(Transaccion), 'default')
+            self.assertFalse(router.allow_migrate('replica', 'wallet'))
+        self.assertIsNone(vista(factory.get('/')))
+
+
+# =========================
+# FRAGMENTOS EN CACHÉ
+# =========================
+class FragmentosTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin, cls.docente, cls.alumnos = sembrar_escuela(n_alumnos=30)
+
+    def setUp(self):
+        caches['fragmentos'].clear()
+
+    def test_cache_hasta_que_cambian_los_datos(self):
+        self.client.force_login(self.admin)
+        url = reverse('dashboard_admin')
+        self.client.get(url)
+        with self.assertNumQueries(2):  # sesión y usuario: actividades y totales salen de la caché
+            response = self.client.get(url)
+        self.assertNotContains(response, 'Actividad nueva')
+
+        Actividad.objects.create(titulo='Actividad nueva', descripcion='d', docente=self.docente)
+        self.assertContains(self.client.get(url), 'Actividad nueva')
+
+    def test_llaves_por_usuario_y_pagina(self):
+        self.client.force_login(self.docente)
+        url = reverse('asignar_actividad')
+        primera = self.client.get(url)
+        siguiente = self.client.get(url, {'cursor': primera.context['alumnos'].next_cursor})
+        self.assertNotEqual(primera.content, siguiente.content)
+
+        User.objects.filter(pk=self.alumnos[0].user_id).update(username='renombrado')
+        self.alumnos[0].save()  # la señal de Alumno sube la versión del listado
+        self.assertContains(self.client.get(url), 'renombrado')
+
+        otro = User.objects.create_user(username='doc2', password='x', role='docente')
+        self.client.force_login(otro)
+        self.assertContains(self.client.get(url), 'No tienes actividades asignadas.')
+
+
+# =========================
+# LIQUIDACIÓN DE RECOMPENSAS
+# =========================
+class LiquidacionTests(TestCase):
+    def setUp(self):
+        modo = mock.patch.dict('wallet.liquidacion.LIQUIDACION_SETTINGS', {'MODO': 'liquidacion'})
+        modo.start()
+        self.addCleanup(modo.stop)
+        self.docente = User.objects.create_user(username='doc', password='x', role='docente')
+        sk, address = account.generate_account()
+        Wallet.objects.create(user=self.docente, address=address, private_key=sk)
+        self.actividades = [
+            Actividad.objects.create(titulo=f'A{i}', descripcion='d', docente=self.docente) for i in range(3)
+        ]
+        self.alumnos = []
+        for i in range(3):
+            user = User.objects.create_user(username=f'alu{i}', password='x')
+            wallet = Wallet.objects.create(user=user, address=account.generate_account()[1], private_key='x')
+            self.alumnos.append(Alumno.objects.create(user=user, email=f'a{i}@x.mx', matricula=f'M{i}', wallet=wallet))
+        self.ledger = LedgerSimulado({address: 100_000_000})
+        self.algod = AlgodSimulado(self.ledger)
+        self.client.force_login(self.docente)
+        for actividad in self.actividades:
+            self.client.post(reverse('asignar_actividad'), {
+                'actividad': actividad.id, 'alumno': [a.id for a in self.alumnos], 'monto': '0.5',
+            })
+
+    def test_un_pago_neto_por_alumno(self):
+        self.assertEqual(PagoSaliente.objects.count(), 0)
+        self.assertEqual(liquidacion.adeudadas().count(), 9)
+
+        liquidaciones = liquidacion.liquidar()
+        self.assertEqual([(l.monto, l.total_asignaciones) for l in liquidaciones], [(1_500_000, 3)] * 3)
+        self.assertEqual(liquidacion.liquidar(), [])
+
+        enviados, _ = Despachador(self.algod).despachar()
+        self.assertEqual(len(enviados), 3)
+        # Los tres pagos del docente salen en un solo grupo.
+        self.assertEqual(self.algod.llamadas['send_transactions'], 1)
+        for alumno in self.alumnos:
+            self.assertEqual(self.ledger.saldos[alumno.wallet.address], 1_500_000)
+        for l in Liquidacion.objects.all():
+            self.assertEqual(l.estado, 'enviada')
+            self.assertEqual(set(l.asignaciones.values_list('estado', 'txid')), {('completada', l.txid)})
+
+    def test_liquidacion_fallida_vuelve_a_adeudarse(self):
+        liquidacion.liquidar()
+        self.algod.fallar('send_transactions', 1)
+        _, fallidos = Despachador(self.algod, max_intentos=1).despachar()
+        self.assertEqual(len(fallidos), 3)
+        self.assertEqual(set(Liquidacion.objects.values_list('estado', flat=True)), {'fallida'})
+        self.assertEqual(liquidacion.adeudadas().count(), 9)
+
+        self.assertEqual(len(liquidacion.liquidar()), 3)
+        enviados, _ = Despachador(self.algod).despachar()
+        self.assertEqual(len(enviados), 3)
+        self.assertEqual(self.ledger.saldos[self.alumnos[0].wallet.address], 1_500_000)
+
+    def test_pago_perdido_vuelve_a_adeudarse(self):
+        liquidacion.liquidar()
+        Despachador(self.algod).despachar()
+        # Confirmadas localmente pero el indexer nunca las vio.
+        Transaccion.objects.update(estado='confirmed', fecha_creacion=timezone.now() - timezone.timedelta(hours=2))
+        verificacion.verificar(IndexerSimulado(LedgerSimulado({})))
+
+        self.assertEqual(set(Liquidacion.objects.values_list('estado', flat=True)), {'fallida'})
+        self.assertEqual(liquidacion.adeudadas().count(), 9)
+        self.assertEqual(len(liquidacion.liquidar()), 3)
+
+    def test_reenviar_el_formulario_no_duplica_lo_adeudado(self):
+        for _ in range(2):
+            self.client.post(reverse('asignar_actividad'), {
+                'actividad': self.actividades[0].id, 'alumno': [a.id for a in self.alumnos], 'monto': '0.5',
+                'idempotency_key': 'form-1',
+            })
+        self.assertEqual(liquidacion.adeudadas().count(), 12)
+
+        liquidaciones = liquidacion.liquidar()
+        self.assertEqual([l.monto for l in liquidaciones], [2_000_000] * 3)
+
+
+# =========================
+# LEDGER LOCAL
+# =========================
+class LedgerLocalTests(TestCase):
+    setUp = RedSimuladaTests.setUp
+    asignar = RedSimuladaTests.asignar
+
+    def test_montos_sin_float(self):
+        self.assertEqual(ledger.a_microalgos('0.1') + ledger.a_microalgos('0.2'), ledger.a_microalgos('0.3'))
+        self.assertEqual(ledger.a_microalgos(' 1.5 '), 1_500_000)
+        self.assertEqual(ledger.a_microalgos(''), 0)
+        for invalido in ('1.0000001', '-1', 'abc', 'NaN'):
+            with self.assertRaises(ValueError):
+                ledger.a_microalgos(invalido)
+
+    def test_saldo_corrido_cuadra_con_la_red(self):
+        docente = self.docente.wallet
+        self.assertEqual(ledger.conciliar(self.algod, [docente]), {docente: 10_000_000})
+
+        self.asignar('0.1')
+        ConfirmationTracker(self.algod).procesar_ronda(self.algod.status_after_block(self.ledger.ronda)['last-round'])
+
+        saldo = SaldoWallet.objects.get(wallet=docente)
+        self.assertEqual(saldo.saldo, self.ledger.saldos[docente.address])
+        self.assertEqual(saldo.total_pagado, 300_000)
+        self.assertEqual(ledger.totales(self.alumnos[0].user), (0, 100_000))
+        wallets = Wallet.objects.all()
+        self.assertEqual(ledger.conciliar(self.algod, wallets), {})
+
+        # El dashboard lee el saldo local: no consulta algod.
+        consultas = self.algod.llamadas['account_info']
+        self.client.force_login(self.alumnos[0].user)
+        with conectar(self.algod):
+            response = self.client.get(reverse('dashboard_estudiante'))
+        self.assertEqual(response.context['balance'], 0.1)
+        self.assertEqual(self.algod.llamadas['account_info'], consultas)
+
+    def test_asentar_dos_veces_no_mueve_el_saldo(self):
+        tx = Transaccion.objects.create(sender='doc', receiver='alu0', amount=1, tipo='docente_to_alumno',
+                                        estado='confirmed', txid='T1', fee=1000)
+        alumno = self.alumnos[0].wallet
+        ledger.pagos_confirmados([tx])
+        self.assertEqual(ledger.pagos_confirmados([tx]), [])
+        self.assertEqual(SaldoWallet.objects.get(wallet=alumno).saldo, 1_000_000)
+
+        ledger.pagos_confirmados([tx], -1)
+        self.assertEqual(ledger.pagos_confirmados([tx], -1), [])
+        self.assertEqual(SaldoWallet.objects.get(wallet=alumno).saldo, 0)
+
+        # Desligados los originales, una nueva confirmación vuelve a asentarse.
+        ledger.pagos_confirmados([tx])
+        self.assertEqual(SaldoWallet.objects.get(wallet=alumno).saldo, 1_000_000)
+        self.assertEqual(SaldoWallet.objects.get(wallet=self.docente.wallet).saldo, -1_001_000)
+
+    def test_saldo_previo_sin_conciliar_se_pide_a_algod(self):
+        alumno = self.alumnos[0]
+        self.ledger.saldos[alumno.wallet.address] = 5_000_000
+        self.asignar('0.1')
+        ConfirmationTracker(self.algod).procesar_ronda(self.algod.status_after_block(self.ledger.ronda)['last-round'])
+        # El ledger sólo vio el pago de 0.1: sin saldo de apertura no es el saldo de la wallet.
+        self.assertEqual(SaldoWallet.objects.get(wallet=alumno.wallet).saldo, 100_000)
+        self.assertIsNone(ledger.saldo(Wallet.objects.get(id=alumno.wallet_id)))
+
+        self.client.force_login(alumno.user)
+        with conectar(self.algod):
+            response = self.client.get(reverse('dashboard_estudiante'))
+        self.assertEqual(response.context['balance'], 5.1)
+
+        self.assertEqual(ledger.conciliar(self.algod, [alumno.wallet]), {alumno.wallet: 5_000_000})
+        self.assertEqual(ledger.saldo(Wallet.objects.get(id=alumno.wallet_id)), 5_100_000)
+        consultas = self.algod.llamadas['account_info']
+        with conectar(self.algod):
+            response = self.client.get(reverse('dashboard_estudiante'))
+        self.assertEqual(response.context['balance'], 5.1)
+        self.assertEqual(self.algod.llamadas['account_info'], consultas)
+
+
+
+# =========================
+# VERIFICACIÓN CONTRA EL INDEXER
+# =========================
+class VerificacionTests(TestCase):
+    setUp = RedSimuladaTests.setUp
+    asignar = RedSimuladaTests.asignar
+
+    def test_corrige_por_bloques_y_sigue_desde_el_checkpoint(self):
+        self.asignar('1')
+        self.algod.status_after_block(self.ledger.ronda)
+        ronda = self.ledger.ronda
+        # Pagos que nadie siguió y uno que se marcó confirmado sin llegar a la red.
+        hace_dos_horas = timezone.now() - timezone.timedelta(hours=2)
+        Transaccion.objects.create(sender='doc', receiver='alu0', amount=5, tipo='docente_to_alumno',
+                                   estado='pending', txid='FANTASMA', fecha_creacion=hace_dos_horas)
+        Transaccion.objects.create(sender='doc', receiver='alu0', amount=5, tipo='docente_to_alumno',
+                                   estado='pending', txid='RECIENTE')
+
+        indexer = IndexerSimulado(self.ledger)
+        indexer.fallar('transaction', 1)
+        cursor = verificacion.verificar(indexer, bloque=2, max_filas=2)
+        self.assertIsNotNone(cursor.inicio)
+        self.assertEqual((cursor.revisadas, cursor.sin_respuesta), (2, 1))
+
+        cursor = verificacion.verificar(indexer, bloque=2)
+        self.assertIsNone(cursor.inicio)
+        self.assertEqual(cursor.revisadas, 5)
+        self.assertEqual(indexer.llamadas['transaction'], 5)
+
+        estados = dict(Transaccion.objects.values_list('txid', 'estado'))
+        self.assertEqual(estados.pop('FANTASMA'), 'failed')
+        self.assertEqual(estados.pop('RECIENTE'), 'pending')
+        # La que el indexer no respondió queda para la siguiente pasada.
+        self.assertEqual(sorted(estados.values()), ['confirmed', 'confirmed', 'pending'])
+        self.assertEqual(
+            set(Transaccion.objects.filter(estado='confirmed').values_list('confirmed_round', flat=True)), {ronda}
+        )
+
+        cursor = verificacion.verificar(indexer)
+        self.assertEqual((cursor.revisadas, cursor.corregidas), (5, 1))
+        self.assertEqual(Transaccion.objects.filter(estado='confirmed').count(), 3)
+        self.assertEqual(ResumenAlumno.objects.get(alumno=self.alumnos[0].user).algos_ganados, 1)
+        self.assertEqual(ledger.totales(self.docente), (3_000_000, 0))
+        self.assertEqual(CursorVerificacion.objects.count(), 1)
+
+    def test_no_repite_lo_que_el_tracker_ya_asento(self):
+        self.asignar('1')
+        self.algod.status_after_block(self.ledger.ronda)
+        filas = list(Transaccion.objects.order_by('id'))
+        resultados = [verificacion._consultar(IndexerSimulado(self.ledger), tx.txid) for tx in filas]
+        cambiadas, _ = verificacion._corregir(filas, resultados, timezone.now())
+        self.assertEqual(len(cambiadas), 3)
+
+        # El tracker confirma las mismas filas entre la consulta y el guardado.
+        ConfirmationTracker(self.algod).procesar_ronda(self.ledger.ronda)
+        cursor = CursorVerificacion.objects.create(nombre=verificacion.CURSOR)
+        self.assertEqual(verificacion._guardar(cursor, filas, cambiadas), [])
+        self.assertEqual(ledger.totales(self.docente), (3_000_000, 0))
+        self.assertEqual(ResumenAlumno.objects.get(alumno=self.alumnos[0].user).algos_ganados, 1)
 
-# Create your tests here.
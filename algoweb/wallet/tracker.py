@@ -0,0 +1,119 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import transaction
+
+from . import ledger, liquidacion, summaries
+from .cache import invalidate_accounts
+from .models import Transaccion, ActividadAsignada
+
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# CONFIGURACIÓN
+# =========================
+TRACKER_SETTINGS = {
+    # Rondas que esperamos a una transacción antes de marcarla como fallida.
+    'TIMEOUT_ROUNDS': 10,
+    # Consultas simultáneas a algod durante una pasada.
+    'MAX_WORKERS': 8,
+}
+TRACKER_SETTINGS.update(getattr(settings, 'WALLET_CONFIRMATION_TRACKER', {}))
+
+
+# =========================
+# SEGUIMIENTO DE CONFIRMACIONES
+# =========================
+class ConfirmationTracker:
+    """Sigue las rondas de algod y resuelve los `Transaccion` pendientes en una pasada por ronda."""
+
+    def __init__(self, client, timeout_rounds=None, max_workers=None):
+        self.client = client
+        self.timeout_rounds = timeout_rounds or TRACKER_SETTINGS['TIMEOUT_ROUNDS']
+        self.max_workers = max_workers or TRACKER_SETTINGS['MAX_WORKERS']
+        # txid -> primera ronda en la que el tracker vio la transacción pendiente
+        self._vistas = {}
+
+    def _consultar(self, txid):
+        try:
+            return self.client.pending_transaction_info(txid)
+        except Exception as e:
+            logger.warning("No se pudo consultar %s: %s", txid, e)
+            return None
+
+    def procesar_ronda(self, ronda):
+        """Revisa todas las transacciones pendientes contra la ronda `ronda`."""
+        # Sin `.only()`: bulk_update escribe confirmed_round, fee y detalle, y con
+        # campos diferidos Django haría una consulta por fila al leerlos.
+        pendientes = list(Transaccion.objects.filter(estado='pending', txid__isnull=False))
+        if not pendientes:
+            self._vistas.clear()
+            return []
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            infos = list(pool.map(self._consultar, [tx.txid for tx in pendientes]))
+
+        actualizadas = []
+        direcciones = set()
+        for tx, info in zip(pendientes, infos):
+            if info is None:
+                # Sin respuesta de algod no sabemos si sigue pendiente: no cuenta para el
+                # timeout. Lo que algod ya no conoce lo resuelve `reconcile_transactions`.
+                continue
+            vista = self._vistas.setdefault(tx.txid, ronda)
+            txn = info.get('txn', {}).get('txn', {})
+
+            if info.get('confirmed-round', 0) > 0:
+                tx.estado = 'confirmed'
+                tx.confirmed_round = info['confirmed-round']
+                tx.fee = txn.get('fee')
+                direcciones.update([txn.get('snd'), txn.get('rcv')])
+            elif info.get('pool-error'):
+                tx.estado = 'failed'
+                tx.detalle = info['pool-error']
+            elif ronda > txn.get('lv', ronda) or ronda - vista >= self.timeout_rounds:
+                tx.estado = 'failed'
+                tx.detalle = f"Sin confirmar tras la ronda {ronda}"
+            else:
+                continue
+
+            self._vistas.pop(tx.txid, None)
+            actualizadas.append(tx)
+
+        with transaction.atomic():
+            # Sólo cuenta la fila que sigue pendiente al escribirla: si `reconcile_transactions`
+            # la resolvió mientras tanto, él ya asentó el cambio y aquí no se repite.
+            actualizadas = [
+                tx for tx in actualizadas
+                if Transaccion.objects.filter(pk=tx.pk, estado='pending').update(
+                    estado=tx.estado, confirmed_round=tx.confirmed_round, fee=tx.fee, detalle=tx.detalle,
+                )
+            ]
+            # update() no dispara señales: actualizamos los resúmenes y el ledger a mano.
+            confirmadas = [t for t in actualizadas if t.estado == 'confirmed']
+            summaries.pagos_confirmados(confirmadas)
+            ledger.pagos_confirmados(confirmadas)
+            fallidas = [t.txid for t in actualizadas if t.estado == 'failed']
+            if fallidas:
+                # La recompensa no llegó: la asignación vuelve a quedar pendiente.
+                ActividadAsignada.objects.filter(txid__in=fallidas).update(estado='pendiente')
+                liquidacion.pagos_perdidos(fallidas)
+        invalidate_accounts(*direcciones)
+        return actualizadas
+
+    def run(self, detener=None):
+        """Bucle principal: una pasada por cada ronda nueva que anuncia `status_after_block`."""
+        ronda = self.client.status()['last-round']
+        while detener is None or not detener.is_set():
+            try:
+                self.procesar_ronda(ronda)
+                ronda = self.client.status_after_block(ronda)['last-round']
+            except Exception as e:
+                logger.exception("Error en el tracker de confirmaciones: %s", e)
+                if detener is None:
+                    time.sleep(1)
+                elif detener.wait(1):
+                    break
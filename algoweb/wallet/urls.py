@@ -8,6 +8,8 @@ urlpatterns = [
     path('', views.login_view, name='login'),
     path('logout/', views.logout_view, name='logout'),
     path('registro/', views.registro_view, name='registro'),
+    # Alumnos importados por CSV: eligen su contraseña con el enlace del reporte de importación.
+    path('activar/<uidb64>/<token>/', views.ActivarCuentaView.as_view(), name='activar_cuenta'),
 
     # ======================================
     # 🧭 Dashboards según rol
@@ -28,6 +30,8 @@ urlpatterns = [
     path('mi_wallet/', views.mi_wallet, name='mi_wallet'),
     path('registrar_wallet/', views.registrar_wallet, name='registrar_wallet'),
     path('get_balance/', views.get_balance, name='get_balance'),
+    path('get_balances/', views.get_balances, name='get_balances'),
+    path('eventos/', views.eventos_wallet, name='eventos_wallet'),
     path('transacciones/', views.transacciones, name='transacciones'),
     path('envio/', views.envio, name='envio'),
 
@@ -36,6 +40,7 @@ urlpatterns = [
     # ======================================
     path('alumnos/', views.alumnos, name='alumnos'),
     path('agregar_alumno/', views.agregar_alumno, name='agregar_alumno'),
+    path('alumnos/importar/', views.importar_alumnos, name='importar_alumnos'),
 
     # ======================================
     # 🧾 Actividades (Administrador)
@@ -45,8 +50,8 @@ urlpatterns = [
     # ======================================
     # 💸 Transferencias de ALGOs
     # ======================================
-    # Admin → Docente
-    path('admin/enviar_algos/', views.enviar_algos_admin, name='enviar_algos_admin'),
+    # Admin → Docente (fuera de 'admin/', que captura el sitio de administración de Django)
+    path('enviar_algos/admin/', views.enviar_algos_admin, name='enviar_algos_admin'),
     
     # ⚠️ Eliminado: Docente → Estudiante (ya se hace en asignar_actividad)
     # path('docente/enviar_algos/', views.enviar_algos_docente, name='enviar_algos_docente'),
@@ -61,4 +66,14 @@ urlpatterns = [
     # ======================================
     # ⚠️ Asegúrate de que esta vista exista, o coméntala temporalmente
     # path('historial-transacciones/', views.historial_transacciones, name='historial_transacciones'),
+
+    # ======================================
+    # 📤 Exportación del ledger (auditoría)
+    # ======================================
+    path('exportar/', views.exportar_ledger, name='exportar_ledger'),
+
+    # ======================================
+    # 📈 Métricas por vista (Prometheus, solo staff)
+    # ======================================
+    path('metrics', views.metricas, name='metricas'),
 ]
@@ -0,0 +1,160 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import ledger, liquidacion, summaries
+from .clients import INDEXER_CLIENT
+from .models import ActividadAsignada, CursorVerificacion, Transaccion
+
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# CONFIGURACIÓN
+# =========================
+VERIFICACION_SETTINGS = {
+    # Filas de `Transaccion` por bloque; cada bloque se corrige junto con el checkpoint.
+    'BLOQUE': 500,
+    # Consultas simultáneas al indexer.
+    'MAX_WORKERS': 16,
+    # Segundos que se le dan al indexer para ver una transacción antes de darla por perdida.
+    'GRACIA': 3600,
+}
+VERIFICACION_SETTINGS.update(getattr(settings, 'WALLET_VERIFICACION', {}))
+
+CURSOR = 'transacciones'
+
+
+# =========================
+# CONSULTA AL INDEXER
+# =========================
+def _no_encontrada(error):
+    # El indexer responde 404 con este mensaje; IndexerHTTPError no trae el código.
+    return 'no transaction found' in str(error)
+
+
+def _consultar(client, txid):
+    """La transacción según el indexer, None si no la conoce, o la excepción si no respondió."""
+    try:
+        return client.transaction(txid)['transaction']
+    except Exception as e:
+        return None if _no_encontrada(e) else e
+
+
+# =========================
+# CORRECCIÓN POR BLOQUES
+# =========================
+def _corregir(filas, resultados, limite_gracia):
+    """Aplica a `filas` lo que dice el indexer. Devuelve (cambiadas, sin_respuesta).
+
+    `cambiadas` es una lista de (transacción ya corregida, estado que tenía al leerla).
+    """
+    cambiadas = []
+    sin_respuesta = 0
+    for tx, resultado in zip(filas, resultados):
+        if isinstance(resultado, Exception):
+            sin_respuesta += 1
+            continue
+
+        anterior = tx.estado
+        if resultado is not None:
+            ronda = resultado.get('confirmed-round')
+            if tx.estado == 'confirmed' and tx.confirmed_round == ronda:
+                continue
+            if tx.estado != 'confirmed':
+                # La comisión sólo se anota al confirmar: así el ledger la asienta una vez.
+                tx.fee = resultado.get('fee')
+            tx.estado = 'confirmed'
+            tx.confirmed_round = ronda
+            tx.detalle = None
+        elif tx.estado in ('pending', 'confirmed') and tx.fecha_creacion < limite_gracia:
+            tx.estado = 'failed'
+            tx.confirmed_round = None
+            tx.detalle = "No aparece en el indexer"
+        else:
+            continue
+        cambiadas.append((tx, anterior))
+    return cambiadas, sin_respuesta
+
+
+def _guardar(cursor, filas, cambiadas):
+    with transaction.atomic():
+        # Cada fila se escribe sólo si conserva el estado con el que se leyó: si el tracker
+        # la resolvió mientras consultábamos al indexer, él ya la asentó y aquí se omite.
+        aplicadas = [
+            (tx, anterior) for tx, anterior in cambiadas
+            if Transaccion.objects.filter(pk=tx.pk, estado=anterior).update(
+                estado=tx.estado, confirmed_round=tx.confirmed_round, fee=tx.fee, detalle=tx.detalle,
+            )
+        ]
+        confirmadas = [tx for tx, anterior in aplicadas if anterior != 'confirmed' and tx.estado == 'confirmed']
+        perdidas = [tx for tx, anterior in aplicadas if anterior == 'confirmed' and tx.estado == 'failed']
+        # update() no dispara señales: resúmenes y ledger se ajustan como en el tracker.
+        summaries.pagos_confirmados(confirmadas)
+        ledger.pagos_confirmados(confirmadas)
+        summaries.pagos_confirmados(perdidas, -1)
+        ledger.pagos_confirmados(perdidas, -1)
+        # Un pago que nunca llegó deja su asignación pendiente otra vez.
+        txids = [tx.txid for tx in perdidas]
+        ActividadAsignada.objects.filter(txid__in=txids).update(estado='pendiente')
+        liquidacion.pagos_perdidos(txids)
+
+        cursor.ultimo_id = filas[-1].id
+        cursor.revisadas += len(filas)
+        cursor.corregidas += len(aplicadas)
+        cursor.save(update_fields=['ultimo_id', 'revisadas', 'corregidas', 'actualizado'])
+    return aplicadas
+
+
+def verificar(client=INDEXER_CLIENT, bloque=None, max_workers=None, reiniciar=False, max_filas=None,
+              progreso=None):
+    """Revisa los `Transaccion` con txid contra el indexer y corrige `estado` y `confirmed_round`.
+
+    Recorre la tabla por id en bloques de `bloque` filas; los txid de cada
+    bloque se consultan en paralelo con a lo más `max_workers` peticiones
+    al indexer. Cada bloque se guarda en la misma transacción que avanza el checkpoint (`CursorVerificacion`), así que
+    una pasada interrumpida sigue donde se quedó. Las filas cuyo indexer no
+    respondió se cuentan y se vuelven a revisar en la siguiente pasada.
+
+    Devuelve el cursor con los totales de la pasada; `inicio` queda en None
+    cuando la pasada terminó.
+    """
+    bloque = bloque or VERIFICACION_SETTINGS['BLOQUE']
+    max_workers = max_workers or VERIFICACION_SETTINGS['MAX_WORKERS']
+
+    cursor, _ = CursorVerificacion.objects.get_or_create(nombre=CURSOR)
+    if reiniciar or cursor.inicio is None:
+        cursor.ultimo_id = cursor.revisadas = cursor.corregidas = 0
+        cursor.inicio = timezone.now()
+        cursor.save()
+    # Lo creado después de arrancar la pasada lo sigue resolviendo el tracker.
+    limite_gracia = cursor.inicio - timedelta(seconds=VERIFICACION_SETTINGS['GRACIA'])
+    pendientes = Transaccion.objects.filter(txid__isnull=False, fecha_creacion__lte=cursor.inicio).order_by('id')
+
+    sin_respuesta = 0
+    leidas = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while max_filas is None or leidas < max_filas:
+            limite = bloque if max_filas is None else min(bloque, max_filas - leidas)
+            filas = list(pendientes.filter(id__gt=cursor.ultimo_id)[:limite])
+            if not filas:
+                cursor.inicio = None
+                cursor.save(update_fields=['inicio', 'actualizado'])
+                break
+
+            resultados = list(pool.map(lambda tx: _consultar(client, tx.txid), filas))
+            cambiadas, fallidas = _corregir(filas, resultados, limite_gracia)
+            cambiadas = _guardar(cursor, filas, cambiadas)
+            sin_respuesta += fallidas
+            leidas += len(filas)
+            if fallidas:
+                logger.warning("El indexer no respondió por %d transacciones hasta el id %d", fallidas, cursor.ultimo_id)
+            if progreso:
+                progreso(cursor, len(filas), len(cambiadas))
+
+    cursor.sin_respuesta = sin_respuesta
+    return cursor
@@ -1,70 +1,44 @@
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from django.contrib.auth import authenticate, login, logout
+from django.contrib.auth import authenticate, login, logout, views as auth_views
 from django.contrib import messages
-from django.http import JsonResponse
-from algosdk.v2client import algod, indexer
-from algosdk import account, transaction, mnemonic
-from .models import Wallet, Alumno, User, Actividad, Transaccion, ActividadAsignada
+from django.core.handlers.asgi import ASGIRequest
+from django.db import IntegrityError, transaction as db_transaction
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.urls import reverse_lazy
+from django.utils.functional import SimpleLazyObject
+from algosdk import encoding
+from .models import (
+    Wallet, Alumno, User, Actividad, Transaccion, ActividadAsignada, MovimientoIndexado,
+    ResumenRol, ResumenDocente, ResumenAlumno,
+)
 from .forms import ActividadForm
-import base64
-import time
+from .cache import BALANCE_BATCH_SETTINGS, aget_account_info, aget_many_account_info
+from .clients import ALGOD_CLIENT, ASYNC_ALGOD_CLIENT
+from .keypool import reclamar_llave
+from . import eventos, importacion, ledger, liquidacion, metrics, outbox, summaries
+from .pagination import paginar_keyset
+from .routers import lectura_en_replica
+from .export import exportar, nombre_archivo
+import asyncio
+import uuid
 
 # =========================
 # CONFIGURACIÓN ALGOD
 # =========================
-ALGOD_CLIENT = algod.AlgodClient("", "https://testnet-api.algonode.cloud")
+# render() en un hilo: el template puede tocar el ORM (p. ej. relaciones perezosas).
+arender = sync_to_async(render)
 
 
-# =========================
-# HELPERS
-# =========================
-def _to_private_key(stored_key):
-    """Convierte el valor almacenado en la BD a la private key que .sign() acepta."""
-    if stored_key is None:
-        raise ValueError("No private key provided")
-
-    if isinstance(stored_key, (bytes, bytearray)):
-        return stored_key
-
-    if isinstance(stored_key, str):
-        # mnemonic de 25 palabras
-        if len(stored_key.split()) == 25:
-            try:
-                return mnemonic.to_private_key(stored_key)
-            except Exception:
-                pass
-
-        # base64
-        try:
-            decoded = base64.b64decode(stored_key)
-            if decoded:
-                return decoded
-        except Exception:
-            pass
-
-        # raw
-        return stored_key.encode()
-
-    raise ValueError("Formato de private_key no soportado")
+def _algod(request):
+    """Cliente algod para las vistas async.
 
-
-def wait_for_confirmation(client, txid, timeout=20):
-    """Espera la confirmación de la transacción en la blockchain."""
-    start = time.time()
-    while True:
-        try:
-            pt = client.pending_transaction_info(txid)
-        except Exception as e:
-            raise e
-
-        if pt.get("confirmed-round", 0) > 0:
-            return pt
-
-        if time.time() - start > timeout:
-            raise TimeoutError("Timeout esperando confirmación")
-
-        time.sleep(1)
+    Bajo ASGI, el cliente async: la espera no ocupa ningún hilo. Bajo WSGI cada
+    petición async corre en un event loop efímero donde no hay conexiones que
+    reutilizar, así que se usa el pool síncrono (keep-alive) desde un hilo.
+    """
+    return ASYNC_ALGOD_CLIENT if isinstance(request, ASGIRequest) else ALGOD_CLIENT
 
 
 # =========================
@@ -95,6 +69,16 @@ def logout_view(request):
     return redirect('login')
 
 
+class ActivarCuentaView(auth_views.PasswordResetConfirmView):
+    """Primera contraseña de un alumno importado (enlace de `importacion.enlace_activacion`)."""
+    template_name = 'wallet/activar_cuenta.html'
+    success_url = reverse_lazy('login')
+
+    def form_valid(self, form):
+        messages.success(self.request, "Contraseña guardada. Inicia sesión para continuar.")
+        return super().form_valid(form)
+
+
 def registro_view(request):
     if request.method == 'POST':
         username = request.POST.get('username')
@@ -108,7 +92,7 @@ def registro_view(request):
             return render(request, 'wallet/registro.html', {'error': 'El usuario ya existe'})
 
         user = User.objects.create_user(username=username, password=password, role=rol)
-        private_key, address = account.generate_account()
+        private_key, address = reclamar_llave()
         Wallet.objects.create(user=user, address=address, private_key=private_key)
 
         messages.success(request, "Cuenta creada exitosamente. Inicia sesión para continuar.")
@@ -121,57 +105,76 @@ def registro_view(request):
 # DASHBOARDS
 # =========================
 @login_required
+@lectura_en_replica
 def dashboard_admin(request):
     docentes = User.objects.filter(role='docente')
     estudiantes = User.objects.filter(role='estudiante')
-    actividades = Actividad.objects.all().order_by('-fecha_creacion')
+    # Perezosos: sólo se consultan si el fragmento en caché de la plantilla expiró.
+    actividades = SimpleLazyObject(lambda: paginar_keyset(
+        Actividad.objects.select_related('docente'), request.GET.get('cursor'), ('-fecha_creacion', '-id')
+    ))
+    totales = SimpleLazyObject(lambda: dict(ResumenRol.objects.values_list('role', 'total')))
 
     return render(request, 'wallet/dashboard_admin.html', {
         'user': request.user,
         'docentes': docentes,
         'estudiantes': estudiantes,
-        'total_docentes': docentes.count(),
-        'total_estudiantes': estudiantes.count(),
+        'totales': totales,
         'actividades': actividades,
     })
 
 
 @login_required
+@lectura_en_replica
 def dashboard_docente(request):
-    wallet = getattr(request.user, 'wallet', None)
-    alumnos = Alumno.objects.filter(user=request.user)
+    wallet = SimpleLazyObject(lambda: getattr(request.user, 'wallet', None))
+    alumnos = Alumno.objects.filter(user=request.user).select_related('wallet')
     actividades = Actividad.objects.filter(docente=request.user)
 
+    # Perezosos: sólo se consultan si el fragmento en caché de la plantilla expiró.
+    resumen = SimpleLazyObject(lambda: ResumenDocente.objects.filter(docente=request.user).first())
+
     return render(request, 'wallet/dashboard_docente.html', {
         'user': request.user,
         'wallet': wallet,
         'alumnos': alumnos,
-        'num_alumnos': alumnos.count(),
+        'num_alumnos': SimpleLazyObject(alumnos.count),
         'actividades': actividades,
+        'resumen': resumen,
     })
 
 
 @login_required
-def dashboard_estudiante(request):
-    wallet = getattr(request.user, 'wallet', None)
-
-    if wallet:
+@lectura_en_replica
+async def dashboard_estudiante(request):
+    user = await request.auser()
+    wallet = await Wallet.objects.select_related('saldo_local').filter(user=user).afirst()
+
+    async def consultar_balance():
+        if not wallet:
+            return 0, 0
+        local = ledger.saldo(wallet)
+        if local is not None:
+            # Saldo del ledger ya conciliado: sin ir a algod (manage.py conciliar_saldos lo cuadra con la red).
+            return local / 1_000_000, None
         try:
-            account_info = ALGOD_CLIENT.account_info(wallet.address)
-            balance = account_info.get('amount', 0) / 1_000_000
-            activos = len(account_info.get('assets', []))
+            account_info = await aget_account_info(_algod(request), wallet.address)
+            return account_info.get('amount', 0) / 1_000_000, len(account_info.get('assets', []))
         except Exception:
-            balance = 0
-            activos = 0
-    else:
-        balance = 0
-        activos = 0
+            return 0, 0
 
-    return render(request, 'wallet/dashboard_estudiante.html', {
-        'user': request.user,
+    # algod y el resumen se piden a la vez; ninguno bloquea el worker.
+    (balance, activos), resumen = await asyncio.gather(
+        consultar_balance(),
+        ResumenAlumno.objects.filter(alumno=user).afirst(),
+    )
+
+    return await arender(request, 'wallet/dashboard_estudiante.html', {
+        'user': user,
         'wallet': wallet,
         'balance': balance,
-        'activos': activos
+        'activos': activos,
+        'resumen': resumen,
     })
 
 
@@ -194,14 +197,19 @@ def info(request):
 # ALUMNOS
 # =========================
 @login_required
+@lectura_en_replica
 def alumnos(request):
     try:
         wallet = Wallet.objects.get(user=request.user)
     except Wallet.DoesNotExist:
         return render(request, "wallet/no_wallet.html")
 
-    alumnos = Alumno.objects.filter(wallet=wallet)
-    return render(request, 'wallet/alumno.html', {'alumnos': alumnos})
+    alumnos = SimpleLazyObject(lambda: paginar_keyset(
+        Alumno.objects.filter(wallet=wallet).select_related('user', 'wallet'),
+        request.GET.get('cursor'),
+        ('matricula', 'id'),
+    ))
+    return render(request, 'wallet/alumno.html', {'alumnos': alumnos, 'wallet': wallet})
 
 
 @login_required
@@ -227,24 +235,50 @@ def agregar_alumno(request):
     return render(request, 'wallet/agregar_alumno.html', {'wallet_address': wallet.address})
 
 
+@login_required
+def importar_alumnos(request):
+    if request.user.role not in ("docente", "admin"):
+        messages.error(request, "Solo docentes y administradores pueden importar alumnos.")
+        return redirect("dashboard_estudiante")
+
+    contexto = {}
+    if request.method == "POST":
+        archivo = request.FILES.get("archivo")
+        if not archivo:
+            contexto["error"] = "Selecciona un archivo CSV."
+        else:
+            try:
+                filas = importacion.leer_csv(archivo.read())
+            except ValueError as e:
+                contexto["error"] = str(e)
+            else:
+                resultado = importacion.importar_alumnos(filas)
+                contexto["resultado"] = resultado
+                if resultado.creados:
+                    messages.success(request, f"✅ {len(resultado.creados)} alumnos importados con su wallet.")
+
+    return render(request, "wallet/importar_alumnos.html", contexto)
+
+
 # =========================
 # WALLET
 # =========================
 @login_required
-def mi_wallet(request):
+async def mi_wallet(request):
+    user = await request.auser()
     try:
-        wallet = Wallet.objects.get(user=request.user)
-        account_info = ALGOD_CLIENT.account_info(wallet.address)
+        wallet = await Wallet.objects.aget(user=user)
+        account_info = await aget_account_info(_algod(request), wallet.address)
     except Wallet.DoesNotExist:
-        return render(request, "wallet/no_wallet.html")
+        return await arender(request, "wallet/no_wallet.html")
 
     datos = {
-        "user": request.user,
+        "user": user,
         "address": wallet.address,
         "balance": account_info.get('amount', 0) / 1_000_000,
         "txs": len(account_info.get('assets', [])),
     }
-    return render(request, "wallet/mi_wallet.html", datos)
+    return await arender(request, "wallet/mi_wallet.html", datos)
 
 
 @login_required
@@ -255,7 +289,7 @@ def registrar_wallet(request):
                 "error": "Ya tienes una wallet registrada."
             })
 
-        private_key, address = account.generate_account()
+        private_key, address = reclamar_llave()
         Wallet.objects.create(user=request.user, address=address, private_key=private_key)
         return redirect("mi_wallet")
 
@@ -266,54 +300,101 @@ def registrar_wallet(request):
 # TRANSACCIONES
 # =========================
 @login_required
-def transacciones(request):
+@lectura_en_replica
+async def transacciones(request):
+    user = await request.auser()
     try:
-        wallet = Wallet.objects.get(user=request.user)
+        wallet = await Wallet.objects.aget(user=user)
     except Wallet.DoesNotExist:
-        return render(request, "wallet/no_wallet.html")
+        return await arender(request, "wallet/no_wallet.html")
 
-    client = indexer.IndexerClient("", "https://testnet-idx.algonode.cloud")
-    try:
-        response = client.search_transactions_by_address(wallet.address, limit=10)
-        txs = response.get("transactions", [])
-    except Exception as e:
-        return render(request, "wallet/transacciones.html", {"txs": [], "error": str(e)})
-
-    transacciones = []
-    for tx in txs:
-        tipo = tx.get("tx-type", "desconocido")
-        monto = tx.get("payment-transaction", {}).get("amount", 0) / 1_000_000
-        receptor = tx.get("payment-transaction", {}).get("receiver", "")
-        remitente = tx.get("sender", "")
-        fecha = tx.get("round-time", 0)
-        transacciones.append({
-            "tipo": tipo,
-            "monto": monto,
-            "receptor": receptor,
-            "remitente": remitente,
-            "fecha": fecha,
-        })
-
-    return render(request, "wallet/transacciones.html", {
+    # El historial se sirve desde el espejo local (manage.py sync_indexer), sin red.
+    transacciones = await sync_to_async(paginar_keyset)(
+        MovimientoIndexado.objects.filter(wallet=wallet),
+        request.GET.get('cursor'),
+        ('-confirmed_round', '-id'),
+    )
+
+    return await arender(request, "wallet/transacciones.html", {
+        "user": user,
         "transacciones": transacciones,
         "address": wallet.address,
     })
 
 
 @login_required
-def get_balance(request):
+async def get_balance(request):
     address = request.GET.get('address', '')
     if not address:
         return JsonResponse({"error": "Missing address"}, status=400)
 
     try:
-        account_info = ALGOD_CLIENT.account_info(address)
+        account_info = await aget_account_info(_algod(request), address)
         balance = account_info.get('amount', 0) / 1_000_000
         return JsonResponse({"address": address, "balance": balance})
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
 
 
+@login_required
+async def get_balances(request):
+    """Saldos de varias direcciones (`?address=A&address=B` o `?addresses=A,B`) en una sola petición."""
+    direcciones = request.GET.getlist('address')
+    for lista in request.GET.getlist('addresses'):
+        direcciones += [a.strip() for a in lista.split(',') if a.strip()]
+    direcciones = list(dict.fromkeys(direcciones))
+
+    if not direcciones:
+        return JsonResponse({"error": "Missing address"}, status=400)
+    if len(direcciones) > BALANCE_BATCH_SETTINGS['MAX_ADDRESSES']:
+        return JsonResponse(
+            {"error": f"Too many addresses (max {BALANCE_BATCH_SETTINGS['MAX_ADDRESSES']})"}, status=400
+        )
+
+    resultados = await aget_many_account_info(
+        _algod(request),
+        [a for a in direcciones if encoding.is_valid_address(a)],
+        max_concurrency=BALANCE_BATCH_SETTINGS['CONCURRENCY'],
+        timeout=BALANCE_BATCH_SETTINGS['TIMEOUT'],
+    )
+
+    balances = {}
+    for address in direcciones:
+        resultado = resultados.get(address)
+        if resultado is None:
+            balances[address] = {"error": "Invalid address"}
+        elif isinstance(resultado, Exception):
+            balances[address] = {"error": str(resultado) or resultado.__class__.__name__}
+        else:
+            balances[address] = {"balance": resultado.get('amount', 0) / 1_000_000}
+    return JsonResponse({"balances": balances})
+
+
+@login_required
+async def eventos_wallet(request):
+    """Server-Sent Events de la wallet del usuario: cambios de saldo y de estado de sus pagos.
+
+    Todas las pestañas del proceso comparten un mismo vigilante (wallet/eventos.py),
+    así que abrir más pestañas no multiplica las consultas a algod.
+    """
+    if not isinstance(request, ASGIRequest):
+        # Bajo WSGI cada conexión abierta ocuparía un hilo indefinidamente.
+        return JsonResponse({"error": "Los eventos en vivo requieren el servidor ASGI."}, status=501)
+
+    user = await request.auser()
+    wallet = await Wallet.objects.filter(user=user).afirst()
+    if wallet is None:
+        return JsonResponse({"error": "No tienes una wallet registrada."}, status=404)
+
+    vigilante = eventos.obtener_vigilante(_algod(request))
+    response = StreamingHttpResponse(
+        eventos.Flujo(vigilante, wallet.address, user.username), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
 # =========================
 # ACTIVIDADES
 # =========================
@@ -351,61 +432,97 @@ def asignar_actividad(request):
 
     docente = request.user
     actividades = Actividad.objects.filter(docente=docente)
-    alumnos = Alumno.objects.all()
 
     if request.method == "POST":
         actividad_id = request.POST.get("actividad")
-        alumno_id = request.POST.get("alumno")
-        monto = float(request.POST.get("monto", 0))
+        alumno_ids = request.POST.getlist("alumno")
+        try:
+            microalgos = ledger.a_microalgos(request.POST.get("monto", 0))
+        except ValueError as e:
+            messages.error(request, str(e))
+            return redirect("asignar_actividad")
 
         actividad = get_object_or_404(Actividad, id=actividad_id)
-        alumno = get_object_or_404(Alumno, id=alumno_id)
-
-        txid = None
-        if monto > 0:
-            try:
-                sender_wallet = Wallet.objects.get(user=docente)
-                receiver_wallet = alumno.wallet
-
-                sender_sk = _to_private_key(sender_wallet.private_key)
-                params = ALGOD_CLIENT.suggested_params()
-                unsigned_txn = transaction.PaymentTxn(
-                    sender_wallet.address,
-                    params,
-                    receiver_wallet.address,
-                    int(monto * 1_000_000)
-                )
-                signed_txn = unsigned_txn.sign(sender_sk)
-                txid = ALGOD_CLIENT.send_transaction(signed_txn)
-                wait_for_confirmation(ALGOD_CLIENT, txid, 4)
-
-                Transaccion.objects.create(
-                    sender=docente.username,
-                    receiver=alumno.user.username,
-                    amount=monto,
-                    txid=txid,
-                    tipo="docente_to_alumno",
-                    estado="confirmed"
-                )
-                messages.success(request, f"✅ Actividad asignada y {monto} ALGOs enviados (TxID: {txid[:8]}...)")
-            except Exception as e:
-                messages.error(request, f"Error al enviar ALGOs: {e}")
-
-        ActividadAsignada.objects.create(
-            actividad=actividad,
-            docente=docente,
-            alumno=alumno.user,
-            estado="completada" if txid else "pendiente"
-        )
-
+        if len(alumno_ids) > 1:
+            alumnos = list(Alumno.objects.filter(id__in=alumno_ids).select_related('user', 'wallet'))
+        else:
+            alumnos = [get_object_or_404(Alumno.objects.select_related('user', 'wallet'), id=alumno_ids[0] if alumno_ids else None)]
+        _asignar_en_lote(request, docente, actividad, alumnos, microalgos)
         return redirect("asignar_actividad")
 
+    alumnos = SimpleLazyObject(lambda: paginar_keyset(
+        Alumno.objects.select_related('user'), request.GET.get('cursor'), ('matricula', 'id')
+    ))
     return render(request, "wallet/asignar_actividad.html", {
         "actividades": actividades,
-        "alumnos": alumnos
+        "alumnos": alumnos,
+        "idempotency_key": uuid.uuid4().hex,
     })
 
 
+def _asignar_en_lote(request, docente, actividad, alumnos, microalgos):
+    """Asigna `actividad` a `alumnos` y deja sus recompensas en el outbox, todo en una transacción.
+
+    El pago lo firma y envía `manage.py dispatch_outbox`. Cada asignación (y
+    su pago) lleva la clave de idempotencia del formulario más el alumno:
+    reenviar el mismo formulario no vuelve a asignar ni a pagar a quien ya
+    la tenía, en cualquiera de los dos modos. En modo liquidación no se
+    encola nada: la recompensa queda adeudada hasta
+    `manage.py liquidar_recompensas`.
+    """
+    clave_form = request.POST.get("idempotency_key") or uuid.uuid4().hex
+    monto = ledger.a_algos(microalgos)
+    sender_wallet = Wallet.objects.select_related('user').filter(user=docente).first() if microalgos > 0 else None
+    if microalgos > 0 and sender_wallet is None:
+        messages.error(request, "Error al enviar ALGOs: el docente no tiene wallet.")
+
+    acumular = liquidacion.acumular_recompensas()
+    claves = {a.id: f"asignacion:{clave_form}:{a.id}" for a in alumnos}
+    repetidas = set(ActividadAsignada.objects.filter(clave__in=claves.values()).values_list('clave', flat=True))
+    if repetidas:
+        alumnos = [a for a in alumnos if claves[a.id] not in repetidas]
+        messages.warning(request, f"{len(repetidas)} asignaciones de este formulario ya existían; no se duplicaron.")
+        if not alumnos:
+            return
+    a_pagar = [a for a in alumnos if a.wallet] if sender_wallet else []
+    pagados = {a.id for a in a_pagar}
+
+    try:
+        with db_transaction.atomic():
+            asignaciones = ActividadAsignada.objects.bulk_create([
+                ActividadAsignada(
+                    actividad=actividad,
+                    docente=docente,
+                    alumno=a.user,
+                    monto_algos=monto if a.id in pagados else 0,
+                    estado="pendiente",
+                    por_liquidar=acumular and a.id in pagados,
+                    clave=claves[a.id],
+                )
+                for a in alumnos
+            ])
+            if not acumular:
+                outbox.encolar(sender_wallet, "docente_to_alumno", [
+                    {'clave': claves[a.id], 'receptor': a.user, 'address': a.wallet.address,
+                     'monto': microalgos, 'asignacion': asignacion}
+                    for a, asignacion in zip(alumnos, asignaciones) if a.id in pagados
+                ])
+            # bulk_create no dispara post_save: sumamos el lote a los resúmenes aquí.
+            summaries.asignaciones_creadas(asignaciones)
+    except IntegrityError:
+        # Otro envío del mismo formulario ganó la carrera por la clave.
+        messages.warning(request, "Este formulario ya se había enviado; no se duplicaron asignaciones ni pagos.")
+        return
+
+    if a_pagar and acumular:
+        messages.success(request, f"✅ {len(a_pagar)} recompensas de {monto} ALGOs acumuladas para la próxima liquidación.")
+    elif a_pagar:
+        messages.success(request, f"✅ {len(a_pagar)} pagos de {monto} ALGOs en cola de envío.")
+    if sender_wallet and len(a_pagar) < len(alumnos):
+        messages.error(request, f"Error al enviar ALGOs a {len(alumnos) - len(a_pagar)} alumnos: sin wallet")
+    messages.success(request, f"✅ Actividad asignada a {len(alumnos)} alumnos.")
+
+
 # =========================
 # ENVÍO DE ALGOS (ADMIN → DOCENTE)
 # =========================
@@ -419,42 +536,77 @@ def enviar_algos_admin(request):
 
     if request.method == "POST":
         docente_id = request.POST.get("docente")
-        monto = float(request.POST.get("monto", 0))
+        try:
+            microalgos = ledger.a_microalgos(request.POST.get("monto", 0))
+        except ValueError:
+            microalgos = 0
 
-        if not docente_id or monto <= 0:
+        if not docente_id or microalgos <= 0:
             messages.error(request, "Selecciona un docente y un monto válido.")
             return redirect("enviar_algos_admin")
 
         docente = get_object_or_404(User, id=docente_id)
-        admin_wallet = Wallet.objects.get(user=request.user)
+        admin_wallet = Wallet.objects.select_related('user').get(user=request.user)
         docente_wallet = Wallet.objects.get(user=docente)
+        clave = f"admin:{request.POST.get('idempotency_key') or uuid.uuid4().hex}:{docente.id}"
 
         try:
-            sender_sk = _to_private_key(admin_wallet.private_key)
-            params = ALGOD_CLIENT.suggested_params()
-            unsigned_txn = transaction.PaymentTxn(
-                admin_wallet.address,
-                params,
-                docente_wallet.address,
-                int(monto * 1_000_000)
-            )
-            signed_txn = unsigned_txn.sign(sender_sk)
-            txid = ALGOD_CLIENT.send_transaction(signed_txn)
-            wait_for_confirmation(ALGOD_CLIENT, txid, 4)
-
-            Transaccion.objects.create(
-                sender=request.user.username,
-                receiver=docente.username,
-                amount=monto,
-                txid=txid,
-                tipo="admin_to_docente",
-                estado="confirmed"
-            )
-
-            messages.success(request, f"✅ {monto} ALGOs enviados a {docente.username} (TxID: {txid[:8]}...)")
-        except Exception as e:
-            messages.error(request, f"Error al enviar ALGOs: {e}")
+            with db_transaction.atomic():
+                outbox.encolar(admin_wallet, "admin_to_docente", [
+                    {'clave': clave, 'receptor': docente, 'address': docente_wallet.address,
+                     'monto': microalgos},
+                ])
+        except IntegrityError:
+            messages.warning(request, "Este envío ya estaba en cola; no se duplicó.")
+        else:
+            messages.success(request, f"✅ {ledger.a_algos(microalgos)} ALGOs para {docente.username} en cola de envío.")
 
         return redirect("enviar_algos_admin")
 
-    return render(request, "wallet/enviar_algos_admin.html", {"docentes": docentes})
+    return render(request, "wallet/enviar_algos_admin.html", {
+        "docentes": docentes,
+        "idempotency_key": uuid.uuid4().hex,
+    })
+
+
+# =========================
+# EXPORTACIÓN DEL LEDGER
+# =========================
+@login_required
+def exportar_ledger(request):
+    if request.user.role != "admin" and not request.user.is_staff:
+        messages.error(request, "Solo el administrador puede exportar el ledger.")
+        return redirect("dashboard_admin")
+
+    tabla = request.GET.get("tabla", "transacciones")
+    formato = request.GET.get("formato", "csv")
+    comprimir = request.GET.get("gzip", "1") != "0"
+
+    try:
+        contenido = exportar(
+            tabla,
+            formato,
+            comprimir,
+            desde=request.GET.get("desde"),
+            hasta=request.GET.get("hasta"),
+            tipo=request.GET.get("tipo"),
+            estado=request.GET.get("estado"),
+        )
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    content_type = "application/gzip" if comprimir else (
+        "text/csv; charset=utf-8" if formato == "csv" else "application/x-ndjson"
+    )
+    response = StreamingHttpResponse(contenido, content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{nombre_archivo(tabla, formato, comprimir)}"'
+    return response
+
+
+# =========================
+# MÉTRICAS (PROMETHEUS)
+# =========================
+def metricas(request):
+    if not request.user.is_staff:
+        return HttpResponse("Solo personal autorizado.", status=403)
+    return HttpResponse(metrics.REGISTRO.exportar(), content_type="text/plain; version=0.0.4; charset=utf-8")